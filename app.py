@@ -7,20 +7,43 @@ PROJECT_ROOT = os.path.abspath(os.path.dirname(__file__))
 PAGES_DIR = os.path.join(PROJECT_ROOT, "pages")
 sys.path.append(PAGES_DIR)
 
-# Import the LoginPage class from login_page.py
-from pages.login_page import LoginPage
+# The router swaps the login page and dashboards inside one window
+from pages.router import ViewRouter
+from database.db_connection import close_pool
+from database.change_listener import start_listener, stop_listener
+from database.blob_migrator import MIGRATE_IN_APP, BlobMigrator
+from database.availability import student_availability
+from database.query_stats import query_stats
+from database.venue_bookings import venue_bookings
+from database.event_cache import event_cache
 
 def main():
     """
     Main entry point of the application.
-    Launches the login page in full-screen mode.
+    Launches the login page in full-screen mode. The same root window and main loop
+    serve every login and logout until the window is closed.
     """
     root = tk.Tk()
     root.title("Intra-School Event Management System")
     root.state("zoomed")  # Set the window to full screen
     root.geometry(f"{root.winfo_screenwidth()}x{root.winfo_screenheight()}")
-    LoginPage(root)  # Initialize the login page
+    router = ViewRouter(root)
+    start_listener()  # Evict cached events when other clients change them
+    blob_migrator = BlobMigrator()  # Move any remaining BYTEA file contents into the blob store
+    if MIGRATE_IN_APP:
+        blob_migrator.start()
+    router.show_login()  # Initialize the login page
     root.mainloop()
+    router.shutdown()
+    blob_migrator.stop(timeout=5)
+    stop_listener()
+    close_pool()  # Release pooled database connections on exit
+    if os.getenv("DB_QUERY_STATS_FILE"):
+        query_stats.dump_json(os.getenv("DB_QUERY_STATS_FILE"), caches={
+            "event_cache": event_cache.stats(),
+            "student_availability": student_availability.stats(),
+            "venue_bookings": venue_bookings.stats(),
+        })
 
 if __name__ == "__main__":
     main()
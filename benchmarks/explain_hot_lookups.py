@@ -0,0 +1,217 @@
+"""
+Before/after EXPLAIN ANALYZE report for the hot-lookup indexes in
+database/migrations/002_hot_lookup_indexes.sql.
+
+Builds a throwaway schema (default: bench_hot_lookups) in the configured
+database, fills it with a generated school of 100k students, runs each hot
+query with EXPLAIN (ANALYZE, BUFFERS), applies the migration, and runs them
+again. The report is written as Markdown.
+
+Usage:
+    python benchmarks/explain_hot_lookups.py [--students 100000] [--out report.md] [--keep]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db_connection import pooled_connection, close_pool
+from database.migrate import MIGRATIONS_DIR, apply_migration, applied_versions
+
+SCHEMA_FILE = os.path.join(os.path.dirname(__file__), '..', 'database', 'schema.sql')
+# 001 widens the ID columns the generated data needs; 002 is the migration under test.
+SETUP_MIGRATION = "001_id_sequences.sql"
+MEASURED_MIGRATION = "002_hot_lookup_indexes.sql"
+
+# Each hot query as the application issues it, with the parameters to probe.
+HOT_QUERIES = [
+    ("StudentDashboard.fetch_student_events (TRIM/LOWER filter)", """
+        SELECT e.EventID, e.EventName, e.EventDate
+        FROM Events e
+        JOIN Event_Participation ep ON e.EventID = ep.EventID
+        WHERE TRIM(LOWER(ep.UserID)) = LOWER(TRIM(%(student)s))
+    """),
+    ("Student events (plain equality)", """
+        SELECT e.EventID, e.EventName, e.EventDate
+        FROM Events e
+        JOIN Event_Participation ep ON e.EventID = ep.EventID
+        WHERE ep.UserID = %(student)s
+    """),
+    ("AdminDashboard.dashboard date click", """
+        SELECT EventName FROM Events WHERE EventDate = %(date)s
+    """),
+    ("TeacherDashboard.add_students teacher events", """
+        SELECT EventID, EventName FROM Events WHERE UserID = %(teacher)s
+    """),
+    ("Teacher availability (3-day window)", """
+        SELECT t.UserID
+        FROM Teachers t
+        WHERE t.UserID NOT IN (
+            SELECT e.UserID FROM Events e
+            WHERE e.EventDate BETWEEN (%(date)s::DATE - INTERVAL '3 days') AND (%(date)s::DATE + INTERVAL '3 days')
+        )
+    """),
+    ("TeacherDashboard.load_files", """
+        SELECT FileID, FileName FROM Event_Files WHERE EventID = %(event)s AND UserID = %(student)s
+    """),
+    ("StudentDashboard.load_feedback", """
+        SELECT f.Feedback, ef.FileApprovalStatus
+        FROM Feedback f
+        JOIN Event_Files ef ON f.FileID = ef.FileID
+        WHERE ef.EventID = %(event)s AND ef.UserID = %(student)s
+    """),
+    ("Delete participation for an event", """
+        SELECT 1 FROM Event_Participation WHERE EventID = %(event)s
+    """),
+]
+
+
+def generate_dataset(cursor, students, assignments_per_student=3, events=None):
+    """
+    Fills the benchmark schema with a generated school: `students` students,
+    one teacher per 50 students, ten events per teacher (or `events` in total)
+    over five years, `assignments_per_student` assignments per student, and a
+    file plus feedback for half of the students.
+    """
+    teachers = max(students // 50, 1)
+    events = events or teachers * 10
+    cursor.execute("""
+        INSERT INTO Users (UserID, UserName, UserRole, UserPass)
+        SELECT 'ST' || lpad(g::TEXT, 7, '0'), 'Student ' || g, 'Student', 'pass'
+        FROM generate_series(1, %(students)s) g
+        UNION ALL
+        SELECT 'TE' || lpad(g::TEXT, 7, '0'), 'Teacher ' || g, 'Teacher', 'pass'
+        FROM generate_series(1, %(teachers)s) g;
+
+        INSERT INTO Students (UserID, StudentClass)
+        SELECT 'ST' || lpad(g::TEXT, 7, '0'), 'Grade ' || (g %% 12 + 1)
+        FROM generate_series(1, %(students)s) g;
+
+        INSERT INTO Teachers (UserID, TeacherFName, TeacherLName)
+        SELECT 'TE' || lpad(g::TEXT, 7, '0'), 'First' || g, 'Last' || g
+        FROM generate_series(1, %(teachers)s) g;
+
+        INSERT INTO Events (EventID, EventName, EventDate, EventStartTime, EventEndTime, EventVenue, UserID)
+        SELECT 'EID' || g, 'Event ' || g, DATE '2021-01-01' + (g %% 1825),
+               TIME '09:00', TIME '12:00', 'Central Auditorium',
+               'TE' || lpad((g %% %(teachers)s + 1)::TEXT, 7, '0')
+        FROM generate_series(1, %(events)s) g;
+
+        INSERT INTO Event_Participation (EventID, UserID, Responsibility)
+        SELECT 'EID' || ((s * 7 + k * 1031) %% %(events)s + 1), 'ST' || lpad(s::TEXT, 7, '0'), 'Volunteer'
+        FROM generate_series(1, %(students)s) s, generate_series(1, %(assignments)s) k;
+
+        INSERT INTO Event_Files (FileID, EventID, UserID, FileName, FileApprovalStatus)
+        SELECT 'FILEID-' || s, 'EID' || ((s * 7 + 1031) %% %(events)s + 1), 'ST' || lpad(s::TEXT, 7, '0'),
+               'report_' || s || '.pdf', 'Pending'
+        FROM generate_series(1, %(students)s, 2) s;
+
+        INSERT INTO Feedback (FeedbackID, FileID, UserID, Feedback)
+        SELECT 'FEEDBACK' || s, 'FILEID-' || s, 'TE0000001', 'Looks good'
+        FROM generate_series(1, %(students)s, 2) s;
+    """, {"students": students, "teachers": teachers, "events": events,
+          "assignments": assignments_per_student})
+    return {"students": students, "teachers": teachers, "events": events,
+            "participation": students * assignments_per_student}
+
+
+def analyze_tables(cursor):
+    for table in ("Users", "Students", "Teachers", "Events", "Event_Participation", "Event_Files", "Feedback"):
+        cursor.execute(f"ANALYZE {table}")
+
+
+def explain_all(cursor, params):
+    """
+    Runs EXPLAIN (ANALYZE, BUFFERS) for every hot query and returns
+    (label, execution_ms, plan_text) tuples.
+    """
+    results = []
+    for label, query in HOT_QUERIES:
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+        execution_ms = None
+        for line in plan.splitlines():
+            if line.strip().startswith("Execution Time:"):
+                execution_ms = float(line.split(":")[1].strip().split()[0])
+        results.append((label, execution_ms, plan))
+    return results
+
+
+def render_report(sizes, before, after, load_seconds):
+    lines = [
+        "# Hot-lookup index report",
+        "",
+        f"Dataset: {sizes['students']:,} students, {sizes['teachers']:,} teachers, "
+        f"{sizes['events']:,} events, {sizes['participation']:,} participation rows "
+        f"(generated in {load_seconds:.1f}s).",
+        "",
+        "| Query | Before (ms) | After (ms) |",
+        "|---|---:|---:|",
+    ]
+    for (label, before_ms, _), (_, after_ms, _) in zip(before, after):
+        lines.append(f"| {label} | {before_ms:.3f} | {after_ms:.3f} |")
+    lines.append("")
+    for (label, _, before_plan), (_, _, after_plan) in zip(before, after):
+        lines += [f"## {label}", "", "Before:", "```", before_plan, "```", "", "After:", "```", after_plan, "```", ""]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--schema", default="bench_hot_lookups")
+    parser.add_argument("--out", default=None, help="Write the Markdown report here instead of stdout.")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark schema afterwards.")
+    args = parser.parse_args()
+
+    with pooled_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+                cursor.execute(f"CREATE SCHEMA {args.schema}")
+                cursor.execute(f"SET search_path TO {args.schema}")
+                with open(SCHEMA_FILE, "r", encoding="utf-8") as f:
+                    cursor.execute(f.read())
+                applied_versions(cursor)
+                conn.commit()
+            apply_migration(conn, "001", os.path.join(MIGRATIONS_DIR, SETUP_MIGRATION))
+
+            with conn.cursor() as cursor:
+                started = time.perf_counter()
+                sizes = generate_dataset(cursor, args.students)
+                conn.commit()
+                load_seconds = time.perf_counter() - started
+
+                analyze_tables(cursor)
+                params = {"student": "ST0000042", "teacher": "TE0000007", "date": "2023-06-15",
+                          "event": "EID1073"}
+                before = explain_all(cursor, params)
+                conn.commit()
+            apply_migration(conn, "002", os.path.join(MIGRATIONS_DIR, MEASURED_MIGRATION))
+
+            with conn.cursor() as cursor:
+                analyze_tables(cursor)
+                after = explain_all(cursor, params)
+            conn.commit()
+
+            report = render_report(sizes, before, after, load_seconds)
+            if args.out:
+                with open(args.out, "w", encoding="utf-8") as f:
+                    f.write(report)
+                print(f"Report written to {args.out}")
+            else:
+                print(report)
+        finally:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                if not args.keep:
+                    cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+                cursor.execute("RESET search_path")
+            conn.commit()
+    close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Overhead of database/query_stats.py: the hot queries from explain_hot_lookups,
+run through a plain psycopg2 cursor and through InstrumentedCursor.
+
+Builds a throwaway schema (20k students by default) with the hot-lookup
+indexes, so each query is a short index probe and the bookkeeping is as large
+a share of it as it gets. Each round runs every query --repeat times (execute
+plus fetchall) on both cursors, alternating which goes first; the overhead is
+the median over the rounds of instrumented time / plain time - 1. Exits with
+status 1 if it is over --limit-pct.
+
+Usage:
+    python benchmarks/query_instrumentation.py [--students 20000] [--rounds 30] [--repeat 20] [--limit-pct 2] [--keep]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import psycopg2.extensions
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db_connection import pooled_connection, close_pool
+from database.migrate import MIGRATIONS_DIR, apply_migration, applied_versions
+from database.query_stats import InstrumentedCursor, query_stats
+from explain_hot_lookups import HOT_QUERIES, SCHEMA_FILE, analyze_tables, generate_dataset
+
+SETUP_MIGRATIONS = ("001_id_sequences.sql", "002_hot_lookup_indexes.sql", "003_normalize_user_ids.sql")
+PARAMS = {"student": "ST0000042", "teacher": "TE0000007", "date": "2023-06-15", "event": "EID1073"}
+
+
+def run_queries(conn, cursor_factory, repeat):
+    """
+    Returns the seconds taken to run every hot query `repeat` times.
+    """
+    with conn.cursor(cursor_factory=cursor_factory) as cursor:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for _, query in HOT_QUERIES:
+                cursor.execute(query, PARAMS)
+                cursor.fetchall()
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit-pct", type=float, default=2.0)
+    parser.add_argument("--schema", default="bench_query_instrumentation")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark schema afterwards.")
+    args = parser.parse_args()
+
+    with pooled_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+                cursor.execute(f"CREATE SCHEMA {args.schema}")
+                cursor.execute(f"SET search_path TO {args.schema}")
+                with open(SCHEMA_FILE, "r", encoding="utf-8") as f:
+                    cursor.execute(f.read())
+                applied_versions(cursor)
+                conn.commit()
+            apply_migration(conn, "001", os.path.join(MIGRATIONS_DIR, SETUP_MIGRATIONS[0]))
+            with conn.cursor() as cursor:
+                sizes = generate_dataset(cursor, args.students)
+                conn.commit()
+            for file_name in SETUP_MIGRATIONS[1:]:
+                apply_migration(conn, file_name[:3], os.path.join(MIGRATIONS_DIR, file_name))
+            with conn.cursor() as cursor:
+                analyze_tables(cursor)
+            conn.commit()
+
+            # Warm the plans, caches and fingerprints on both paths first.
+            run_queries(conn, psycopg2.extensions.cursor, 2)
+            run_queries(conn, InstrumentedCursor, 2)
+            query_stats.reset()
+
+            plain, instrumented, ratios = [], [], []
+            for round_no in range(args.rounds):
+                order = [psycopg2.extensions.cursor, InstrumentedCursor]
+                if round_no % 2:
+                    order.reverse()
+                timings = {factory: run_queries(conn, factory, args.repeat) for factory in order}
+                plain.append(timings[psycopg2.extensions.cursor])
+                instrumented.append(timings[InstrumentedCursor])
+                ratios.append(timings[InstrumentedCursor] / timings[psycopg2.extensions.cursor])
+            conn.commit()
+
+            statements = args.rounds * args.repeat * len(HOT_QUERIES)
+            overhead_pct = (statistics.median(ratios) - 1) * 100
+            print(f"# Query instrumentation overhead ({sizes['students']:,} students, "
+                  f"{len(HOT_QUERIES)} hot queries, {statements:,} statements per cursor)")
+            print()
+            print("| Cursor | per statement (us) |")
+            print("|---|---:|")
+            print(f"| plain | {sum(plain) / statements * 1e6:.1f} |")
+            print(f"| instrumented | {sum(instrumented) / statements * 1e6:.1f} |")
+            print()
+            print(f"Median overhead: {overhead_pct:+.2f}% (limit {args.limit_pct:.1f}%); "
+                  f"{query_stats.summary()['calls']:,} statements recorded.")
+            if overhead_pct > args.limit_pct:
+                print("\nFAIL: instrumentation overhead is over the limit.")
+                sys.exit(1)
+            print("\nOK")
+        finally:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                if not args.keep:
+                    cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+                cursor.execute("RESET search_path")
+            conn.commit()
+    close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Rows/sec of a term-start roster load: the Add Teachers path (one INSERT pair
+and a commit per person) against database/roster_import.py (streaming
+validation, COPY into staging, one merge transaction).
+
+Builds a throwaway schema (default: bench_roster_import), generates a CSV of
+3,000 students and 200 teachers by default, loads it both ways and prints a
+Markdown table.
+
+Usage:
+    python benchmarks/roster_import_throughput.py [--students 3000] [--teachers 200] [--keep]
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db_connection import pooled_connection, close_pool
+from database.roster_import import default_password, import_roster, rows_per_second
+from explain_hot_lookups import SCHEMA_FILE
+
+HEADER = ["UserID", "UserRole", "UserName", "UserPass", "StudentClass", "TeacherFName", "TeacherLName"]
+
+
+def generate_roster(students, teachers):
+    """
+    Returns the roster as CSV text.
+    """
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(HEADER)
+    for n in range(students):
+        writer.writerow([f"ST{n:07d}", "Student", f"Student {n}", "", f"{7 + n % 6}{'ABCD'[n % 4]}", "", ""])
+    for n in range(teachers):
+        writer.writerow([f"TE{n:07d}", "Teacher", "", "", "", f"Teacher{n}", f"Surname{n}"])
+    return out.getvalue()
+
+
+def load_row_by_row(conn, roster_csv):
+    """
+    Loads the roster the way the Add Teachers form does: two INSERTs and a commit per person.
+    Returns (rows, seconds).
+    """
+    rows = list(csv.DictReader(io.StringIO(roster_csv)))
+    started = time.perf_counter()
+    with conn.cursor() as cursor:
+        for row in rows:
+            name = row["UserName"] or row["TeacherFName"]
+            cursor.execute(
+                "INSERT INTO Users (UserID, UserName, UserRole, UserPass) VALUES (%s, %s, %s, %s)",
+                (row["UserID"], name, row["UserRole"], default_password(name)),
+            )
+            if row["UserRole"] == "Student":
+                cursor.execute("INSERT INTO Students (UserID, StudentClass) VALUES (%s, %s)",
+                               (row["UserID"], row["StudentClass"]))
+            else:
+                cursor.execute("INSERT INTO Teachers (UserID, TeacherFName, TeacherLName) VALUES (%s, %s, %s)",
+                               (row["UserID"], row["TeacherFName"], row["TeacherLName"]))
+            conn.commit()
+    return len(rows), time.perf_counter() - started
+
+
+def truncate(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("TRUNCATE Students, Teachers, Users CASCADE")
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=3_000)
+    parser.add_argument("--teachers", type=int, default=200)
+    parser.add_argument("--schema", default="bench_roster_import")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark schema afterwards.")
+    args = parser.parse_args()
+
+    roster_csv = generate_roster(args.students, args.teachers)
+
+    with pooled_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+                cursor.execute(f"CREATE SCHEMA {args.schema}")
+                cursor.execute(f"SET search_path TO {args.schema}")
+                with open(SCHEMA_FILE, "r", encoding="utf-8") as f:
+                    cursor.execute(f.read())
+            conn.commit()
+
+            rows, seconds = load_row_by_row(conn, roster_csv)
+            truncate(conn)
+            result = import_roster(io.StringIO(roster_csv), conn=conn)
+            if result.errors:
+                print(f"Warning: {len(result.errors)} row(s) rejected, first: {result.errors[0]}")
+
+            print(f"Roster of {args.students} students and {args.teachers} teachers\n")
+            print("| Path | Seconds | Rows/sec |")
+            print("|---|---:|---:|")
+            print(f"| Row by row (Add Teachers) | {seconds:.2f} | {rows / seconds:,.0f} |")
+            print(f"| COPY + merge (roster import) | {result.seconds:.2f} | {rows_per_second(result):,.0f} |")
+        finally:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                if not args.keep:
+                    cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+                cursor.execute("RESET search_path")
+            conn.commit()
+    close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Soak test for the view router: logs in and out 1,000 times (by default) in one
+Tk root and checks that memory stays flat.
+
+Each cycle shows the dashboard of a rotating role and user, opens a pooled
+window on it, closes and reopens it (timed; must stay under 50 ms), and logs out
+again. Every 100 cycles it prints the Python heap (tracemalloc),
+the number of live widgets and the number of Tcl commands (each Python callback
+bound into Tk is one); after the warm-up cycles none of them may keep growing.
+Exits with status 1 if one did.
+
+Drives the router directly instead of submitting the login form, so no database
+is needed, but a display is.
+
+Usage:
+    python benchmarks/router_soak.py [--cycles 1000] [--warmup 50] [--tolerance-kb 512]
+"""
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pages.router import ViewRouter
+
+ROLES = ("Admin", "Teacher", "Student")
+REOPEN_LIMIT_MS = 50
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def snapshot(root):
+    return {
+        "heap_kb": tracemalloc.get_traced_memory()[0] / 1024,
+        "widgets": count_widgets(root),
+        "tcl_commands": len(root.tk.call("info", "commands")),
+    }
+
+
+def build_window(root, n):
+    window = tk.Toplevel(root)
+    label = tk.Label(window, text=f"Window {n}")
+    label.pack()
+    tk.Button(window, text="Close", command=window.destroy).pack()
+    return window, lambda: label.config(text=f"Window {n} (reopened)")
+
+
+def cycle(router, n):
+    """
+    One login/logout: dashboard for user n, a pooled window opened from it, closed
+    and reopened, then logout. Returns the reopen time in milliseconds.
+    """
+    root = router.root
+    router.show_dashboard(ROLES[n % len(ROLES)], f"USER{n % 50:04d}")
+    root.update()
+    window = router.views.open("soak", lambda: build_window(root, n))
+    root.update()
+    router.views.close(window)
+    root.update()
+    started = time.perf_counter()
+    router.views.open("soak", lambda: build_window(root, n))
+    root.update()
+    reopen_ms = 1000 * (time.perf_counter() - started)
+    router.logout()
+    root.update()
+    return reopen_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50, help="Cycles run before the baseline is taken.")
+    parser.add_argument("--tolerance-kb", type=float, default=512, help="Allowed Python heap growth after warm-up.")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    router = ViewRouter(root)
+    router.show_login()
+    root.update()
+
+    tracemalloc.start()
+    for n in range(args.warmup):
+        cycle(router, n)
+    baseline = snapshot(root)
+    started = time.perf_counter()
+
+    print("| Cycles | Heap (KB) | Widgets | Tcl commands |")
+    print("|---:|---:|---:|---:|")
+    print(f"| 0 | {baseline['heap_kb']:,.0f} | {baseline['widgets']} | {baseline['tcl_commands']} |")
+    reopen_times = []
+    for n in range(1, args.cycles + 1):
+        reopen_times.append(cycle(router, args.warmup + n))
+        if n % 100 == 0 or n == args.cycles:
+            current = snapshot(root)
+            print(f"| {n} | {current['heap_kb']:,.0f} | {current['widgets']} | {current['tcl_commands']} |")
+    elapsed = time.perf_counter() - started
+
+    router.shutdown()
+    root.destroy()
+
+    reopen_times.sort()
+    p95 = reopen_times[int(0.95 * (len(reopen_times) - 1))]
+    print(f"\n{args.cycles} cycles in {elapsed:.1f}s ({1000 * elapsed / args.cycles:.1f} ms per login/logout).")
+    print(f"Pooled window reopen: median {reopen_times[len(reopen_times) // 2]:.1f} ms, p95 {p95:.1f} ms.")
+    problems = []
+    if p95 > REOPEN_LIMIT_MS:
+        problems.append(f"p95 reopen took {p95:.1f} ms (limit {REOPEN_LIMIT_MS} ms)")
+    if current["heap_kb"] - baseline["heap_kb"] > args.tolerance_kb:
+        problems.append(f"Python heap grew by {current['heap_kb'] - baseline['heap_kb']:,.0f} KB")
+    for key in ("widgets", "tcl_commands"):
+        if current[key] > baseline[key]:
+            problems.append(f"{key} grew from {baseline[key]} to {current[key]}")
+    if problems:
+        print("FAIL: " + "; ".join(problems))
+        sys.exit(1)
+    print("OK: memory stayed flat.")
+
+
+if __name__ == "__main__":
+    main()
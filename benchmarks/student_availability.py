@@ -0,0 +1,161 @@
+"""
+Latency of "which students are free within 3 days of this event" as
+TeacherDashboard.add_students asks it, at 50k students x 5k events by default.
+
+Builds a throwaway schema (5 assignments per student), then answers the same
+random event selections three ways, each a full client round trip:
+
+  three queries  the former fetch_available_students: the event date, then the
+                 unassigned students and the students with no clash, merged in Python
+  anti-join      availability.AVAILABLE_STUDENTS_QUERY, one round trip
+  bitset cache   availability.StudentAvailability: a first pass over the
+                 selections (cold dates; the first also loads the roster) and a
+                 second, answered from the cached per-date bitsets
+
+Every answer is checked against the three-query result; exits with status 1 on
+a mismatch.
+
+Usage:
+    python benchmarks/student_availability.py [--students 50000] [--events 5000] [--selections 200] [--keep]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.availability import AVAILABLE_STUDENTS_QUERY, StudentAvailability
+from database.db_connection import pooled_connection, close_pool
+from database.migrate import MIGRATIONS_DIR, apply_migration, applied_versions
+from explain_hot_lookups import SCHEMA_FILE, analyze_tables, generate_dataset
+from student_lookup_latency import summarize
+
+SETUP_MIGRATIONS = ("001_id_sequences.sql", "002_hot_lookup_indexes.sql", "003_normalize_user_ids.sql")
+
+
+def three_queries(cursor, event_id):
+    """
+    The former fetch_available_students, statement for statement.
+    """
+    cursor.execute("SELECT EventDate FROM Events WHERE EventID = %s", (event_id,))
+    event_date = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT Students.UserID, Users.UserName
+        FROM Students
+        JOIN Users ON Students.UserID = Users.UserID
+        WHERE Students.UserID NOT IN (SELECT UserID FROM Event_Participation)
+    """)
+    no_event_students = cursor.fetchall()
+    cursor.execute("""
+        SELECT Students.UserID, Users.UserName
+        FROM Students
+        JOIN Users ON Students.UserID = Users.UserID
+        WHERE Students.UserID NOT IN (
+            SELECT ep.UserID
+            FROM Event_Participation ep
+            JOIN Events e ON ep.EventID = e.EventID
+            WHERE e.EventDate BETWEEN %s AND %s
+        )
+    """, (event_date - timedelta(days=3), event_date + timedelta(days=3)))
+    not_conflicting_students = cursor.fetchall()
+    return list({row[0]: row[1] for row in no_event_students + not_conflicting_students}.items())
+
+
+def anti_join(cursor, event_id):
+    cursor.execute(AVAILABLE_STUDENTS_QUERY, {"event": event_id})
+    return cursor.fetchall()
+
+
+def time_selections(answer, probes):
+    """
+    Calls answer(event_id) per probe; returns (latencies in ms, answers).
+    """
+    latencies, answers = [], []
+    for event_id in probes:
+        started = time.perf_counter()
+        answers.append(answer(event_id))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=50_000)
+    parser.add_argument("--events", type=int, default=5_000)
+    parser.add_argument("--assignments", type=int, default=5)
+    parser.add_argument("--selections", type=int, default=200)
+    parser.add_argument("--schema", default="bench_student_availability")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark schema afterwards.")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    probes = [f"EID{rng.randint(1, args.events)}" for _ in range(args.selections)]
+
+    with pooled_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+                cursor.execute(f"CREATE SCHEMA {args.schema}")
+                cursor.execute(f"SET search_path TO {args.schema}")
+                with open(SCHEMA_FILE, "r", encoding="utf-8") as f:
+                    cursor.execute(f.read())
+                applied_versions(cursor)
+                conn.commit()
+            apply_migration(conn, "001", os.path.join(MIGRATIONS_DIR, SETUP_MIGRATIONS[0]))
+            with conn.cursor() as cursor:
+                sizes = generate_dataset(cursor, args.students, args.assignments, args.events)
+                conn.commit()
+            for file_name in SETUP_MIGRATIONS[1:]:
+                apply_migration(conn, file_name[:3], os.path.join(MIGRATIONS_DIR, file_name))
+
+            @contextmanager
+            def bench_connection():
+                yield conn
+
+            with conn.cursor() as cursor:
+                analyze_tables(cursor)
+                old, expected = time_selections(lambda event_id: three_queries(cursor, event_id), probes)
+                single, single_answers = time_selections(lambda event_id: anti_join(cursor, event_id), probes)
+            conn.commit()
+
+            # The first selection also loads the roster, once.
+            availability = StudentAvailability(connect=bench_connection)
+            cold, cold_answers = time_selections(availability.available_students, probes)
+            cold_stats = availability.stats()
+            warm, warm_answers = time_selections(availability.available_students, probes)
+            conn.commit()
+
+            print(f"# Student availability ({sizes['students']:,} students, {sizes['events']:,} events, "
+                  f"{sizes['participation']:,} assignments, {args.selections} selections)")
+            print()
+            print("| Method | p50 (ms) | p95 (ms) | max (ms) |")
+            print("|---|---:|---:|---:|")
+            print(summarize("three queries", old))
+            print(summarize("anti-join", single))
+            print(summarize(f"bitset cache, first pass ({cold_stats['hits']} of {len(probes)} hits)", cold))
+            print(summarize("bitset cache, cached", warm))
+
+            mismatches = 0
+            for event_id, want, *got in zip(probes, expected, single_answers, cold_answers, warm_answers):
+                want = set(want)
+                mismatches += sum(set(answer) != want for answer in got)
+            if mismatches:
+                print(f"\nFAIL: {mismatches} answers differ from the three-query result.")
+                sys.exit(1)
+            print("\nOK: all methods return the same students.")
+        finally:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                if not args.keep:
+                    cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+                cursor.execute("RESET search_path")
+            conn.commit()
+    close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Per-click latency of the StudentDashboard calendar lookup before and after
+database/migrations/003_normalize_user_ids.sql.
+
+Builds a throwaway schema with 1M Event_Participation rows (200k students x 5
+assignments by default), then times the date-click query in its old form
+(TRIM(LOWER(ep.UserID)) = LOWER(TRIM(%s))) and, after the migration, as a
+plain equality probe. Each measurement is a full client round trip, as the
+dashboard sees it.
+
+Usage:
+    python benchmarks/student_lookup_latency.py [--students 200000] [--assignments 5] [--clicks 200] [--keep]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db_connection import pooled_connection, close_pool
+from database.migrate import MIGRATIONS_DIR, apply_migration, applied_versions
+from explain_hot_lookups import SCHEMA_FILE, analyze_tables, generate_dataset
+
+OLD_CLICK_QUERY = """
+    SELECT e.EventName
+    FROM Events e
+    JOIN Event_Participation ep ON e.EventID = ep.EventID
+    WHERE TRIM(LOWER(ep.UserID)) = LOWER(TRIM(%s)) AND e.EventDate = %s
+"""
+
+NEW_CLICK_QUERY = """
+    SELECT e.EventName
+    FROM Events e
+    JOIN Event_Participation ep ON e.EventID = ep.EventID
+    WHERE ep.UserID = %s AND e.EventDate = %s
+"""
+
+
+def time_clicks(cursor, query, probes):
+    """
+    Runs the query once per (student, date) probe and returns the latencies in milliseconds.
+    """
+    latencies = []
+    for student_id, click_date in probes:
+        started = time.perf_counter()
+        cursor.execute(query, (student_id, click_date))
+        cursor.fetchall()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def summarize(label, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return (f"| {label} | {statistics.median(ordered):.3f} | {p95:.3f} | {max(ordered):.3f} |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200_000)
+    parser.add_argument("--assignments", type=int, default=5)
+    parser.add_argument("--clicks", type=int, default=200)
+    parser.add_argument("--schema", default="bench_student_lookup")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark schema afterwards.")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    probes = [(f"ST{rng.randint(1, args.students):07d}", f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+              for _ in range(args.clicks)]
+
+    with pooled_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+                cursor.execute(f"CREATE SCHEMA {args.schema}")
+                cursor.execute(f"SET search_path TO {args.schema}")
+                with open(SCHEMA_FILE, "r", encoding="utf-8") as f:
+                    cursor.execute(f.read())
+                applied_versions(cursor)
+                conn.commit()
+            apply_migration(conn, "001", os.path.join(MIGRATIONS_DIR, "001_id_sequences.sql"))
+
+            with conn.cursor() as cursor:
+                sizes = generate_dataset(cursor, args.students, args.assignments)
+                conn.commit()
+            # Both runs get the hot-lookup indexes; only the UserID normalization differs.
+            apply_migration(conn, "002", os.path.join(MIGRATIONS_DIR, "002_hot_lookup_indexes.sql"))
+
+            with conn.cursor() as cursor:
+                analyze_tables(cursor)
+                before = time_clicks(cursor, OLD_CLICK_QUERY, probes)
+            conn.commit()
+
+            apply_migration(conn, "003", os.path.join(MIGRATIONS_DIR, "003_normalize_user_ids.sql"))
+            with conn.cursor() as cursor:
+                analyze_tables(cursor)
+                after = time_clicks(cursor, NEW_CLICK_QUERY, probes)
+            conn.commit()
+
+            print(f"# Student calendar click latency ({sizes['participation']:,} participation rows, "
+                  f"{args.clicks} clicks)")
+            print()
+            print("| Query | p50 (ms) | p95 (ms) | max (ms) |")
+            print("|---|---:|---:|---:|")
+            print(summarize("TRIM(LOWER(ep.UserID)) filter", before))
+            print(summarize("ep.UserID = %s", after))
+        finally:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                if not args.keep:
+                    cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+                cursor.execute("RESET search_path")
+            conn.commit()
+    close_pool()
+
+
+if __name__ == "__main__":
+    main()
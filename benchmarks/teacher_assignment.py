@@ -0,0 +1,109 @@
+"""
+Planning time of the batch teacher assignment (database/teacher_scheduler.py)
+for a term of 1,000 unassigned events and 200 teachers by default.
+
+Generates a term of events on random school days plus a share of events the
+teachers already have, then times plan_assignments over several runs. Every
+plan is checked against the 3-day rule, existing bookings included; exits with
+status 1 if a plan breaks it or the p95 exceeds the time limit.
+
+The planner is pure Python, so no database is needed.
+
+Usage:
+    python benchmarks/teacher_assignment.py [--events 1000] [--teachers 200] [--booked 0.2] [--runs 20] [--limit-ms 250]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.conflicts import BUFFER_DAYS
+from database.teacher_scheduler import plan_assignments
+from student_lookup_latency import summarize
+
+TERM_START = date(2025, 1, 6)
+TERM_WEEKS = 13
+
+
+def generate_term(rng, events, teachers, booked):
+    """
+    Returns (events, teachers, bookings) for plan_assignments. `booked` is the
+    share of teachers who already have events of their own, one a fortnight.
+    """
+    school_days = [TERM_START + timedelta(days=day) for day in range(TERM_WEEKS * 7)
+                   if (TERM_START + timedelta(days=day)).weekday() < 5]
+    unassigned = [(f"EID{n}", rng.choice(school_days)) for n in range(1, events + 1)]
+    teacher_ids = [f"T{n:04d}".ljust(10) for n in range(1, teachers + 1)]
+    bookings = []
+    for teacher_id in rng.sample(teacher_ids, int(teachers * booked)):
+        day = TERM_START + timedelta(days=rng.randrange(14))
+        while day < TERM_START + timedelta(weeks=TERM_WEEKS):
+            bookings.append((teacher_id, f"BOOKED{len(bookings) + 1}", day))
+            day += timedelta(days=14)
+    return unassigned, teacher_ids, bookings
+
+
+def violations(plan, bookings):
+    """
+    Counts pairs of events one teacher has within BUFFER_DAYS of each other.
+    """
+    days = defaultdict(list)
+    for teacher_id, _, event_date in bookings:
+        days[teacher_id].append(event_date)
+    for _, event_date, teacher_id in plan.assignments:
+        days[teacher_id].append(event_date)
+    found = 0
+    for teacher_days in days.values():
+        teacher_days.sort()
+        found += sum((b - a).days <= BUFFER_DAYS for a, b in zip(teacher_days, teacher_days[1:]))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1_000)
+    parser.add_argument("--teachers", type=int, default=200)
+    parser.add_argument("--booked", type=float, default=0.2)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--limit-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    latencies = []
+    failures = []
+    for run in range(args.runs):
+        events, teachers, bookings = generate_term(rng, args.events, args.teachers, args.booked)
+        started = time.perf_counter()
+        plan = plan_assignments(events, teachers, bookings)
+        latencies.append((time.perf_counter() - started) * 1000)
+        clashes = violations(plan, bookings)
+        if clashes:
+            failures.append(f"run {run + 1}: {clashes} clash(es) with the {BUFFER_DAYS}-day rule")
+
+    loads = [load for load in plan.loads.values()]
+    print(f"# Teacher assignment ({args.events:,} events, {args.teachers} teachers, "
+          f"{len(bookings)} existing bookings, {args.runs} runs)")
+    print()
+    print("| Method | p50 (ms) | p95 (ms) | max (ms) |")
+    print("|---|---:|---:|---:|")
+    print(summarize("plan_assignments", latencies))
+    print()
+    print(f"Last run: {len(plan.assignments)} assigned, {len(plan.unassigned)} unassigned, "
+          f"events per teacher {min(loads)}-{max(loads)}.")
+
+    p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+    if p95 > args.limit_ms:
+        failures.append(f"p95 {p95:.1f} ms is over the {args.limit_ms:.0f} ms limit")
+    if failures:
+        print("\nFAIL:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nOK: every plan respects the 3-day rule.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from itertools import compress
+from operator import itemgetter
+
+from database.conflicts import BUFFER_DAYS
+from database.db_connection import pooled_connection
+from database.event_cache import CACHE_TTL
+
+# Dates whose busy sets are kept; least recently used dates are dropped beyond it.
+AVAILABILITY_CACHE_DAYS = int(os.getenv("AVAILABILITY_CACHE_DAYS", 730))
+
+ROSTER_QUERY = """
+    SELECT s.UserID, u.UserName
+    FROM Students s
+    JOIN Users u ON s.UserID = u.UserID
+    ORDER BY u.UserName, s.UserID
+"""
+
+# Students with no event within BUFFER_DAYS of the given event, in one round trip.
+# The event's date is looked up once (an InitPlan), so events_date_idx finds the
+# events in the window and their participants are hashed for a single anti-join
+# against Students. Returns no rows when the event does not exist.
+AVAILABLE_STUDENTS_QUERY = f"""
+    SELECT s.UserID, u.UserName
+    FROM Students s
+    JOIN Users u ON s.UserID = u.UserID
+    WHERE EXISTS (SELECT 1 FROM Events WHERE EventID = %(event)s)
+      AND NOT EXISTS (
+          SELECT 1
+          FROM Events e
+          JOIN Event_Participation ep ON ep.EventID = e.EventID
+          WHERE ep.UserID = s.UserID
+            AND e.EventDate BETWEEN (SELECT EventDate FROM Events WHERE EventID = %(event)s) - {BUFFER_DAYS}
+                                AND (SELECT EventDate FROM Events WHERE EventID = %(event)s) + {BUFFER_DAYS}
+      )
+    ORDER BY u.UserName, s.UserID
+"""
+
+# Every event within BUFFER_DAYS of the given event, with its participants (NULL
+# for an event nobody is on yet), plus the given event's own date on each row.
+BUSY_WINDOW_QUERY = f"""
+    SELECT t.EventDate, e.EventID, e.EventDate, ep.UserID
+    FROM Events t
+    JOIN Events e ON e.EventDate BETWEEN t.EventDate - {BUFFER_DAYS} AND t.EventDate + {BUFFER_DAYS}
+    LEFT JOIN Event_Participation ep ON ep.EventID = e.EventID
+    WHERE t.EventID = %s
+"""
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), "%Y-%m-%d").date()
+
+
+def buffer_window(event_date):
+    """
+    The dates on which an event blocks a student: event_date +/- BUFFER_DAYS.
+    """
+    return [event_date + timedelta(days=offset) for offset in range(-BUFFER_DAYS, BUFFER_DAYS + 1)]
+
+
+def to_bitset(ordinals, size):
+    """
+    Returns an int with bit i set for every i in ordinals (all below size).
+    """
+    bits = bytearray((size + 7) // 8)
+    for ordinal in ordinals:
+        bits[ordinal >> 3] |= 1 << (ordinal & 7)
+    return int.from_bytes(bits, "little")
+
+
+_FREE_SELECTOR = str.maketrans("01", "\x01\x00")
+
+
+def unset_members(roster, busy, ordinals=None, size=None):
+    """
+    Returns the roster entries whose ordinal is not set in the busy bitset.
+    ordinals lists each entry's ordinal (all below size); by default it is the
+    entry's position.
+    """
+    if not roster:
+        return []
+    if ordinals is None:
+        size = len(roster)
+    # Bit i of busy becomes byte i of the selector: 1 for free, 0 for busy.
+    selectors = format(busy, f"0{size}b")[::-1].translate(_FREE_SELECTOR).encode("ascii")
+    if ordinals is not None:
+        selectors = itemgetter(*ordinals)(selectors) if len(ordinals) > 1 else (selectors[ordinals[0]],)
+    return list(compress(roster, selectors))
+
+
+class StudentAvailability:
+    """
+    Answers "which students are free within BUFFER_DAYS of event X" from memory.
+
+    Each student gets an ordinal the first time the roster lists them, and
+    for each date the students with an event that day are kept as one bitset,
+    a Python int with bit i set for student i. The students free for an event
+    are the roster (ordered by name) minus the OR of the bitsets for the dates
+    in its window, so repeated selections of events in a cached window need no
+    query at all. A miss loads the whole window in one query.
+
+    Participation writes must call invalidate_events() and event writes
+    invalidate_events()/invalidate_dates(); apply_change() does both for change
+    notifications from other clients. The roster is reloaded after `ttl` seconds
+    (students are added by roster imports, which do not notify) or
+    invalidate_roster(). Ordinals survive a reload, new students are numbered
+    after the existing ones, so the bitsets are kept; only dates whose load
+    skipped students missing from the roster at the time are dropped when new
+    students appear. invalidate() drops everything.
+    Safe to use from the dashboard worker threads.
+    """
+
+    def __init__(self, connect=pooled_connection, ttl=CACHE_TTL, max_days=AVAILABILITY_CACHE_DAYS):
+        self.connect = connect
+        self.ttl = ttl
+        self.max_days = max_days
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._roster = None  # (StudentID, StudentName), ordered by name
+        self._roster_ordinals = None  # ordinal of each roster entry, None while it is the position
+        self._ordinals = {}  # student id -> ordinal, kept across roster reloads
+        self._roster_expires = 0.0
+        self._busy = OrderedDict()  # date -> bitset of student ordinals
+        self._day_events = {}  # date -> event ids on that date
+        self._event_dates = {}  # event id -> date, for events on cached dates
+        self._incomplete_days = set()  # cached dates with participants the roster lacked
+        self.hits = 0
+        self.misses = 0
+
+    def available_students(self, event_id):
+        """
+        Returns (StudentID, StudentName) for every student with no event within
+        BUFFER_DAYS of the event, ordered by name.
+        Raises ValueError if the event does not exist.
+        """
+        loaded = self._ensure_roster()
+        with self._lock:
+            # The cached bitsets always match self._ordinals; the roster is only None
+            # when invalidated since, in which case nothing is cached and `loaded` serves.
+            if self._roster is not None:
+                loaded = self._roster, self._roster_ordinals, self._ordinals
+            roster, roster_ordinals, ordinals = loaded
+            size = len(ordinals)
+            event_date = self._event_dates.get(event_id)
+            window = buffer_window(event_date) if event_date is not None else None
+            if window is not None and all(day in self._busy for day in window):
+                self.hits += 1
+                busy = 0
+                for day in window:
+                    self._busy.move_to_end(day)
+                    busy |= self._busy[day]
+                return unset_members(roster, busy, roster_ordinals, size)
+            self.misses += 1
+            generation = self._generation
+
+        event_date, busy_by_day, events_by_day, incomplete_days = self._load_window(event_id, ordinals)
+        window = buffer_window(event_date)
+        busy = 0
+        for day in window:
+            busy |= busy_by_day[day]
+
+        with self._lock:
+            # Skip storing if invalidated (or the roster reloaded) while loading.
+            if generation == self._generation:
+                for day in window:
+                    self._forget_day(day)
+                    self._busy[day] = busy_by_day[day]
+                    self._day_events[day] = events_by_day[day]
+                    for day_event_id in events_by_day[day]:
+                        self._event_dates[day_event_id] = day
+                self._incomplete_days.update(incomplete_days)
+                while len(self._busy) > self.max_days:
+                    self._forget_day(next(iter(self._busy)))
+        return unset_members(roster, busy, roster_ordinals, size)
+
+    def invalidate(self):
+        """
+        Drops every bitset and the roster.
+        """
+        with self._lock:
+            self._generation += 1
+            self._roster = None
+            self._roster_ordinals = None
+            self._ordinals = {}
+            self._busy.clear()
+            self._day_events.clear()
+            self._event_dates.clear()
+            self._incomplete_days.clear()
+
+    def invalidate_roster(self):
+        """
+        Reloads the roster on the next lookup, e.g. after students were imported.
+        The bitsets are kept.
+        """
+        with self._lock:
+            self._roster_expires = 0.0
+
+    def invalidate_dates(self, dates):
+        """
+        Drops the bitsets of the given dates (date objects or ISO strings).
+        """
+        with self._lock:
+            self._generation += 1
+            for day in dates:
+                self._forget_day(_as_date(day))
+
+    def invalidate_events(self, event_ids):
+        """
+        Drops the bitsets of the dates the given events were cached on, e.g. after
+        students were added to or removed from them, or they were moved or deleted.
+        """
+        with self._lock:
+            self._generation += 1
+            for event_id in event_ids:
+                day = self._event_dates.get(event_id)
+                if day is not None:
+                    self._forget_day(day)
+
+    def apply_change(self, change):
+        """
+        Change-listener subscriber (see database.change_listener).
+        """
+        if change.op == "RESYNC":
+            self.invalidate()
+        elif change.table in ("events", "event_participation"):
+            self.invalidate_events(change.event_ids)
+            # Old and new dates of a moved event; an event nobody is on changes no bitset.
+            if change.table == "events":
+                self.invalidate_dates(change.dates)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "days": len(self._busy),
+                "students": len(self._roster) if self._roster is not None else 0,
+            }
+
+    # ---- internals ----
+
+    def _ensure_roster(self):
+        """
+        Returns (roster, roster_ordinals, ordinals), reloading the roster when it expired.
+        """
+        with self._lock:
+            if self._roster is not None and time.monotonic() < self._roster_expires:
+                return self._roster, self._roster_ordinals, self._ordinals
+        with self.connect() as conn, conn.cursor() as cursor:
+            cursor.execute(ROSTER_QUERY)
+            roster = cursor.fetchall()
+        with self._lock:
+            ordinals = self._ordinals
+            new_students = [student_id for student_id, _ in roster if student_id not in ordinals]
+            if len(ordinals) + len(new_students) > 2 * len(roster) + 64:
+                # Mostly students who have left: number the roster afresh.
+                self._generation += 1
+                ordinals = {}
+                new_students = [student_id for student_id, _ in roster]
+                self._busy.clear()
+                self._day_events.clear()
+                self._event_dates.clear()
+                self._incomplete_days.clear()
+            if new_students:
+                # Readers may hold the old map, so extend a copy.
+                ordinals = dict(ordinals)
+                for student_id in new_students:
+                    ordinals[student_id] = len(ordinals)
+                # Loads that skipped these students (or are skipping them now) are stale.
+                self._generation += 1
+                for day in list(self._incomplete_days):
+                    self._forget_day(day)
+            self._ordinals = ordinals
+            self._roster = roster
+            roster_ordinals = [ordinals[student_id] for student_id, _ in roster]
+            in_order = len(ordinals) == len(roster) and all(o == i for i, o in enumerate(roster_ordinals))
+            self._roster_ordinals = None if in_order else roster_ordinals
+            self._roster_expires = time.monotonic() + self.ttl
+            return self._roster, self._roster_ordinals, self._ordinals
+
+    def _load_window(self, event_id, ordinals):
+        """
+        Returns (event_date, busy_by_day, events_by_day, incomplete_days) for the
+        event's window. Participants missing from the roster (added since it
+        loaded) are left out; incomplete_days lists the dates they were on.
+        """
+        with self.connect() as conn, conn.cursor() as cursor:
+            cursor.execute(BUSY_WINDOW_QUERY, (event_id,))
+            rows = cursor.fetchall()
+        if not rows:
+            raise ValueError(f"Event {event_id} does not exist.")
+        event_date = _as_date(rows[0][0])
+        window = buffer_window(event_date)
+        busy_ordinals = {day: [] for day in window}
+        events_by_day = {day: set() for day in window}
+        incomplete_days = set()
+        for _, day_event_id, day, student_id in rows:
+            day = _as_date(day)
+            events_by_day[day].add(day_event_id)
+            ordinal = ordinals.get(student_id)
+            if ordinal is not None:
+                busy_ordinals[day].append(ordinal)
+            elif student_id is not None:
+                incomplete_days.add(day)
+        busy_by_day = {day: to_bitset(busy_ordinals[day], len(ordinals)) for day in window}
+        return event_date, busy_by_day, events_by_day, incomplete_days
+
+    def _forget_day(self, day):
+        self._busy.pop(day, None)
+        self._incomplete_days.discard(day)
+        for event_id in self._day_events.pop(day, ()):
+            if self._event_dates.get(event_id) == day:
+                del self._event_dates[event_id]
+
+
+# Shared instance used by the teacher dashboard.
+student_availability = StudentAvailability()
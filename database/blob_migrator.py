@@ -0,0 +1,178 @@
+"""
+Moves file contents still held in Event_Files.FileContent (BYTEA) into the
+blob store, a batch at a time, leaving only ContentHash, FileSize, MimeType
+and PageCount on the row.
+
+Each batch is one short transaction whose rows are claimed with
+FOR UPDATE SKIP LOCKED, so several processes can run at once without blocking
+users or each other. Contents are read in CHUNK_SIZE slices, so a batch never
+holds a whole file in memory, and blobs only enter the store once the batch
+has committed. The freed TOAST space is reused by new rows after autovacuum;
+run VACUUM FULL Event_Files in a maintenance window to give it back to the OS.
+
+Run it once from one machine. A workstation started with
+BLOB_MIGRATE_IN_APP=1 runs it in the background instead (see app.py).
+
+Usage:
+    python -m database.blob_migrator [--batch-size 50] [--pause 0.5]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db_connection import pooled_connection, close_pool
+from database.blob_store import blob_store, collect_garbage, register_blob
+from database.file_metadata import describe
+from database.queries import read_bytea_chunks
+
+BATCH_SIZE = 50
+# Seconds to wait between batches so migration never hogs the database.
+BATCH_PAUSE = 0.5
+
+# After a failed batch the background migrator waits RETRY_PAUSE, doubling up
+# to MAX_RETRY_PAUSE, and gives up after MAX_REPEATED_FAILURES identical errors.
+RETRY_PAUSE = 10
+MAX_RETRY_PAUSE = 600
+MAX_REPEATED_FAILURES = 5
+
+# Whether app.py starts a BlobMigrator on this workstation.
+MIGRATE_IN_APP = os.getenv("BLOB_MIGRATE_IN_APP", "0") == "1"
+
+
+def migrate_batch(batch_size=BATCH_SIZE, store=blob_store):
+    """
+    Moves up to batch_size BYTEA rows into the blob store in one transaction.
+    Returns the number of rows moved; 0 means nothing is left to migrate.
+    """
+    staged = []
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            cursor.execute("""
+                SELECT FileID, FileName, octet_length(FileContent)
+                FROM Event_Files
+                WHERE ContentHash IS NULL AND FileContent IS NOT NULL
+                ORDER BY FileID
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            """, (batch_size,))
+            rows = cursor.fetchall()
+
+            for file_id, file_name, file_size in rows:
+                blob = store.stage_chunks(read_bytea_chunks(cursor, file_id, file_size), file_name)
+                staged.append(blob)
+                metadata = describe(blob)
+                register_blob(cursor, blob)
+                cursor.execute("""
+                    UPDATE Event_Files
+                    SET ContentHash = %s, FileSize = %s, MimeType = %s, PageCount = %s, FileContent = NULL
+                    WHERE FileID = %s
+                """, (metadata.content_hash, metadata.size, metadata.mime_type, metadata.page_count, file_id))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            for blob in staged:
+                store.discard(blob)
+            print("Error migrating file contents:", e)
+            raise e
+    for blob in staged:
+        store.commit(blob)
+    return len(rows)
+
+
+def count_remaining():
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM Event_Files WHERE ContentHash IS NULL AND FileContent IS NOT NULL")
+        return cursor.fetchone()[0]
+
+
+class BlobMigrator:
+    """
+    Runs migrate_batch() on a daemon thread until every row is migrated or stop() is called,
+    then collects unreferenced blobs once.
+    A failed batch is retried after an exponentially growing pause; the thread
+    gives up after MAX_REPEATED_FAILURES failures in a row with the same error
+    (e.g. migration 006 not applied yet).
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, pause=BATCH_PAUSE, retry_pause=RETRY_PAUSE,
+                 max_retry_pause=MAX_RETRY_PAUSE, max_repeated_failures=MAX_REPEATED_FAILURES):
+        self.batch_size = batch_size
+        self.pause = pause
+        self.retry_pause = retry_pause
+        self.max_retry_pause = max_retry_pause
+        self.max_repeated_failures = max_repeated_failures
+        self.moved = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="blob-migrator", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        last_error, repeated = None, 0
+        while not self._stop.is_set():
+            try:
+                moved = migrate_batch(self.batch_size)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                repeated = repeated + 1 if error == last_error else 1
+                last_error = error
+                if repeated >= self.max_repeated_failures:
+                    print(f"Blob migration stopped after {repeated} identical failures; "
+                          f"run python -m database.blob_migrator once the cause is fixed.")
+                    return
+                self._stop.wait(min(self.retry_pause * 2 ** (repeated - 1), self.max_retry_pause))
+                continue
+            last_error, repeated = None, 0
+            if moved == 0:
+                try:
+                    collect_garbage()
+                except Exception:
+                    pass
+                return
+            self.moved += moved
+            self._stop.wait(self.pause)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=BATCH_PAUSE, help="Seconds between batches.")
+    parser.add_argument("--collect-garbage", action="store_true", help="Afterwards, delete blobs no file references any more.")
+    args = parser.parse_args()
+
+    try:
+        remaining = count_remaining()
+        print(f"{remaining} file(s) to migrate.")
+        moved = 0
+        started = time.perf_counter()
+        while True:
+            batch = migrate_batch(args.batch_size)
+            if batch == 0:
+                break
+            moved += batch
+            print(f"Migrated {moved}/{remaining}")
+            time.sleep(args.pause)
+        print(f"Done: {moved} file(s) in {time.perf_counter() - started:.1f}s.")
+        if args.collect_garbage:
+            print(f"Removed {collect_garbage()} unused blob(s).")
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import hashlib
+import io
+import mimetypes
+import os
+import tempfile
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from database.db_connection import pooled_connection
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Where blobs live. With several workstations this must be a shared folder so
+# every client can read what another uploaded.
+BLOB_ROOT = os.getenv("BLOB_STORE_DIR") or os.path.join(PROJECT_ROOT, "uploads", "blobs")
+
+CHUNK_SIZE = 1024 * 1024
+
+# Largest file a user may upload; bigger files are refused before or while they are copied.
+MAX_UPLOAD_SIZE = int(os.getenv("UPLOAD_MAX_MB", 100)) * 1024 * 1024
+
+# Unreferenced blobs are only removed after this long, so an upload racing the
+# collector can still claim them.
+GC_GRACE = timedelta(hours=1)
+
+# A blob written to the store's temp directory but not yet moved into place.
+StagedBlob = namedtuple("StagedBlob", ["content_hash", "size", "mime_type", "temp_path"])
+
+
+class FileTooLargeError(ValueError):
+    def __init__(self, limit):
+        super().__init__(f"File is larger than the {limit // (1024 * 1024)} MB upload limit.")
+        self.limit = limit
+
+
+def _source_size(source):
+    """
+    Size of a binary file object when it can be known up front (regular files), else None.
+    """
+    try:
+        return os.fstat(source.fileno()).st_size - source.tell()
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None
+
+
+def detect_mime_type(file_name, head):
+    """
+    Guesses a MIME type from the first bytes of the content, falling back to the file name.
+    """
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    return mimetypes.guess_type(file_name or "")[0] or "application/octet-stream"
+
+
+class BlobStore:
+    """
+    Content-addressed file store: each blob is saved once under its SHA-256,
+    sharded two levels deep (ab/cd/abcd...) to keep directories small.
+
+    Blobs are written to a temp file first and moved into place atomically, so
+    readers never see a partial blob. Which blobs are still in use is tracked
+    in the File_Blobs table (see register_blob and collect_garbage), not on disk.
+    """
+
+    def __init__(self, root=BLOB_ROOT):
+        self.root = root
+        self.temp_dir = os.path.join(root, "tmp")
+
+    def path_for(self, content_hash):
+        return os.path.join(self.root, content_hash[:2], content_hash[2:4], content_hash)
+
+    def exists(self, content_hash):
+        return os.path.exists(self.path_for(content_hash))
+
+    def stage(self, source, file_name=None, progress=None, max_size=None):
+        """
+        Copies a file (path or binary file object) into the temp directory in
+        CHUNK_SIZE pieces, hashing and measuring it in the same pass, so memory use
+        stays flat whatever the file size. Returns a StagedBlob for commit() or discard().
+
+        progress(bytes_copied, total_bytes) is called after every chunk; total_bytes
+        is None when the source size is not known in advance.
+        With max_size, FileTooLargeError is raised as soon as the file is known to
+        be bigger, and nothing is left behind.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                return self.stage(f, file_name or os.path.basename(source), progress, max_size)
+
+        total = _source_size(source)
+        if max_size is not None and total is not None and total > max_size:
+            raise FileTooLargeError(max_size)
+        return self.stage_chunks(iter(lambda: source.read(CHUNK_SIZE), b""), file_name, progress, max_size, total)
+
+    def stage_chunks(self, chunks, file_name=None, progress=None, max_size=None, total=None):
+        """
+        Like stage(), for content that arrives as an iterable of byte strings
+        (e.g. slices of a BYTEA column).
+        """
+        os.makedirs(self.temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        fd, temp_path = tempfile.mkstemp(dir=self.temp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in chunks:
+                    if not head:
+                        head = chunk[:16]
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise FileTooLargeError(max_size)
+                    digest.update(chunk)
+                    out.write(chunk)
+                    if progress is not None:
+                        progress(size, total)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        return StagedBlob(digest.hexdigest(), size, detect_mime_type(file_name, head), temp_path)
+
+    def stage_bytes(self, data, file_name=None):
+        return self.stage(io.BytesIO(data), file_name)
+
+    def commit(self, staged):
+        """
+        Moves a staged blob into place. If the same content is already stored the
+        staged copy is simply dropped. Returns the blob's path.
+        Call it only once the File_Blobs row from register_blob() is committed.
+        """
+        final_path = self.path_for(staged.content_hash)
+        if os.path.exists(final_path):
+            self.discard(staged)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(staged.temp_path, final_path)
+        return final_path
+
+    def discard(self, staged):
+        try:
+            os.remove(staged.temp_path)
+        except FileNotFoundError:
+            pass
+
+    def open(self, content_hash):
+        """
+        Opens a stored blob for binary reading.
+        """
+        return open(self.path_for(content_hash), "rb")
+
+    def remove(self, content_hash):
+        try:
+            os.remove(self.path_for(content_hash))
+        except FileNotFoundError:
+            pass
+
+    def sweep_temp(self, older_than=GC_GRACE):
+        """
+        Deletes temp files left behind by interrupted uploads. Returns how many were removed.
+        """
+        if not os.path.isdir(self.temp_dir):
+            return 0
+        cutoff = time.time() - older_than.total_seconds()
+        removed = 0
+        for name in os.listdir(self.temp_dir):
+            path = os.path.join(self.temp_dir, name)
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        return removed
+
+
+# Shared store used by database.queries.
+blob_store = BlobStore()
+
+
+def register_blob(cursor, staged):
+    """
+    Records a staged blob in File_Blobs, inside the caller's transaction. The
+    File_Blobs row is locked, so a concurrent collect_garbage() cannot delete
+    the blob before the commit. The caller then points an Event_Files row at
+    staged.content_hash (the refcount trigger counts that reference), commits,
+    and only then moves the blob into place with blob_store.commit(staged).
+    If the transaction rolls back instead, blob_store.discard(staged) leaves
+    nothing behind in the store.
+    """
+    cursor.execute("""
+        INSERT INTO File_Blobs (ContentHash, FileSize, MimeType)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (ContentHash) DO UPDATE SET ReleasedAt = NULL
+    """, (staged.content_hash, staged.size, staged.mime_type))
+
+
+def collect_garbage(store=blob_store, grace=GC_GRACE):
+    """
+    Deletes blobs that no Event_Files row has referenced for at least `grace`,
+    plus stale temp files. Returns the number of blobs removed.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            cursor.execute("""
+                DELETE FROM File_Blobs
+                WHERE RefCount = 0 AND ReleasedAt < CURRENT_TIMESTAMP - %s
+                RETURNING ContentHash
+            """, (grace,))
+            released = [row[0] for row in cursor.fetchall()]
+            # Unlink while the deleted rows are still locked: an upload of the same
+            # content waits for this commit and then writes the blob again.
+            for content_hash in released:
+                store.remove(content_hash)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print("Error collecting unused blobs:", e)
+            raise e
+    store.sweep_temp(grace)
+    return len(released)
@@ -0,0 +1,276 @@
+"""
+Listens for the change notifications published by the triggers in
+migrations/005_change_notifications.sql and evicts the affected event cache
+entries, so lists cached or rendered by one client do not go stale when
+another client writes.
+
+Run against a local database:
+
+    python -m database.change_listener              # print notifications as they arrive
+    python -m database.change_listener --self-test  # touch one event and wait for its notification
+"""
+import argparse
+import json
+import os
+import select
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import psycopg2
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db_connection import _connect_kwargs, pooled_connection, close_pool
+from database.availability import student_availability
+from database.venue_bookings import venue_bookings
+from database.event_cache import event_cache
+
+CHANNEL = "event_changes"
+# How long the listener thread blocks waiting for a notification before checking for stop().
+POLL_TIMEOUT = 1.0
+# Seconds to wait before reconnecting after the listening connection drops.
+RECONNECT_DELAY = 5.0
+
+# One changed row. The id/date fields are frozensets holding the old and new values.
+# op "RESYNC" (with table None) means notifications may have been missed, so
+# subscribers must treat everything as changed.
+ChangeNotification = namedtuple("ChangeNotification", ["table", "op", "event_ids", "user_ids", "dates", "file_ids"])
+
+RESYNC = ChangeNotification(None, "RESYNC", frozenset(), frozenset(), frozenset(), frozenset())
+
+
+def parse_notification(payload):
+    """
+    Parses a trigger payload into a ChangeNotification.
+    """
+    data = json.loads(payload)
+    return ChangeNotification(
+        data.get("table"),
+        data.get("op"),
+        frozenset(data.get("event_ids", ())),
+        frozenset(data.get("user_ids", ())),
+        frozenset(data.get("dates", ())),
+        frozenset(data.get("file_ids", ())),
+    )
+
+
+def _in_range(dates, start_date, end_date):
+    # Dates arrive as ISO strings, which sort like the dates themselves.
+    return any(str(start_date) <= day < str(end_date) for day in dates)
+
+
+def _is_affected(change, key, value):
+    """
+    Decides whether the cache entry (key, value) may be stale after the change.
+    Keys are (shape, query name, *arguments); see database.event_cache.
+    """
+    shape, args = key[0], key[2:]
+    if change.table == "events":
+        if shape == "all":
+            return True
+        if shape == "teacher":
+            return args[0] in change.user_ids
+        if shape == "date":
+            return str(args[0]) in change.dates
+        if shape == "range":
+            return _in_range(change.dates, args[0], args[1])
+        if shape == "student":
+            # Date-range lists end with (start, end); an event may have moved into the range.
+            if len(args) > 2 and _in_range(change.dates, args[1], args[2]):
+                return True
+            # Per-day lists only hold names, so match on the day; the rest list EventID first.
+            if len(args) > 1 and str(args[1]) in change.dates:
+                return True
+            return any(isinstance(row, tuple) and row[0] in change.event_ids for row in value)
+    elif change.table == "event_participation":
+        return shape == "student" and args[0] in change.user_ids
+    return False
+
+
+def evict_affected(change, cache=event_cache):
+    """
+    Evicts the cache entries a change touches. Returns the number evicted.
+    """
+    if change.op == "RESYNC":
+        cache.invalidate()
+        return None
+    return cache.evict(lambda key, value: _is_affected(change, key, value))
+
+
+class ChangeListener:
+    """
+    Consumes notifications on a dedicated connection (outside the pool, since
+    it is held for the life of the client) from a daemon thread.
+
+    Subscribers are called with each ChangeNotification on the listener thread,
+    so they must be thread-safe; Tk code should go through
+    BackgroundExecutor.watch_changes(). After a dropped connection the
+    listener reconnects and sends RESYNC, because notifications sent while it
+    was away are lost.
+    """
+
+    def __init__(self, channel=CHANNEL):
+        self.channel = channel
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.received = 0
+
+    def subscribe(self, callback):
+        """
+        Registers callback(notification). Returns a function that unsubscribes it.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="change-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(POLL_TIMEOUT * 2 if timeout is None else timeout)
+            self._thread = None
+
+    def _dispatch(self, notification):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(notification)
+            except Exception as e:
+                print("Error handling change notification:", e)
+
+    def _listen(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        while not self._stop.is_set():
+            if select.select([conn], [], [], POLL_TIMEOUT) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                try:
+                    notification = parse_notification(notify.payload)
+                except ValueError as e:
+                    print("Ignoring malformed change notification:", e)
+                    continue
+                self.received += 1
+                self._dispatch(notification)
+
+    def _run(self):
+        connected_before = False
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**_connect_kwargs())
+                conn.autocommit = True
+                if connected_before:
+                    self._dispatch(RESYNC)
+                connected_before = True
+                self._listen(conn)
+            except Exception as e:
+                print("Change listener connection lost:", e)
+                self._stop.wait(RECONNECT_DELAY)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+_listener = None
+
+
+def start_listener():
+    """
+    Starts the process-wide listener, wired to evict from the shared event cache,
+    the student availability cache and the venue bookings.
+    Returns the listener.
+    """
+    global _listener
+    if _listener is None:
+        _listener = ChangeListener()
+        _listener.subscribe(evict_affected)
+        _listener.subscribe(student_availability.apply_change)
+        _listener.subscribe(venue_bookings.apply_change)
+    _listener.start()
+    return _listener
+
+
+def get_listener():
+    """
+    Returns the process-wide listener, or None if start_listener() has not been called.
+    """
+    return _listener
+
+
+def stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def self_test(timeout=5.0):
+    """
+    Rewrites one event's name to itself, which fires the Events trigger without
+    changing data, and waits for the matching notification.
+    Returns True when it arrives within timeout seconds.
+    """
+    received = threading.Event()
+    listener = ChangeListener()
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT EventID FROM Events ORDER BY EventID LIMIT 1")
+        row = cursor.fetchone()
+    if row is None:
+        print("Self-test needs at least one row in Events.")
+        return False
+    event_id = row[0]
+    listener.subscribe(lambda n: n.table == "events" and event_id in n.event_ids and received.set())
+    listener.start()
+    try:
+        time.sleep(POLL_TIMEOUT)  # let the listener connect and LISTEN before writing
+        with pooled_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("UPDATE Events SET EventName = EventName WHERE EventID = %s", (event_id,))
+            conn.commit()
+        ok = received.wait(timeout)
+        print(f"Notification for {event_id}: {'received' if ok else 'NOT received'} (listener saw {listener.received})")
+        return ok
+    finally:
+        listener.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--self-test", action="store_true", help="Check the triggers end to end and exit.")
+    args = parser.parse_args()
+
+    try:
+        if args.self_test:
+            sys.exit(0 if self_test() else 1)
+        listener = ChangeListener()
+        listener.subscribe(print)
+        listener.start()
+        print(f"Listening on '{CHANNEL}'; press Ctrl+C to stop.")
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
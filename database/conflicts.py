@@ -0,0 +1,180 @@
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from database.db_connection import pooled_connection
+
+# A teacher or student may not be booked on two events less than this many days apart.
+BUFFER_DAYS = 3
+
+# person_id is booked on both event_id (at its proposed date) and conflicts_with (at conflict_date).
+Conflict = namedtuple("Conflict", ["person_id", "event_id", "conflicts_with", "conflict_date"])
+
+
+class IntervalTree:
+    """
+    Static interval tree over closed intervals [start, end] with a payload each.
+    Built once from a list of intervals; query() returns the payloads of every
+    interval overlapping the probe in O(log n + k).
+    """
+
+    class _Node:
+        __slots__ = ("start", "end", "payload", "max_end", "left", "right")
+
+        def __init__(self, start, end, payload):
+            self.start = start
+            self.end = end
+            self.payload = payload
+            self.max_end = end
+            self.left = None
+            self.right = None
+
+    def __init__(self, intervals=()):
+        ordered = sorted(intervals, key=lambda interval: interval[0])
+        self._root = self._build(ordered, 0, len(ordered))
+        self._size = len(ordered)
+
+    def __len__(self):
+        return self._size
+
+    def _build(self, ordered, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        start, end, payload = ordered[mid]
+        node = self._Node(start, end, payload)
+        node.left = self._build(ordered, lo, mid)
+        node.right = self._build(ordered, mid + 1, hi)
+        for child in (node.left, node.right):
+            if child is not None and child.max_end > node.max_end:
+                node.max_end = child.max_end
+        return node
+
+    def query(self, start, end):
+        """
+        Returns the payloads of all intervals overlapping [start, end].
+        """
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end < start:
+                continue
+            stack.append(node.left)
+            if node.start <= end:
+                if node.end >= start:
+                    found.append(node.payload)
+                stack.append(node.right)
+        return found
+
+
+def busy_interval(event_date):
+    """
+    Returns the interval an event occupies for conflict checks: [date, date + BUFFER_DAYS].
+    Two such intervals overlap exactly when the events are BUFFER_DAYS or less apart.
+    """
+    return event_date, event_date + timedelta(days=BUFFER_DAYS)
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), "%Y-%m-%d").date()
+
+
+def _fetch_schedules(cursor, event_ids, window_start, window_end):
+    """
+    Loads, in one round trip, who is attached to each moved event (its teacher and
+    participating students) and every event those people have inside the window.
+    Returns (members, schedules): members maps event_id -> set of person ids,
+    schedules maps person_id -> {event_id: event_date}.
+    """
+    query = """
+        WITH moved AS (
+            SELECT unnest(%s::VARCHAR[]) AS EventID
+        ),
+        people AS (
+            SELECT e.UserID AS PersonID, e.EventID AS MovedEventID
+            FROM Events e JOIN moved m ON m.EventID = e.EventID
+            WHERE e.UserID IS NOT NULL
+            UNION
+            SELECT ep.UserID, ep.EventID
+            FROM Event_Participation ep JOIN moved m ON m.EventID = ep.EventID
+        ),
+        persons AS (
+            SELECT DISTINCT PersonID FROM people
+        )
+        SELECT 'member', PersonID, MovedEventID, NULL::DATE FROM people
+        UNION ALL
+        SELECT 'booked', p.PersonID, e.EventID, e.EventDate
+        FROM persons p JOIN Events e ON e.UserID = p.PersonID
+        WHERE e.EventDate BETWEEN %s AND %s
+        UNION ALL
+        SELECT 'booked', p.PersonID, e.EventID, e.EventDate
+        FROM persons p
+        JOIN Event_Participation ep ON ep.UserID = p.PersonID
+        JOIN Events e ON e.EventID = ep.EventID
+        WHERE e.EventDate BETWEEN %s AND %s
+    """
+    cursor.execute(query, (list(event_ids), window_start, window_end, window_start, window_end))
+
+    members = {event_id: set() for event_id in event_ids}
+    schedules = {}
+    for kind, person_id, event_id, event_date in cursor.fetchall():
+        if kind == "member":
+            members[event_id].add(person_id)
+        else:
+            schedules.setdefault(person_id, {})[event_id] = event_date
+    return members, schedules
+
+
+def find_reschedule_conflicts(changes, cursor=None):
+    """
+    Checks a proposed reschedule against the 3-day rule for every person involved.
+    changes: {event_id: new_date} for one or more events moved together.
+    Only the event's own teacher and participating students are considered, so
+    unrelated events on nearby dates never block an edit.
+    Returns a list of Conflict tuples; an empty list means the reschedule is valid.
+    """
+    if not changes:
+        return []
+    changes = {event_id: _as_date(new_date) for event_id, new_date in changes.items()}
+    window_start = min(changes.values()) - timedelta(days=BUFFER_DAYS)
+    window_end = max(changes.values()) + timedelta(days=BUFFER_DAYS)
+
+    if cursor is not None:
+        members, schedules = _fetch_schedules(cursor, changes, window_start, window_end)
+    else:
+        with pooled_connection() as conn, conn.cursor() as own_cursor:
+            members, schedules = _fetch_schedules(own_cursor, changes, window_start, window_end)
+
+    # Apply the proposed dates, then build one interval tree per affected person.
+    for event_id, person_ids in members.items():
+        for person_id in person_ids:
+            schedules.setdefault(person_id, {})[event_id] = changes[event_id]
+    trees = {}
+    for person_id, bookings in schedules.items():
+        trees[person_id] = IntervalTree(
+            (*busy_interval(event_date), (event_id, event_date)) for event_id, event_date in bookings.items()
+        )
+
+    conflicts = []
+    for event_id, new_date in sorted(changes.items()):
+        start, end = busy_interval(new_date)
+        for person_id in sorted(members[event_id]):
+            for other_id, other_date in trees[person_id].query(start, end):
+                if other_id != event_id:
+                    conflicts.append(Conflict(person_id, event_id, other_id, other_date))
+    return conflicts
+
+
+def describe_conflicts(conflicts):
+    """
+    Formats conflicts as one line each for display in a message box.
+    """
+    return "\n".join(
+        f"{c.person_id} is already booked on {c.conflicts_with} ({c.conflict_date}), "
+        f"within {BUFFER_DAYS} days of {c.event_id}."
+        for c in conflicts
+    )
@@ -1,42 +1,148 @@
 import os
-import psycopg2
+import threading
+from contextlib import contextmanager
+
+from psycopg2 import pool
 from dotenv import load_dotenv
 
+from database.query_stats import QUERY_STATS_ENABLED, InstrumentedCursor, configure_logging
+
 # Load environment variables from .env file
 dotenv_path = os.path.join(os.path.dirname(__file__), '..', '.env')  # Adjust the path if needed
 load_dotenv(dotenv_path)
 
-def get_connection():
+# Pool sizing can be tuned from .env; the defaults suit a single desktop client.
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX", "5"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_slots = None
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
+
+
+def _connect_kwargs():
+    """
+    Reads the database credentials from .env and returns them as psycopg2 keyword arguments.
+    """
+    db_host = os.getenv("DB_HOST")
+    db_name = os.getenv("DB_NAME")
+    db_user = os.getenv("DB_USER")
+    db_pass = os.getenv("DB_PASS")
+
+    if not all([db_host, db_name, db_user, db_pass]):
+        raise EnvironmentError("Some database credentials are missing from the .env file.")
+
+    kwargs = {"host": db_host, "database": db_name, "user": db_user, "password": db_pass}
+    if os.getenv("DB_PORT"):
+        kwargs["port"] = os.getenv("DB_PORT")
+    return kwargs
+
+
+def init_pool(min_size=None, max_size=None):
+    """
+    Creates the process-wide connection pool. Called lazily by get_connection(),
+    but may be called up front to open the minimum number of connections at startup.
+    Unless DB_QUERY_STATS=0, its cursors report every statement to query_stats.
+    """
+    global _pool, _pool_slots
+    with _pool_lock:
+        if _pool is None:
+            min_size = POOL_MIN_SIZE if min_size is None else min_size
+            max_size = POOL_MAX_SIZE if max_size is None else max_size
+            connect_kwargs = _connect_kwargs()
+            if QUERY_STATS_ENABLED:
+                configure_logging()
+                connect_kwargs["cursor_factory"] = InstrumentedCursor
+            try:
+                _pool = pool.ThreadedConnectionPool(min_size, max_size, **connect_kwargs)
+            except Exception as e:
+                print("Error connecting to PostgreSQL database:", e)
+                raise e
+            # ThreadedConnectionPool fails immediately when exhausted; the semaphore
+            # lets callers wait up to the checkout timeout for a connection instead.
+            _pool_slots = threading.BoundedSemaphore(max_size)
+            print("Successfully connected to the database.")
+        return _pool
+
+
+def get_connection(timeout=None):
     """
-    Establishes and returns a connection to the PostgreSQL database.
+    Checks out a connection to the PostgreSQL database from the shared pool.
     Database: Event_Management
+    The connection must be handed back with release_connection() (or use pooled_connection()).
     """
+    db_pool = init_pool()
+    timeout = POOL_TIMEOUT if timeout is None else timeout
+    if not _pool_slots.acquire(timeout=timeout):
+        raise PoolTimeoutError(f"No database connection became available within {timeout} seconds.")
     try:
-        # Fetch credentials from .env
-        db_host = os.getenv("DB_HOST")
-        db_name = os.getenv("DB_NAME")
-        db_user = os.getenv("DB_USER")
-        db_pass = os.getenv("DB_PASS")
-
-        if not all([db_host, db_name, db_user, db_pass]):
-            raise EnvironmentError("Some database credentials are missing from the .env file.")
-
-        conn = psycopg2.connect(
-            host=db_host,
-            database=db_name,
-            user=db_user,
-            password=db_pass
-        )
-        print("Successfully connected to the database.")
+        conn = db_pool.getconn()
+        if conn.closed:
+            # Server dropped the connection while it sat idle; replace it.
+            db_pool.putconn(conn, close=True)
+            conn = db_pool.getconn()
         return conn
-    except Exception as e:
-        print("Error connecting to PostgreSQL database:", e)
-        raise e
+    except Exception:
+        _pool_slots.release()
+        raise
+
+
+def release_connection(conn):
+    """
+    Returns a connection obtained from get_connection() to the pool.
+    Any transaction left open is rolled back so the next borrower starts clean;
+    a connection that cannot be rolled back is closed instead of being reused.
+    """
+    if _pool is None or conn is None:
+        return
+    rollback_failed = False
+    try:
+        if not conn.closed:
+            try:
+                conn.rollback()
+            except Exception:
+                # The server went away mid-transaction; the pool must still drop it.
+                rollback_failed = True
+        _pool.putconn(conn, close=bool(conn.closed) or rollback_failed)
+    finally:
+        _pool_slots.release()
+
+
+@contextmanager
+def pooled_connection(timeout=None):
+    """
+    Context manager that borrows a pooled connection for the duration of the block.
+    Uncommitted work is rolled back when the block exits; callers commit explicitly.
+    """
+    conn = get_connection(timeout)
+    try:
+        yield conn
+    finally:
+        release_connection(conn)
+
+
+def close_pool():
+    """
+    Closes every connection held by the pool. Called when the application exits.
+    """
+    global _pool, _pool_slots
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            _pool_slots = None
+
 
 if __name__ == "__main__":
-    # Test the connection by calling get_connection()
+    # Test the connection by borrowing one from the pool
     try:
-        conn = get_connection()
-        conn.close()
+        with pooled_connection() as conn:
+            pass
+        close_pool()
     except Exception as e:
         print("Database connection test failed:", e)
@@ -0,0 +1,244 @@
+import hashlib
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from database import queries
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DOWNLOAD_DIR = os.path.join(PROJECT_ROOT, "downloads")
+
+# Total size of downloaded files kept; least recently opened ones are removed beyond it.
+DOWNLOAD_CACHE_SIZE = int(os.getenv("DOWNLOAD_CACHE_MB", 500)) * 1024 * 1024
+
+_HASH_NAME = re.compile(r"^[0-9a-f]{64}$")
+
+
+class HashMismatchError(ValueError):
+    pass
+
+
+class DownloadCache:
+    """
+    Local copies of downloaded files, keyed by content hash: downloads/<hash>/<file name>.
+
+    A file whose hash is known (see queries.fetch_event_files) is opened straight from
+    the cache without asking the database. Misses are copied in chunks into a temp
+    file before the call returns (so no pooled connection waits on a slow reader),
+    checked against the hash and then moved into place, so a half-written or
+    corrupted download is never served. Identical content under another name is
+    hard-linked rather than copied.
+
+    Entries are evicted least-recently-opened first once the cache outgrows max_bytes.
+    Methods are safe to call from worker threads.
+    """
+
+    def __init__(self, root=DOWNLOAD_DIR, max_bytes=DOWNLOAD_CACHE_SIZE):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = None  # content hash -> size, least recently used first
+        self._lock = threading.Lock()
+        self._prefetch_queue = queue.SimpleQueue()
+        self._prefetcher = None
+
+    def lookup(self, content_hash, file_name):
+        """
+        Returns the local path of a cached file under file_name, or None on a miss.
+        """
+        if not content_hash:
+            return None
+        entry_dir = os.path.join(self.root, content_hash)
+        with self._lock:
+            entries = self._load()
+            if content_hash not in entries:
+                return None
+            path = os.path.join(entry_dir, _safe_name(file_name))
+            try:
+                if not os.path.exists(path):
+                    _link_or_copy(_any_file(entry_dir), path)
+                if os.path.getsize(path) != entries[content_hash]:
+                    raise OSError("size changed")
+            except OSError:
+                # Removed or damaged on disk: forget it and download again.
+                del entries[content_hash]
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                return None
+            entries.move_to_end(content_hash)
+            os.utime(entry_dir)
+            self.hits += 1
+            return path
+
+    def fetch(self, file_id, content_hash=None, file_name=None):
+        """
+        Returns the local path of a file, downloading it on a miss, or None if the
+        file does not exist. Pass the hash and name from the file listing to skip
+        the database entirely on a hit.
+        """
+        if content_hash and file_name:
+            path = self.lookup(content_hash, file_name)
+            if path is not None:
+                return path
+        hit = None
+
+        def cached(listed_name, listed_hash):
+            nonlocal hit
+            hit = self.lookup(listed_hash, listed_name)
+            return hit is not None
+
+        os.makedirs(self.root, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                out = _HashingWriter(f)
+                result = queries.copy_file_content(file_id, out, cached)
+            if result is None:
+                return None
+            if hit is not None:
+                return hit
+            self.misses += 1
+            return self._store(temp_path, out, *result)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def prefetch(self, files):
+        """
+        Downloads files in the background, one at a time, skipping cached ones.
+        files is an iterable of (file_id, content_hash, file_name). Errors are ignored;
+        the file is simply fetched again when it is opened.
+        """
+        for item in files:
+            self._prefetch_queue.put(item)
+        with self._lock:
+            if self._prefetcher is None or not self._prefetcher.is_alive():
+                self._prefetcher = threading.Thread(target=self._run_prefetch, name="download-prefetch", daemon=True)
+                self._prefetcher.start()
+
+    def stats(self):
+        with self._lock:
+            entries = self._load()
+            return {"entries": len(entries), "bytes": sum(entries.values()),
+                    "hits": self.hits, "misses": self.misses}
+
+    # ---- internals ----
+
+    def _run_prefetch(self):
+        while True:
+            try:
+                file_id, content_hash, file_name = self._prefetch_queue.get(timeout=1)
+            except queue.Empty:
+                return
+            try:
+                if self.lookup(content_hash, file_name) is None:
+                    self.fetch(file_id)
+            except Exception as e:
+                print(f"Error prefetching file {file_id}:", e)
+
+    def _load(self):
+        """
+        Builds the entry index from disk on first use. Caller holds the lock.
+        """
+        if self._entries is None:
+            found = []
+            if os.path.isdir(self.root):
+                for name in os.listdir(self.root):
+                    entry_dir = os.path.join(self.root, name)
+                    if _HASH_NAME.match(name) and os.path.isdir(entry_dir):
+                        try:
+                            found.append((os.path.getmtime(entry_dir), name, os.path.getsize(_any_file(entry_dir))))
+                        except OSError:
+                            shutil.rmtree(entry_dir, ignore_errors=True)
+            self._entries = OrderedDict((name, size) for _, name, size in sorted(found))
+        return self._entries
+
+    def _store(self, temp_path, written, file_name, expected_hash):
+        """
+        Moves a downloaded temp file into the cache once its hash checks out.
+        """
+        content_hash = written.digest.hexdigest()
+        if expected_hash is not None and content_hash != expected_hash.strip():
+            raise HashMismatchError(f"Downloaded '{file_name}' does not match its stored hash.")
+
+        entry_dir = os.path.join(self.root, content_hash)
+        path = os.path.join(entry_dir, _safe_name(file_name))
+        with self._lock:
+            os.makedirs(entry_dir, exist_ok=True)
+            os.replace(temp_path, path)
+            entries = self._load()
+            entries[content_hash] = written.size
+            entries.move_to_end(content_hash)
+            self._evict(keep=content_hash)
+        return path
+
+    def _evict(self, keep):
+        """
+        Drops least recently used entries until the cache fits. Caller holds the lock.
+        """
+        total = sum(self._entries.values())
+        for content_hash in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            if content_hash == keep:
+                continue
+            entry_dir = os.path.join(self.root, content_hash)
+            try:
+                shutil.rmtree(entry_dir)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                # Still open in a viewer (Windows); try again on a later eviction.
+                continue
+            total -= self._entries.pop(content_hash)
+
+
+class _HashingWriter:
+    """
+    Binary file wrapper that hashes and counts what is written through it.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.digest.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+    def seek(self, offset):
+        # Only rewinding to the start is supported, to restart a download.
+        self.f.seek(offset)
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def truncate(self):
+        return self.f.truncate()
+
+
+def _safe_name(file_name):
+    return os.path.basename(file_name or "") or "download"
+
+
+def _any_file(entry_dir):
+    for name in os.listdir(entry_dir):
+        return os.path.join(entry_dir, name)
+    raise FileNotFoundError(entry_dir)
+
+
+def _link_or_copy(source, target):
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+# Shared cache used by the teacher dashboard.
+download_cache = DownloadCache()
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+# Cache tuning can be set from .env; entries live at most EVENT_CACHE_TTL seconds.
+CACHE_TTL = float(os.getenv("EVENT_CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("EVENT_CACHE_SIZE", "256"))
+
+# Query shapes the cache knows about. Every cached entry belongs to exactly one.
+SHAPES = ("all", "teacher", "student", "date", "range")
+
+
+class EventCache:
+    """
+    In-process read-through cache for event queries.
+
+    Entries are keyed by (shape, query name, arguments), expire after `ttl`
+    seconds and are evicted least-recently-used once more than `max_entries`
+    are held. Writes to events must call invalidate(); a load that was already
+    running when the cache was invalidated does not store its (possibly stale)
+    result.
+    Safe to use from the dashboard worker threads.
+    """
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key, loader):
+        """
+        Returns the cached value for key, or calls loader() and caches its result.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, *shapes):
+        """
+        Drops cached entries of the given shapes, or every entry when no shape is given.
+        """
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if not shapes:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] in shapes]:
+                del self._entries[key]
+
+    def evict(self, predicate):
+        """
+        Drops only the entries for which predicate(key, value) is true.
+        Returns the number of entries dropped.
+        """
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, (_, value) in self._entries.items() if predicate(key, value)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += 1
+            return len(stale)
+
+    def cached(self, shape):
+        """
+        Decorator caching a query function's result under the given shape.
+        The function's arguments become part of the key, so they must be hashable.
+        """
+        if shape not in SHAPES:
+            raise ValueError(f"Unknown event cache shape: {shape}")
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args):
+                value = self.get_or_load((shape, func.__name__) + args, lambda: tuple(func(*args)))
+                # Hand out a fresh list so callers cannot mutate the cached rows.
+                return list(value)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        """
+        Returns the hit/miss counters and current size as a dict.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+            }
+
+
+# Shared cache used by database.queries.
+event_cache = EventCache()
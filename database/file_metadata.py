@@ -0,0 +1,143 @@
+"""
+File metadata kept on Event_Files (ContentHash, FileSize, MimeType, PageCount)
+so file listings are answered from a few columns and never read file contents.
+
+describe() captures the metadata of a staged upload before it is recorded.
+backfill() fills in PageCount for files stored before it was tracked; rows
+still holding BYTEA content get theirs from database/blob_migrator.py as they
+are moved into the blob store.
+
+Usage:
+    python -m database.file_metadata [--batch-size 200]
+"""
+import argparse
+import mimetypes
+import mmap
+import os
+import re
+import sys
+import zlib
+from collections import namedtuple
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db_connection import pooled_connection, close_pool
+from database.blob_store import blob_store
+
+BATCH_SIZE = 200
+
+PDF_MIME_TYPE = "application/pdf"
+
+FileMetadata = namedtuple("FileMetadata", ["content_hash", "size", "mime_type", "page_count"])
+
+# Short labels for the Format column; other types fall back to their usual extension.
+FORMAT_LABELS = {PDF_MIME_TYPE: "PDF", "application/octet-stream": "File"}
+
+# The /Pages tree nodes carry the number of pages below them; the root has the largest.
+_PAGES_COUNT = re.compile(rb"/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b")
+# PDF 1.5+ may hide the page tree inside compressed object streams.
+_OBJECT_STREAM = re.compile(rb"/Type\s*/ObjStm\b[^>]*>>\s*stream\r?\n")
+
+
+def format_label(mime_type):
+    if not mime_type:
+        return "File"
+    if mime_type in FORMAT_LABELS:
+        return FORMAT_LABELS[mime_type]
+    extension = mimetypes.guess_extension(mime_type)
+    return extension.lstrip(".").upper() if extension else "File"
+
+
+def _max_count(data):
+    counts = [int(a or b) for a, b in _PAGES_COUNT.findall(data)]
+    return max(counts) if counts else None
+
+
+def count_pdf_pages(path):
+    """
+    Reads the page count from a PDF's page tree without loading the file into memory.
+    Returns None when the file is not a PDF or no page tree is found.
+    """
+    if os.path.getsize(path) == 0:
+        return None
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data[:5] != b"%PDF-":
+            return None
+        count = _max_count(data)
+        if count is not None:
+            return count
+        for match in _OBJECT_STREAM.finditer(data):
+            end = data.find(b"endstream", match.end())
+            if end < 0:
+                continue
+            try:
+                # decompressobj tolerates the line break before endstream.
+                count = _max_count(zlib.decompressobj().decompress(data[match.end():end]))
+            except zlib.error:
+                continue
+            if count is not None:
+                return count
+    return None
+
+
+def describe(staged):
+    """
+    Metadata for a blob staged with BlobStore.stage(); call before it is committed.
+    """
+    page_count = count_pdf_pages(staged.temp_path) if staged.mime_type == PDF_MIME_TYPE else None
+    return FileMetadata(staged.content_hash, staged.size, staged.mime_type, page_count)
+
+
+def backfill(batch_size=BATCH_SIZE, store=blob_store):
+    """
+    Sets PageCount on stored PDFs that lack it, one short transaction per batch.
+    Files whose page count cannot be read keep NULL and are retried on the next run.
+    Returns the number of rows updated.
+    """
+    updated = 0
+    last_file_id = ""
+    while True:
+        with pooled_connection() as conn, conn.cursor() as cursor:
+            try:
+                cursor.execute("""
+                    SELECT FileID, ContentHash
+                    FROM Event_Files
+                    WHERE PageCount IS NULL AND MimeType = %s AND ContentHash IS NOT NULL
+                      AND FileID > %s
+                    ORDER BY FileID
+                    LIMIT %s
+                """, (PDF_MIME_TYPE, last_file_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    return updated
+                last_file_id = rows[-1][0]
+
+                page_counts = []
+                for file_id, content_hash in rows:
+                    if store.exists(content_hash):
+                        page_count = count_pdf_pages(store.path_for(content_hash))
+                        if page_count is not None:
+                            page_counts.append((page_count, file_id))
+                cursor.executemany("UPDATE Event_Files SET PageCount = %s WHERE FileID = %s", page_counts)
+                conn.commit()
+                updated += len(page_counts)
+            except Exception as e:
+                conn.rollback()
+                print("Error backfilling file metadata:", e)
+                raise e
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    try:
+        print(f"Set the page count of {backfill(args.batch_size)} file(s).")
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
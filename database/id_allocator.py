@@ -0,0 +1,44 @@
+from database.db_connection import pooled_connection
+
+# Maps each ID kind to its Postgres sequence (see migrations/001_id_sequences.sql)
+# and the display format used throughout the application.
+ID_FORMATS = {
+    "event": ("event_id_seq", "EID{:02d}"),
+    "file": ("file_id_seq", "FILEID-{:03d}"),
+    "feedback": ("feedback_id_seq", "FEEDBACK{:02d}"),
+}
+
+
+def _reserve(cursor, sequence, count):
+    cursor.execute("SELECT nextval(%s) FROM generate_series(1, %s)", (sequence, count))
+    return sorted(row[0] for row in cursor.fetchall())
+
+
+def allocate_ids(kind, count=1, cursor=None):
+    """
+    Reserves `count` new IDs of the given kind in one round trip.
+    kind: 'event', 'file' or 'feedback'.
+    Returns the formatted IDs, e.g. ['EID07', 'EID08'].
+    Sequence values are never reused, so concurrent clients cannot collide; a
+    rolled-back insert simply leaves a gap.
+    """
+    if kind not in ID_FORMATS:
+        raise ValueError(f"Unknown ID kind: {kind}")
+    if count < 1:
+        return []
+
+    sequence, id_format = ID_FORMATS[kind]
+    if cursor is not None:
+        numbers = _reserve(cursor, sequence, count)
+    else:
+        with pooled_connection() as conn, conn.cursor() as own_cursor:
+            numbers = _reserve(own_cursor, sequence, count)
+            conn.commit()
+    return [id_format.format(number) for number in numbers]
+
+
+def allocate_id(kind, cursor=None):
+    """
+    Reserves a single ID of the given kind. See allocate_ids().
+    """
+    return allocate_ids(kind, 1, cursor)[0]
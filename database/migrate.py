@@ -0,0 +1,118 @@
+import os
+import re
+import sys
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.db_connection import pooled_connection, close_pool
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+# Files whose first line is this marker run statement-by-statement in autocommit mode.
+# Needed for statements such as CREATE INDEX CONCURRENTLY that refuse to run in a transaction.
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+
+
+def list_migrations():
+    """
+    Returns (version, path) pairs for every migration file, ordered by version.
+    Migration files are named NNN_description.sql.
+    """
+    migrations = []
+    for file_name in os.listdir(MIGRATIONS_DIR):
+        match = re.match(r"^(\d+)_.*\.sql$", file_name)
+        if match:
+            migrations.append((match.group(1), os.path.join(MIGRATIONS_DIR, file_name)))
+    return sorted(migrations)
+
+
+def _split_statements(sql):
+    """
+    Splits a no-transaction migration into individual statements.
+    Statements end with ';' at the end of a line; a ';' inside a $$-quoted
+    body (e.g. a DO block) does not end the statement.
+    """
+    statements, current, quoted = [], [], False
+    for line in sql.splitlines(keepends=True):
+        current.append(line)
+        quoted ^= line.count("$$") % 2 == 1
+        if not quoted and re.search(r";\s*$", line):
+            statements.append("".join(current).rstrip().rstrip(";"))
+            current = []
+    statements.append("".join(current))
+    return [s.strip() for s in statements if s.strip() and not _is_comment_only(s)]
+
+
+def _is_comment_only(statement):
+    return all(not line.strip() or line.strip().startswith("--") for line in statement.splitlines())
+
+
+def applied_versions(cursor):
+    """
+    Returns the set of migration versions already recorded in schema_migrations.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            Version VARCHAR(10) PRIMARY KEY,
+            AppliedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT Version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_migration(conn, version, path):
+    """
+    Applies one migration file and records it in schema_migrations.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        sql = f.read()
+
+    if sql.startswith(NO_TRANSACTION_MARKER):
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                for statement in _split_statements(sql):
+                    cursor.execute(statement)
+                cursor.execute("INSERT INTO schema_migrations (Version) VALUES (%s)", (version,))
+        finally:
+            conn.autocommit = False
+    else:
+        with conn.cursor() as cursor:
+            cursor.execute(sql)
+            cursor.execute("INSERT INTO schema_migrations (Version) VALUES (%s)", (version,))
+        conn.commit()
+
+
+def migrate():
+    """
+    Applies every pending migration in version order.
+    Returns the list of versions that were applied.
+    """
+    applied = []
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            done = applied_versions(cursor)
+        conn.commit()
+
+        for version, path in list_migrations():
+            if version in done:
+                continue
+            try:
+                apply_migration(conn, version, path)
+                print(f"Applied migration {os.path.basename(path)}")
+                applied.append(version)
+            except Exception as e:
+                conn.rollback()
+                print(f"Error applying migration {os.path.basename(path)}:", e)
+                raise e
+    return applied
+
+
+if __name__ == "__main__":
+    try:
+        if not migrate():
+            print("Database schema is up to date.")
+    finally:
+        close_pool()
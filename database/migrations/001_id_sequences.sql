@@ -0,0 +1,28 @@
+-- Sequence-backed ID allocation for Events, Event_Files and Feedback.
+-- Replaces the SELECT MAX(...) scans used to generate IDs; the display
+-- formats (EIDxx, FILEID-xxx, FEEDBACKxx) are applied in database/id_allocator.py.
+
+CREATE SEQUENCE IF NOT EXISTS event_id_seq;
+CREATE SEQUENCE IF NOT EXISTS file_id_seq;
+CREATE SEQUENCE IF NOT EXISTS feedback_id_seq;
+
+-- Start each sequence after the highest number already in use. The numeric
+-- suffix is compared as an integer so EID100 sorts after EID99.
+SELECT setval('event_id_seq',
+              COALESCE((SELECT MAX(substring(EventID FROM '[0-9]+$')::INT) FROM Events), 0) + 1,
+              false);
+SELECT setval('file_id_seq',
+              COALESCE((SELECT MAX(substring(FileID FROM '[0-9]+$')::INT) FROM Event_Files), 0) + 1,
+              false);
+SELECT setval('feedback_id_seq',
+              COALESCE((SELECT MAX(substring(FeedbackID FROM '[0-9]+$')::INT) FROM Feedback), 0) + 1,
+              false);
+
+-- FILEID-1000 and FEEDBACK100 no longer fit in CHAR(10); widen the ID columns
+-- so the formats keep working past their zero-padded width.
+ALTER TABLE Feedback ALTER COLUMN FileID TYPE VARCHAR(20) USING RTRIM(FileID);
+ALTER TABLE Event_Files ALTER COLUMN FileID TYPE VARCHAR(20) USING RTRIM(FileID);
+ALTER TABLE Feedback ALTER COLUMN FeedbackID TYPE VARCHAR(20) USING RTRIM(FeedbackID);
+ALTER TABLE Events ALTER COLUMN EventID TYPE VARCHAR(20);
+ALTER TABLE Event_Participation ALTER COLUMN EventID TYPE VARCHAR(20);
+ALTER TABLE Event_Files ALTER COLUMN EventID TYPE VARCHAR(20);
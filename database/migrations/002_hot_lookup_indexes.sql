@@ -0,0 +1,48 @@
+-- migrate:no-transaction
+-- Indexes for the lookups every dashboard screen runs, plus a composite unique
+-- key on Event_Participation(EventID, UserID).
+--
+-- Index builds use CONCURRENTLY so writes keep flowing during the migration.
+-- If a build is interrupted, Postgres leaves an INVALID index behind; drop it
+-- and re-run `python -m database.migrate`.
+
+-- A student can only be assigned to an event once. Remove any duplicates
+-- that slipped in before the key existed, keeping one row per pair.
+DELETE FROM Event_Participation a
+USING Event_Participation b
+WHERE a.ctid < b.ctid
+  AND a.EventID = b.EventID
+  AND a.UserID = b.UserID;
+
+-- The unique index also serves every join and delete by EventID (leading column).
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS event_participation_event_user_key
+    ON Event_Participation (EventID, UserID);
+-- Guarded so the file can be re-run after a later statement fails.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'event_participation_event_user_key') THEN
+        ALTER TABLE Event_Participation
+            ADD CONSTRAINT event_participation_event_user_key
+            UNIQUE USING INDEX event_participation_event_user_key;
+    END IF;
+END $$;
+
+-- Student screens filter participation by UserID.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS event_participation_user_idx
+    ON Event_Participation (UserID);
+
+-- Calendar clicks and the 3-day availability window filter by EventDate.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS events_date_idx
+    ON Events (EventDate);
+
+-- Teacher screens list a teacher's events, often ordered or windowed by date.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS events_user_date_idx
+    ON Events (UserID, EventDate);
+
+-- TeacherDashboard.load_files and StudentDashboard.load_feedback.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS event_files_event_user_idx
+    ON Event_Files (EventID, UserID);
+
+-- Feedback is always reached through its file.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS feedback_file_idx
+    ON Feedback (FileID);
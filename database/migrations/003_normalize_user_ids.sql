@@ -0,0 +1,18 @@
+-- Normalize every UserID column to trimmed VARCHAR(10).
+--
+-- Users.UserID was CHAR(10), so IDs came back blank-padded ('BSSTUDE06 ')
+-- while Event_Participation.UserID was VARCHAR(10). The student screens
+-- papered over the mismatch with TRIM(LOWER(ep.UserID)) = LOWER(TRIM(%s)),
+-- which no index can serve. With one type and no padding the lookups become
+-- plain equality probes on event_participation_user_idx.
+
+ALTER TABLE Users ALTER COLUMN UserID TYPE VARCHAR(10) USING BTRIM(UserID);
+ALTER TABLE Students ALTER COLUMN UserID TYPE VARCHAR(10) USING BTRIM(UserID);
+ALTER TABLE Teachers ALTER COLUMN UserID TYPE VARCHAR(10) USING BTRIM(UserID);
+ALTER TABLE Events ALTER COLUMN UserID TYPE VARCHAR(10) USING BTRIM(UserID);
+ALTER TABLE Event_Participation ALTER COLUMN UserID TYPE VARCHAR(10) USING BTRIM(UserID);
+ALTER TABLE Event_Files ALTER COLUMN UserID TYPE VARCHAR(10) USING BTRIM(UserID);
+ALTER TABLE Feedback ALTER COLUMN UserID TYPE VARCHAR(10) USING BTRIM(UserID);
+
+-- Keep it that way: writers must store trimmed IDs (see queries.normalize_user_id).
+ALTER TABLE Users ADD CONSTRAINT users_userid_trimmed CHECK (UserID = BTRIM(UserID));
@@ -0,0 +1,37 @@
+-- Model the 3-day teacher buffer as a date range per event and let the
+-- database reject double-booking.
+--
+-- Each event occupies [EventDate, EventDate + 3] for its teacher. Two such
+-- ranges overlap exactly when the events are 3 days or less apart, so the
+-- buffer rule becomes a plain range-overlap test that a GiST index can answer.
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE Events
+    ADD COLUMN BusyRange DATERANGE
+    GENERATED ALWAYS AS (daterange(EventDate, EventDate + 3, '[]')) STORED;
+
+-- The exclusion constraint cannot be added while violations exist; name them
+-- so they can be rescheduled or reassigned before re-running the migration.
+DO $$
+DECLARE
+    clashes TEXT;
+BEGIN
+    SELECT string_agg(a.EventID || '/' || b.EventID || ' (' || a.UserID || ')', ', ')
+    INTO clashes
+    FROM Events a
+    JOIN Events b ON a.UserID = b.UserID
+                 AND a.EventID < b.EventID
+                 AND a.BusyRange && b.BusyRange;
+    IF clashes IS NOT NULL THEN
+        RAISE EXCEPTION 'Teachers already double-booked within 3 days: %', clashes;
+    END IF;
+END $$;
+
+-- Backed by a GiST index on (UserID, BusyRange), which also serves the
+-- availability anti-join in queries.fetch_available_teachers_for_date.
+-- Concurrent inserts that would double-book a teacher fail with an
+-- exclusion_violation instead of racing past an application-side check.
+ALTER TABLE Events
+    ADD CONSTRAINT events_teacher_no_overlap
+    EXCLUDE USING gist (UserID WITH =, BusyRange WITH &&);
@@ -0,0 +1,66 @@
+-- Publish a compact notification on channel 'event_changes' for every row
+-- written to Events, Event_Participation, Event_Files and Feedback, so each
+-- client can evict just the cached and rendered entries a change touches.
+--
+-- Payload (JSON, keys with no values omitted):
+--   {"table": "events", "op": "UPDATE",
+--    "event_ids": [...], "user_ids": [...], "dates": [...], "file_ids": [...]}
+-- Each list holds the distinct values from the old and new row, so a
+-- reschedule reports both the old and the new EventDate. user_ids is the
+-- teacher for Events and the student (or reviewing teacher) elsewhere.
+-- NOTIFY is transactional: nothing is sent for rolled-back writes, and
+-- identical payloads within one transaction are collapsed.
+
+-- Trigger arguments pair payload keys with the column that feeds them, so
+-- only those columns are read; FileContent is never serialised.
+CREATE OR REPLACE FUNCTION notify_event_change() RETURNS trigger AS $$
+DECLARE
+    payload JSONB := jsonb_build_object('table', lower(TG_TABLE_NAME), 'op', TG_OP);
+    vals TEXT[];
+    v TEXT;
+    i INT := 0;
+BEGIN
+    WHILE i < TG_NARGS LOOP
+        vals := '{}';
+        IF TG_OP <> 'DELETE' THEN
+            EXECUTE format('SELECT ($1).%I::TEXT', TG_ARGV[i + 1]) INTO v USING NEW;
+            IF v IS NOT NULL THEN
+                vals := vals || v;
+            END IF;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            EXECUTE format('SELECT ($1).%I::TEXT', TG_ARGV[i + 1]) INTO v USING OLD;
+            IF v IS NOT NULL AND NOT v = ANY(vals) THEN
+                vals := vals || v;
+            END IF;
+        END IF;
+        IF cardinality(vals) > 0 THEN
+            payload := payload || jsonb_build_object(TG_ARGV[i], to_jsonb(vals));
+        END IF;
+        i := i + 2;
+    END LOOP;
+
+    PERFORM pg_notify('event_changes', payload::TEXT);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER events_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON Events
+    FOR EACH ROW EXECUTE FUNCTION notify_event_change(
+        'event_ids', 'eventid', 'user_ids', 'userid', 'dates', 'eventdate');
+
+CREATE TRIGGER event_participation_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON Event_Participation
+    FOR EACH ROW EXECUTE FUNCTION notify_event_change(
+        'event_ids', 'eventid', 'user_ids', 'userid');
+
+CREATE TRIGGER event_files_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON Event_Files
+    FOR EACH ROW EXECUTE FUNCTION notify_event_change(
+        'event_ids', 'eventid', 'user_ids', 'userid', 'file_ids', 'fileid');
+
+CREATE TRIGGER feedback_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON Feedback
+    FOR EACH ROW EXECUTE FUNCTION notify_event_change(
+        'user_ids', 'userid', 'file_ids', 'fileid');
@@ -0,0 +1,56 @@
+-- Move file contents out of Event_Files.FileContent into the content-addressed
+-- blob store (database/blob_store.py). Rows keep only the SHA-256 of their
+-- content plus its size and MIME type; identical uploads share one blob.
+--
+-- File_Blobs has one row per stored blob. RefCount is kept by a trigger on
+-- Event_Files, so every client sees the same count. A blob whose count drops
+-- to zero gets a ReleasedAt timestamp; blob_store.collect_garbage() removes it
+-- once it has stayed unreferenced for a grace period.
+--
+-- Existing BYTEA rows are moved by database/blob_migrator.py in batches;
+-- FileContent stays readable until then.
+
+CREATE TABLE File_Blobs (
+    ContentHash CHAR(64) PRIMARY KEY,
+    FileSize BIGINT NOT NULL CHECK (FileSize >= 0),
+    MimeType VARCHAR(100) NOT NULL,
+    RefCount INTEGER NOT NULL DEFAULT 0 CHECK (RefCount >= 0),
+    CreatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ReleasedAt TIMESTAMP
+);
+
+ALTER TABLE Event_Files
+    ADD COLUMN ContentHash CHAR(64) REFERENCES File_Blobs(ContentHash),
+    ADD COLUMN FileSize BIGINT,
+    ADD COLUMN MimeType VARCHAR(100);
+
+CREATE INDEX event_files_content_hash_idx ON Event_Files (ContentHash);
+
+-- Partial index the migrator walks to find rows still holding BYTEA content.
+CREATE INDEX event_files_unmigrated_idx ON Event_Files (FileID)
+    WHERE ContentHash IS NULL AND FileContent IS NOT NULL;
+
+CREATE INDEX file_blobs_released_idx ON File_Blobs (ReleasedAt)
+    WHERE RefCount = 0;
+
+CREATE OR REPLACE FUNCTION file_blob_refcount() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' AND OLD.ContentHash IS NOT NULL THEN
+        UPDATE File_Blobs
+        SET RefCount = RefCount - 1,
+            ReleasedAt = CASE WHEN RefCount = 1 THEN CURRENT_TIMESTAMP ELSE ReleasedAt END
+        WHERE ContentHash = OLD.ContentHash;
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.ContentHash IS NOT NULL THEN
+        UPDATE File_Blobs
+        SET RefCount = RefCount + 1,
+            ReleasedAt = NULL
+        WHERE ContentHash = NEW.ContentHash;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER event_files_blob_refcount
+    AFTER INSERT OR DELETE OR UPDATE OF ContentHash ON Event_Files
+    FOR EACH ROW EXECUTE FUNCTION file_blob_refcount();
@@ -0,0 +1,19 @@
+-- Metadata columns so file listings never touch file contents: 006 added
+-- ContentHash, FileSize and MimeType, this adds PageCount and fills in size
+-- and type for rows that still hold their content as BYTEA.
+--
+-- OCTET_LENGTH reads the size from the TOAST pointer and the type check only
+-- needs the first bytes, so this does not rewrite or fully read the contents.
+-- Page counts of existing PDFs are filled in by
+-- `python -m database.file_metadata` and by database/blob_migrator.py.
+
+ALTER TABLE Event_Files
+    ADD COLUMN PageCount INTEGER CHECK (PageCount >= 0);
+
+UPDATE Event_Files
+SET FileSize = COALESCE(OCTET_LENGTH(FileContent), 0),
+    MimeType = CASE
+        WHEN SUBSTRING(FileContent FROM 1 FOR 5) = '\x255044462d'::BYTEA THEN 'application/pdf'
+        ELSE 'application/octet-stream'
+    END
+WHERE FileSize IS NULL;
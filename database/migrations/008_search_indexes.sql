@@ -0,0 +1,34 @@
+-- migrate:no-transaction
+-- Indexes behind the type-ahead pickers (pages/search_picker.py and the
+-- search_* queries).
+--
+-- Names are matched anywhere with ILIKE '%text%', which a trigram GIN index
+-- answers without scanning the table. IDs are matched by prefix with
+-- lower(ID) LIKE 'text%', which needs a text_pattern_ops b-tree so the
+-- prefix becomes a range scan regardless of the database collation. The
+-- (name, ID) b-trees let each page continue from the last row shown
+-- (keyset paging) instead of counting past earlier pages with OFFSET.
+--
+-- pg_trgm ships with PostgreSQL but CREATE EXTENSION needs a role allowed to
+-- create it. If a build is interrupted, drop the INVALID index and re-run
+-- `python -m database.migrate`.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS events_name_trgm_idx
+    ON Events USING gin (EventName gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS users_name_trgm_idx
+    ON Users USING gin (UserName gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS events_id_prefix_idx
+    ON Events (lower(EventID) text_pattern_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS users_id_prefix_idx
+    ON Users (lower(UserID) text_pattern_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS events_name_key_idx
+    ON Events (EventName, EventID);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS users_name_key_idx
+    ON Users (UserName, UserID);
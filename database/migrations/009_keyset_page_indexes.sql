@@ -0,0 +1,22 @@
+-- migrate:no-transaction
+-- Indexes for the keyset-paged lists in TeacherDashboard.provide_feedback:
+-- a student's files on an event, paged by (UploadDate, FileID), and a
+-- teacher's assignments, paged by (EventDate, EventID). Each page is a short
+-- range scan starting at the previous page's last row, however deep the
+-- teacher has scrolled.
+
+-- A row comparison against a NULL UploadDate is never true, so such files
+-- would end paging early. Only rows inserted with an explicit NULL have one
+-- (the column defaults to CURRENT_DATE); date them to the migration.
+UPDATE Event_Files SET UploadDate = CURRENT_DATE WHERE UploadDate IS NULL;
+ALTER TABLE Event_Files ALTER COLUMN UploadDate SET NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS event_files_page_idx
+    ON Event_Files (EventID, UserID, UploadDate, FileID);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS events_teacher_page_idx
+    ON Events (UserID, EventDate, EventID);
+
+-- Both are leading-column prefixes of the indexes above.
+DROP INDEX CONCURRENTLY IF EXISTS event_files_event_user_idx;
+DROP INDEX CONCURRENTLY IF EXISTS events_user_date_idx;
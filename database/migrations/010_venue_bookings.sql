@@ -0,0 +1,63 @@
+-- Venues become a table, and the database rejects two events in one venue
+-- at overlapping times.
+--
+-- Each event occupies [EventDate + EventStartTime, EventDate + EventEndTime)
+-- of its venue. The range is half-open, so an event may start the minute the
+-- previous one in the room ends.
+
+CREATE TABLE IF NOT EXISTS Venues (
+    VenueName VARCHAR(30) PRIMARY KEY
+);
+
+-- The venues the event forms used to offer, plus any other venue already in use.
+INSERT INTO Venues (VenueName)
+VALUES ('Central Auditorium'), ('Sports Ground'), ('Classroom')
+ON CONFLICT DO NOTHING;
+INSERT INTO Venues (VenueName)
+SELECT DISTINCT EventVenue FROM Events
+ON CONFLICT DO NOTHING;
+
+ALTER TABLE Events
+    ADD CONSTRAINT events_venue_fkey
+    FOREIGN KEY (EventVenue) REFERENCES Venues (VenueName) ON UPDATE CASCADE;
+
+-- The forms compared times as strings, so some events may end before they
+-- start, and some venues may already be double-booked. Name them so they can
+-- be corrected before re-running the migration.
+DO $$
+DECLARE
+    problems TEXT;
+BEGIN
+    SELECT string_agg(EventID || ' (' || EventStartTime || '-' || EventEndTime || ')', ', ')
+    INTO problems
+    FROM Events
+    WHERE EventStartTime >= EventEndTime;
+    IF problems IS NOT NULL THEN
+        RAISE EXCEPTION 'Events that do not end after they start: %', problems;
+    END IF;
+
+    SELECT string_agg(a.EventID || '/' || b.EventID || ' (' || a.EventVenue || ', ' || a.EventDate || ')', ', ')
+    INTO problems
+    FROM Events a
+    JOIN Events b ON a.EventVenue = b.EventVenue
+                 AND a.EventDate = b.EventDate
+                 AND a.EventID < b.EventID
+                 AND a.EventStartTime < b.EventEndTime
+                 AND b.EventStartTime < a.EventEndTime;
+    IF problems IS NOT NULL THEN
+        RAISE EXCEPTION 'Venues already double-booked: %', problems;
+    END IF;
+END $$;
+
+ALTER TABLE Events
+    ADD CONSTRAINT events_time_order CHECK (EventStartTime < EventEndTime);
+
+ALTER TABLE Events
+    ADD COLUMN VenueSlot TSRANGE
+    GENERATED ALWAYS AS (tsrange(EventDate + EventStartTime, EventDate + EventEndTime, '[)')) STORED;
+
+-- Uses btree_gist from 004. Concurrent writes that would double-book a venue
+-- fail with an exclusion_violation instead of racing past the form's check.
+ALTER TABLE Events
+    ADD CONSTRAINT events_venue_no_overlap
+    EXCLUDE USING gist (EventVenue WITH =, VenueSlot WITH &&);
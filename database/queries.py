@@ -1,5 +1,14 @@
 import os
-from database.db_connection import get_connection
+import shutil
+from psycopg2.extras import execute_values
+from database.db_connection import pooled_connection
+from database.id_allocator import allocate_id
+from database.conflicts import describe_conflicts, find_reschedule_conflicts
+from database.event_cache import event_cache
+from database.availability import AVAILABLE_STUDENTS_QUERY, student_availability
+from database.venue_bookings import venue_bookings
+from database.blob_store import CHUNK_SIZE, MAX_UPLOAD_SIZE, blob_store, register_blob
+from database.file_metadata import describe, format_label
 from dotenv import load_dotenv
 
 # Load environment variables from .env file (if not already loaded in db_connection.py)
@@ -17,6 +26,39 @@ def generate_upload_filename(user_id, event_id, original_filename):
     new_filename = f"{user_id}_{event_id}_{base_filename}"
     return new_filename
 
+# -----------------------------------------------------------
+# Helper Function: Normalize User IDs
+# -----------------------------------------------------------
+def normalize_user_id(user_id):
+    """
+    Returns the canonical form of a UserID: surrounding whitespace removed.
+    Every write and lookup goes through this so UserID comparisons can be
+    plain equality checks that use the UserID indexes.
+    """
+    if user_id is None:
+        return None
+    return str(user_id).strip()
+
+# -----------------------------------------------------------
+# Helper Functions: Incremental Search
+# -----------------------------------------------------------
+# Rows returned per page by the search_* queries.
+SEARCH_PAGE_SIZE = 50
+
+
+def search_patterns(text):
+    """
+    Returns (contains, prefix) LIKE patterns for typed search text, with LIKE
+    wildcards in the text escaped. contains is matched with ILIKE against names
+    (trigram indexes); prefix is matched with LIKE against lower(ID) (text_pattern_ops).
+    """
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%", f"{escaped.lower()}%"
+
+
+def _where(conditions):
+    return "WHERE " + " AND ".join(conditions) if conditions else ""
+
 # -----------------------------------------------------------
 # 1. Fetching a User for Login
 # -----------------------------------------------------------
@@ -25,22 +67,18 @@ def get_user(username, password, role):
     Fetches a user record based on username, password, and role.
     Returns: (UserID, UserRole) tuple or None if not found.
     """
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        query = """
-            SELECT UserID, UserRole FROM Users
-            WHERE UserName = %s AND UserPass = %s AND UserRole = %s
-        """
-        cursor.execute(query, (username, password, role))
-        result = cursor.fetchone()
-        return result
-    except Exception as e:
-        print("Error fetching user:", e)
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = """
+                SELECT UserID, UserRole FROM Users
+                WHERE UserName = %s AND UserPass = %s AND UserRole = %s
+            """
+            cursor.execute(query, (username, password, role))
+            result = cursor.fetchone()
+            return result
+        except Exception as e:
+            print("Error fetching user:", e)
+            raise e
 
 # -----------------------------------------------------------
 # 2. Inserting a New Event with Teacher Assignment
@@ -48,102 +86,101 @@ def get_user(username, password, role):
 def add_event_with_teacher(event_name, event_date, start_time, end_time, venue, teacher_id):
     """
     Inserts a new event into the Events table and assigns it to a teacher.
+    teacher_id may be None to leave the event for database.teacher_scheduler.
     """
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        event_id = generate_next_event_id()
-
-        # Insert event into Events table
-        query = """
-            INSERT INTO Events (EventID, EventName, EventDate, EventStartTime, EventEndTime, EventVenue, UserID)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(query, (event_id, event_name, event_date, start_time, end_time, venue, teacher_id))
-        conn.commit()
-        print(f"Event added successfully with ID: {event_id}")
-        return event_id
-    except Exception as e:
-        conn.rollback()
-        print("Error adding event:", e)
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            event_id = generate_next_event_id(cursor)
+
+            # Insert event into Events table
+            query = """
+                INSERT INTO Events (EventID, EventName, EventDate, EventStartTime, EventEndTime, EventVenue, UserID)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(query, (event_id, event_name, event_date, start_time, end_time, venue, normalize_user_id(teacher_id)))
+            conn.commit()
+            event_cache.invalidate()
+            # The cached busy sets and venue bookings for that date must learn about the new event.
+            student_availability.invalidate_dates([event_date])
+            venue_bookings.invalidate_dates([event_date])
+            print(f"Event added successfully with ID: {event_id}")
+            return event_id
+        except Exception as e:
+            conn.rollback()
+            print("Error adding event:", e)
+            raise e
 
 # -----------------------------------------------------------
 # 3. Fetch Available Teachers for a Given Event Date
 # -----------------------------------------------------------
-def fetch_available_teachers_for_date(event_date):
+def fetch_available_teachers_for_date(event_date, exclude_event_id=None):
     """
     Fetches teachers who are not assigned to events within 3 days of the given event date.
+    Pass exclude_event_id when rescheduling so the event does not block its own teacher.
+    Returns a list of "TeacherID - UserName" strings.
+
+    The buffer is checked as an overlap against Events.BusyRange, an anti-join
+    served by the GiST index behind events_teacher_no_overlap.
     """
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        query = """
-            SELECT Teachers.TeacherID, Users.UserName
-            FROM Teachers
-            JOIN Users ON Teachers.TeacherID = Users.UserID
-            WHERE Teachers.TeacherID NOT IN (
-                SELECT e.UserID
-                FROM Events e
-                WHERE ABS(DATE_PART('day', e.EventDate::date - %s::date)) <= 3
-            )
-        """
-        cursor.execute(query, (event_date,))
-        return [f"{row[0]} - {row[1]}" for row in cursor.fetchall()]
-    except Exception as e:
-        print("Error fetching available teachers:", e)
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = """
+                SELECT t.UserID, u.UserName
+                FROM Teachers t
+                JOIN Users u ON t.UserID = u.UserID
+                WHERE NOT EXISTS (
+                    SELECT 1
+                    FROM Events e
+                    WHERE e.UserID = t.UserID
+                      AND e.BusyRange && daterange(%s::DATE, %s::DATE + 3, '[]')
+                      AND e.EventID IS DISTINCT FROM %s
+                )
+                ORDER BY u.UserName
+            """
+            cursor.execute(query, (event_date, event_date, exclude_event_id))
+            return [f"{row[0]} - {row[1]}" for row in cursor.fetchall()]
+        except Exception as e:
+            print("Error fetching available teachers:", e)
+            raise e
 
 # -----------------------------------------------------------
 # 4. Updating an Existing Event
 # -----------------------------------------------------------
 def edit_event(event_id, new_name, new_date, new_start_time, new_end_time, new_venue):
     """
-    Updates the details of an existing event, ensuring no conflicts with other events.
+    Updates the details of an existing event, ensuring its teacher and participating
+    students have no other event within 3 days of the new date.
+    Raises ValueError describing each conflicting (person, event) pair.
     """
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-
-        # Check for conflicts with the teacher's assigned events
-        query_conflicts = """
-            SELECT UserID
-            FROM Events
-            WHERE ABS(DATE_PART('day', EventDate::date - %s::date)) <= 3
-              AND EventID != %s
-        """
-        cursor.execute(query_conflicts, (new_date, event_id))
-        conflicting_users = cursor.fetchall()
-
-        if conflicting_users:
-            raise ValueError("Conflict detected with other events for the assigned teacher!")
-
-        # Update event in Events table
-        query_update = """
-            UPDATE Events
-            SET EventName = %s,
-                EventDate = %s,
-                EventStartTime = %s,
-                EventEndTime = %s,
-                EventVenue = %s
-            WHERE EventID = %s
-        """
-        cursor.execute(query_update, (new_name, new_date, new_start_time, new_end_time, new_venue, event_id))
-        conn.commit()
-        print(f"Event {event_id} updated successfully.")
-    except Exception as e:
-        conn.rollback()
-        print("Error editing event:", e)
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            # Check the new date against the schedules of everyone on this event
+            conflicts = find_reschedule_conflicts({event_id: new_date}, cursor)
+            if conflicts:
+                raise ValueError("Conflict detected with other events:\n" + describe_conflicts(conflicts))
+
+            # Update event in Events table
+            query_update = """
+                UPDATE Events
+                SET EventName = %s,
+                    EventDate = %s,
+                    EventStartTime = %s,
+                    EventEndTime = %s,
+                    EventVenue = %s
+                WHERE EventID = %s
+            """
+            cursor.execute(query_update, (new_name, new_date, new_start_time, new_end_time, new_venue, event_id))
+            conn.commit()
+            event_cache.invalidate()
+            student_availability.invalidate_events([event_id])
+            student_availability.invalidate_dates([new_date])
+            venue_bookings.invalidate_events([event_id])
+            venue_bookings.invalidate_dates([new_date])
+            print(f"Event {event_id} updated successfully.")
+        except Exception as e:
+            conn.rollback()
+            print("Error editing event:", e)
+            raise e
 
 # -----------------------------------------------------------
 # 5. Deleting an Event with Integrity
@@ -152,133 +189,749 @@ def delete_event_with_integrity(event_id):
     """
     Deletes an event after removing associated records in related tables.
     """
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            # Delete records from Event_Participation table
+            query_delete_participation = "DELETE FROM Event_Participation WHERE EventID = %s"
+            cursor.execute(query_delete_participation, (event_id,))
 
-        # Delete records from Event_Participation table
-        query_delete_participation = "DELETE FROM Event_Participation WHERE EventID = %s"
-        cursor.execute(query_delete_participation, (event_id,))
+            # Delete feedback on the event's files, then the files themselves
+            query_delete_feedback = """
+                DELETE FROM Feedback
+                WHERE FileID IN (SELECT FileID FROM Event_Files WHERE EventID = %s)
+            """
+            cursor.execute(query_delete_feedback, (event_id,))
+            query_delete_files = "DELETE FROM Event_Files WHERE EventID = %s"
+            cursor.execute(query_delete_files, (event_id,))
 
-        # Delete records from Event_Files table
-        query_delete_files = "DELETE FROM Event_Files WHERE EventID = %s"
-        cursor.execute(query_delete_files, (event_id,))
+            # Delete the event itself
+            query_delete_event = "DELETE FROM Events WHERE EventID = %s"
+            cursor.execute(query_delete_event, (event_id,))
 
-        # Delete the event itself
-        query_delete_event = "DELETE FROM Events WHERE EventID = %s"
-        cursor.execute(query_delete_event, (event_id,))
-
-        conn.commit()
-        print(f"Event {event_id} and associated records deleted successfully.")
-    except Exception as e:
-        conn.rollback()
-        print("Error deleting event:", e)
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+            conn.commit()
+            event_cache.invalidate()
+            student_availability.invalidate_events([event_id])
+            venue_bookings.invalidate_events([event_id])
+            print(f"Event {event_id} and associated records deleted successfully.")
+        except Exception as e:
+            conn.rollback()
+            print("Error deleting event:", e)
+            raise e
 
 # -----------------------------------------------------------
 # 6. Generate Next Event ID
 # -----------------------------------------------------------
-def generate_next_event_id():
+def generate_next_event_id(cursor=None):
     """
-    Generates the next EventID in the format 'EIDxx', where xx is incremented.
+    Generates the next EventID in the format 'EIDxx' from the event_id_seq sequence.
+    Pass the caller's cursor to reuse its connection instead of borrowing another.
     """
-    conn = get_connection()
     try:
-        cursor = conn.cursor()
-        query = "SELECT MAX(EventID) FROM Events"
-        cursor.execute(query)
-        max_id = cursor.fetchone()[0]
-        if max_id:
-            numeric_part = int(max_id[3:])
-            next_id = f"EID{numeric_part + 1:02d}"
-        else:
-            next_id = "EID01"
-        return next_id
+        return allocate_id("event", cursor)
     except Exception as e:
         print("Error generating next EventID:", e)
         raise e
-    finally:
-        cursor.close()
-        conn.close()
 
 
 # -----------------------------------------------------------
-# 8. Fetch All Events
+# 8. Generate Unique File ID
 # -----------------------------------------------------------
-def generate_unique_file_id():
+def generate_unique_file_id(cursor=None):
     """
-    Generates the next FileID in the format 'FILEID-00x',
-    where x represents the next number after the current maximum.
+    Generates the next FileID in the format 'FILEID-00x' from the file_id_seq sequence.
     """
-    conn = get_connection()
     try:
-        cursor = conn.cursor()
-        query = "SELECT MAX(FileID) FROM Event_Files"
-        cursor.execute(query)
-        max_id = cursor.fetchone()[0]
-        if max_id:
-            # Remove the 'FILEID-' prefix and convert the remaining part to an integer
-            numeric_part = int(max_id.replace("FILEID-", ""))
-            next_id = f"FILEID-{numeric_part + 1:03d}"
-        else:
-            next_id = "FILEID-001"
-        return next_id
+        return allocate_id("file", cursor)
     except Exception as e:
         print("Error generating unique FileID:", e)
         raise e
-    finally:
-        cursor.close()
-        conn.close()
 
 # -----------------------------------------------------------
-# 9. Fetch All Events
+# 9. Generate Unique Feedback ID
 # -----------------------------------------------------------
-def generate_unique_feedback():
+def generate_unique_feedback(cursor=None):
     """
-    Generates the next FeedbackID in the format 'FEEDBACK0x',
-    where x is the next number after the current maximum.
-    For example, if the maximum FeedbackID is "FEEDBACK01", the next will be "FEEDBACK02".
+    Generates the next FeedbackID in the format 'FEEDBACK0x' from the feedback_id_seq sequence.
+    For example, after "FEEDBACK01" has been issued, the next will be "FEEDBACK02".
     """
-    conn = get_connection()
     try:
-        cursor = conn.cursor()
-        query = "SELECT MAX(FeedbackID) FROM Feedback"
-        cursor.execute(query)
-        max_id = cursor.fetchone()[0]
-        if max_id:
-            # Remove the 'FEEDBACK' prefix and convert the remaining part to an integer
-            numeric_part = int(max_id.replace("FEEDBACK", ""))
-            next_id = f"FEEDBACK{numeric_part + 1:02d}"
-        else:
-            next_id = "FEEDBACK01"
-        return next_id
+        return allocate_id("feedback", cursor)
     except Exception as e:
         print("Error generating unique FeedbackID:", e)
         raise e
-    finally:
-        cursor.close()
-        conn.close()
 
 
 # -----------------------------------------------------------
 # 10. Fetch All Events
 # -----------------------------------------------------------
+@event_cache.cached("all")
 def fetch_all_events():
     """
     Fetches all events from the database.
+    Served from the event cache; writes through this module invalidate it.
     """
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        query = "SELECT EventID, EventName, EventDate FROM Events"
-        cursor.execute(query)
-        return cursor.fetchall()
-    except Exception as e:
-        print("Error fetching events:", e)
-        raise e
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = "SELECT EventID, EventName, EventDate FROM Events"
+            cursor.execute(query)
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error fetching events:", e)
+            raise e
+
+
+# -----------------------------------------------------------
+# 11. Fetch Events on a Date
+# -----------------------------------------------------------
+@event_cache.cached("date")
+def fetch_events_on_date(event_date):
+    """
+    Fetches the names of all events held on the given date.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = "SELECT EventName FROM Events WHERE EventDate = %s"
+            cursor.execute(query, (event_date,))
+            return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            print("Error fetching events for date:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 12. Fetch Event Details
+# -----------------------------------------------------------
+def fetch_event_details(event_id):
+    """
+    Fetches (EventName, EventDate, EventStartTime, EventEndTime, EventVenue) for one event,
+    or None if it does not exist.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = """
+                SELECT EventName, EventDate, EventStartTime, EventEndTime, EventVenue
+                FROM Events
+                WHERE EventID = %s
+            """
+            cursor.execute(query, (event_id,))
+            return cursor.fetchone()
+        except Exception as e:
+            print("Error fetching event details:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 13. Adding a Teacher
+# -----------------------------------------------------------
+def add_teacher(user_id, first_name, last_name):
+    """
+    Creates the Users and Teachers rows for a new teacher in one transaction.
+    The initial password is '<firstname>@123'.
+    """
+    user_id = normalize_user_id(user_id)
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query_users = """
+                INSERT INTO Users (UserID, UserName, UserRole, UserPass)
+                VALUES (%s, %s, 'Teacher', %s)
+            """
+            user_pass = f"{first_name.lower()}@123"
+            cursor.execute(query_users, (user_id, first_name, user_pass))
+
+            query_teachers = """
+                INSERT INTO Teachers (UserID, TeacherFName, TeacherLName)
+                VALUES (%s, %s, %s)
+            """
+            cursor.execute(query_teachers, (user_id, first_name, last_name))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print("Error adding teacher:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 14. Fetch a Teacher's Events
+# -----------------------------------------------------------
+@event_cache.cached("teacher")
+def fetch_teacher_events(teacher_id):
+    """
+    Fetches (EventID, EventName) for every event assigned to the teacher.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = "SELECT EventID, EventName FROM Events WHERE UserID = %s"
+            cursor.execute(query, (normalize_user_id(teacher_id),))
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error fetching teacher events:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 15. Fetch Students Available for an Event
+# -----------------------------------------------------------
+def fetch_available_students(event_id):
+    """
+    Fetches (StudentID, StudentName) for students with no event within 3 days of the given
+    event, ordered by name, with one anti-join (see availability.AVAILABLE_STUDENTS_QUERY).
+    The teacher dashboard reads the same answer from availability.student_availability,
+    which caches it per date.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            cursor.execute(AVAILABLE_STUDENTS_QUERY, {"event": event_id})
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error fetching available students:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 16. Assign a Student to an Event
+# -----------------------------------------------------------
+def assign_student(event_id, student_id, responsibility):
+    """
+    Adds a student to an event with the given responsibility.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query_insert = """
+                INSERT INTO Event_Participation (EventID, UserID, Responsibility)
+                VALUES (%s, %s, %s)
+            """
+            cursor.execute(query_insert, (event_id, normalize_user_id(student_id), responsibility))
+            conn.commit()
+            # A new participant changes that student's event lists and availability
+            event_cache.invalidate("student")
+            student_availability.invalidate_events([event_id])
+        except Exception as e:
+            conn.rollback()
+            print("Error assigning student:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 18. Fetch a Student's Files for an Event
+# -----------------------------------------------------------
+def fetch_event_files(event_id, student_id, after=None, limit=None):
+    """
+    Fetches (FileID, FileName, Format, SizeKB, PageCount, ContentHash, UploadDate) for the
+    student's files on the event, ordered by (UploadDate, FileID).
+    Only metadata columns are read, never the file contents.
+
+    With limit, returns one page; pass the last row's (UploadDate, FileID) as after for
+    the next. Pages are read from event_files_page_idx (migration 009).
+    """
+    conditions = ["EventID = %s", "UserID = %s"]
+    params = [event_id, normalize_user_id(student_id)]
+    if after is not None:
+        conditions.append("(UploadDate, FileID) > (%s, %s)")
+        params += after
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = f"""
+                SELECT FileID, FileName, MimeType, COALESCE(ROUND(FileSize/1024.0), 0) AS Size, PageCount, ContentHash, UploadDate
+                FROM Event_Files
+                {_where(conditions)}
+                ORDER BY UploadDate, FileID
+                LIMIT %s
+            """
+            cursor.execute(query, (*params, limit))
+            return [(file_id, file_name, format_label(mime_type), size, page_count, content_hash, upload_date)
+                    for file_id, file_name, mime_type, size, page_count, content_hash, upload_date in cursor.fetchall()]
+        except Exception as e:
+            print("Error fetching files:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 19. Fetch File Content
+# -----------------------------------------------------------
+def fetch_file_content(file_id):
+    """
+    Fetches (FileName, FileContent) for one file, or None if it does not exist.
+    Content comes from the blob store, or from the BYTEA column for rows not yet migrated.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = "SELECT FileName, ContentHash, FileContent FROM Event_Files WHERE FileID = %s"
+            cursor.execute(query, (file_id,))
+            result = cursor.fetchone()
+        except Exception as e:
+            print("Error fetching file:", e)
+            raise e
+    if result is None:
+        return None
+    file_name, content_hash, file_content = result
+    if content_hash is not None:
+        with blob_store.open(content_hash) as blob:
+            file_content = blob.read()
+    return file_name, file_content
+
+
+def copy_file_content(file_id, out, cached=None):
+    """
+    Writes one file's content to the binary file object out, CHUNK_SIZE bytes at a time,
+    so the file is never held in memory whole. Returns (FileName, ContentHash), or None
+    if the file does not exist. ContentHash is None for rows not yet moved to the blob store.
+
+    cached(file_name, content_hash) is called once the file is found; if it returns a
+    true value nothing is written.
+    Rows still holding BYTEA content are read inside the same REPEATABLE READ snapshot
+    as their metadata. The connection goes back to the pool before a blob is copied.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            query = "SELECT FileName, ContentHash, octet_length(FileContent) FROM Event_Files WHERE FileID = %s"
+            cursor.execute(query, (file_id,))
+            result = cursor.fetchone()
+            if result is None:
+                return None
+            file_name, content_hash, bytea_size = result
+            if cached is not None and cached(file_name, content_hash):
+                return file_name, content_hash
+            if content_hash is None:
+                try:
+                    for chunk in read_bytea_chunks(cursor, file_id, bytea_size or 0):
+                        out.write(chunk)
+                    return file_name, None
+                except LookupError:
+                    # Moved to the blob store after all; read it from there.
+                    conn.rollback()
+                    cursor.execute("SELECT ContentHash FROM Event_Files WHERE FileID = %s", (file_id,))
+                    row = cursor.fetchone()
+                    if row is None or row[0] is None:
+                        raise
+                    content_hash = row[0]
+                    out.seek(0)
+                    out.truncate()
+        except Exception as e:
+            print("Error fetching file:", e)
+            raise e
+    with blob_store.open(content_hash) as blob:
+        shutil.copyfileobj(blob, out, CHUNK_SIZE)
+    return file_name, content_hash
+
+
+def read_bytea_chunks(cursor, file_id, file_size):
+    """
+    Yields a file's BYTEA content CHUNK_SIZE bytes at a time with SUBSTRING, on the
+    caller's cursor and transaction, so only one slice is in memory at once.
+    """
+    for offset in range(0, file_size, CHUNK_SIZE):
+        cursor.execute(
+            "SELECT SUBSTRING(FileContent FROM %s FOR %s) FROM Event_Files WHERE FileID = %s",
+            (offset + 1, CHUNK_SIZE, file_id),
+        )
+        row = cursor.fetchone()
+        if row is None or row[0] is None:
+            raise LookupError(f"File {file_id} disappeared while it was being read.")
+        yield bytes(row[0])
+
+# -----------------------------------------------------------
+# 20. Review a Submitted File
+# -----------------------------------------------------------
+def review_file(file_id, status, teacher_id, feedback_text=None):
+    """
+    Sets the file's approval status and, when feedback text is given, records it
+    as a Feedback row, both in one transaction.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = "UPDATE Event_Files SET FileApprovalStatus = %s WHERE FileID = %s"
+            cursor.execute(query, (status, file_id))
+
+            if feedback_text:
+                feedback_id = generate_unique_feedback(cursor)
+                feedback_query = """
+                    INSERT INTO Feedback (FeedbackID, FileID, UserID, Feedback)
+                    VALUES (%s, %s, %s, %s)
+                """
+                cursor.execute(feedback_query, (feedback_id, file_id, normalize_user_id(teacher_id), feedback_text))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print("Error reviewing file:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 21. Fetch a Student's Events
+# -----------------------------------------------------------
+@event_cache.cached("student")
+def fetch_student_events(student_id):
+    """
+    Fetches (EventID, EventName, EventDate) for every event the student participates in.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = """
+                SELECT e.EventID, e.EventName, e.EventDate
+                FROM Events e
+                JOIN Event_Participation ep ON e.EventID = ep.EventID
+                WHERE ep.UserID = %s
+            """
+            cursor.execute(query, (normalize_user_id(student_id),))
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error fetching student events:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 22. Fetch a Student's Events on a Date
+# -----------------------------------------------------------
+@event_cache.cached("student")
+def fetch_student_events_on_date(student_id, event_date):
+    """
+    Fetches the names of the student's events held on the given date.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = """
+                SELECT e.EventName
+                FROM Events e
+                JOIN Event_Participation ep ON e.EventID = ep.EventID
+                WHERE ep.UserID = %s AND e.EventDate = %s
+            """
+            cursor.execute(query, (normalize_user_id(student_id), event_date))
+            return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            print("Error fetching student events for date:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 23. Fetch a Student's Events with Teacher Names
+# -----------------------------------------------------------
+@event_cache.cached("student")
+def fetch_student_events_with_teachers(student_id):
+    """
+    Fetches (EventID, EventName, TeacherName) for every event the student participates in.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = """
+                SELECT e.EventID, e.EventName, u.UserName
+                FROM Events e
+                JOIN Event_Participation ep ON e.EventID = ep.EventID
+                JOIN Users u ON e.UserID = u.UserID
+                WHERE ep.UserID = %s
+            """
+            cursor.execute(query, (normalize_user_id(student_id),))
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error fetching student events:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 24. Upload an Event File
+# -----------------------------------------------------------
+def add_event_file(event_id, student_id, file_name, file_path, progress=None):
+    """
+    Streams the file at file_path into the blob store and records it as a new Event_Files
+    row with status 'Pending'. Identical content is stored only once.
+    progress(bytes_copied, total_bytes) is called as the file is copied; files over
+    UPLOAD_MAX_MB raise FileTooLargeError before anything is stored.
+    Returns the new FileID.
+    """
+    # Hash and copy the file before taking a connection; this is the slow part.
+    staged = blob_store.stage(file_path, file_name, progress=progress, max_size=MAX_UPLOAD_SIZE)
+    metadata = describe(staged)
+
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            file_id = generate_unique_file_id(cursor)
+            register_blob(cursor, staged)
+            query = """
+                INSERT INTO Event_Files (FileID, EventID, UserID, FileName, ContentHash, FileSize, MimeType, PageCount, FileApprovalStatus)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(query, (file_id, event_id, normalize_user_id(student_id), file_name, metadata.content_hash,
+                                   metadata.size, metadata.mime_type, metadata.page_count, "Pending"))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            blob_store.discard(staged)
+            print("Error uploading file:", e)
+            raise e
+    # Only now that the rows are committed does the blob enter the store.
+    blob_store.commit(staged)
+    return file_id
+
+# -----------------------------------------------------------
+# 25. Fetch Feedback for a Student's Event
+# -----------------------------------------------------------
+def fetch_feedback(event_id, student_id):
+    """
+    Fetches (Feedback, FileApprovalStatus) for every feedback entry on the student's files for the event.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = """
+                SELECT f.Feedback, ef.FileApprovalStatus
+                FROM Feedback f
+                JOIN Event_Files ef ON f.FileID = ef.FileID
+                WHERE ef.EventID = %s AND ef.UserID = %s
+            """
+            cursor.execute(query, (event_id, normalize_user_id(student_id)))
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error fetching feedback:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 26. Assign Several Students to an Event
+# -----------------------------------------------------------
+RESPONSIBILITY_MAX_LENGTH = 30
+
+def assign_students(event_id, assignments):
+    """
+    Assigns several students to one event in a single transaction.
+    assignments: list of (student_id, responsibility) pairs.
+
+    Rows that cannot be assigned (unknown student, listed twice, already on the event,
+    another event within 3 days, missing or over-long responsibility) are reported
+    instead of aborting the batch; the rest are inserted with one statement.
+    Returns (assigned, rejected): assigned is a list of student ids,
+    rejected a list of (student_id, reason) pairs.
+    """
+    rejected = []
+    batch = {}
+    for student_id, responsibility in assignments:
+        student_id = normalize_user_id(student_id)
+        responsibility = (responsibility or "").strip()
+        if student_id in batch:
+            rejected.append((student_id, "listed more than once"))
+        elif not responsibility:
+            rejected.append((student_id, "no responsibility given"))
+        elif len(responsibility) > RESPONSIBILITY_MAX_LENGTH:
+            rejected.append((student_id, f"responsibility longer than {RESPONSIBILITY_MAX_LENGTH} characters"))
+        else:
+            batch[student_id] = responsibility
+    if not batch:
+        return [], rejected
+
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            # Lock the students so a concurrent assignment cannot slip a clashing event past the check
+            cursor.execute(
+                "SELECT UserID FROM Students WHERE UserID = ANY(%s) ORDER BY UserID FOR UPDATE",
+                (list(batch),),
+            )
+
+            query_check = """
+                SELECT b.UserID,
+                       EXISTS (SELECT 1 FROM Students s WHERE s.UserID = b.UserID) AS known,
+                       EXISTS (
+                           SELECT 1 FROM Event_Participation ep
+                           WHERE ep.EventID = t.EventID AND ep.UserID = b.UserID
+                       ) AS already_assigned,
+                       (
+                           SELECT string_agg(e.EventID || ' (' || e.EventDate || ')', ', ' ORDER BY e.EventDate)
+                           FROM Event_Participation ep
+                           JOIN Events e ON e.EventID = ep.EventID
+                           WHERE ep.UserID = b.UserID
+                             AND e.EventID <> t.EventID
+                             AND e.BusyRange && t.BusyRange
+                       ) AS clashes
+                FROM unnest(%s::VARCHAR[]) AS b(UserID)
+                CROSS JOIN (SELECT EventID, BusyRange FROM Events WHERE EventID = %s) t
+            """
+            cursor.execute(query_check, (list(batch), event_id))
+            checked = cursor.fetchall()
+            if not checked:
+                raise ValueError(f"Event {event_id} does not exist.")
+
+            rows = []
+            for student_id, known, already_assigned, clashes in checked:
+                if not known:
+                    rejected.append((student_id, "not a registered student"))
+                elif already_assigned:
+                    rejected.append((student_id, "already assigned to this event"))
+                elif clashes:
+                    rejected.append((student_id, f"booked within 3 days on {clashes}"))
+                else:
+                    rows.append((event_id, student_id, batch[student_id]))
+
+            assigned = []
+            if rows:
+                query_insert = """
+                    INSERT INTO Event_Participation (EventID, UserID, Responsibility)
+                    VALUES %s
+                    ON CONFLICT ON CONSTRAINT event_participation_event_user_key DO NOTHING
+                    RETURNING UserID
+                """
+                assigned = [row[0] for row in execute_values(cursor, query_insert, rows, fetch=True)]
+                for _, student_id, _ in rows:
+                    if student_id not in assigned:
+                        rejected.append((student_id, "already assigned to this event"))
+            conn.commit()
+            if assigned:
+                event_cache.invalidate("student")
+                student_availability.invalidate_events([event_id])
+            return assigned, rejected
+        except Exception as e:
+            conn.rollback()
+            print("Error assigning students:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 27. Fetch Events in a Date Range
+# -----------------------------------------------------------
+@event_cache.cached("range")
+def fetch_events_between(start_date, end_date):
+    """
+    Fetches (EventID, EventName, EventDate, EventStartTime, EventEndTime, EventVenue, TeacherName)
+    for events with start_date <= EventDate < end_date.
+    Used by the calendar views to load a few months at a time and answer date clicks.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = """
+                SELECT e.EventID, e.EventName, e.EventDate, e.EventStartTime, e.EventEndTime, e.EventVenue,
+                       COALESCE(t.TeacherFName || ' ' || t.TeacherLName, '') AS TeacherName
+                FROM Events e
+                LEFT JOIN Teachers t ON e.UserID = t.UserID
+                WHERE e.EventDate >= %s AND e.EventDate < %s
+                ORDER BY e.EventDate, e.EventStartTime, e.EventID
+            """
+            cursor.execute(query, (start_date, end_date))
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error fetching events:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 28. Fetch a Student's Events in a Date Range
+# -----------------------------------------------------------
+@event_cache.cached("student")
+def fetch_student_events_between(student_id, start_date, end_date):
+    """
+    Fetches the student's events with start_date <= EventDate < end_date, in the same
+    shape as fetch_events_between.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = """
+                SELECT e.EventID, e.EventName, e.EventDate, e.EventStartTime, e.EventEndTime, e.EventVenue,
+                       COALESCE(t.TeacherFName || ' ' || t.TeacherLName, '') AS TeacherName
+                FROM Events e
+                JOIN Event_Participation ep ON e.EventID = ep.EventID
+                LEFT JOIN Teachers t ON e.UserID = t.UserID
+                WHERE ep.UserID = %s AND e.EventDate >= %s AND e.EventDate < %s
+                ORDER BY e.EventDate, e.EventStartTime, e.EventID
+            """
+            cursor.execute(query, (normalize_user_id(student_id), start_date, end_date))
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error fetching student events:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 29. Search Events
+# -----------------------------------------------------------
+def search_events(text, after=None, limit=SEARCH_PAGE_SIZE, teacher_id=None):
+    """
+    Fetches up to limit (EventID, EventName, EventDate) rows whose name contains text
+    or whose ID starts with it, ordered by (EventName, EventID). Pass the last row's
+    (EventName, EventID) as after for the next page. teacher_id restricts the search
+    to that teacher's events.
+
+    Served by the trigram and ID-prefix indexes from migration 008; paging walks
+    events_name_key_idx instead of OFFSET-scanning earlier pages.
+    """
+    conditions, params = [], []
+    if text:
+        conditions.append("(e.EventName ILIKE %s OR lower(e.EventID) LIKE %s)")
+        params += search_patterns(text)
+    if teacher_id is not None:
+        conditions.append("e.UserID = %s")
+        params.append(normalize_user_id(teacher_id))
+    if after is not None:
+        conditions.append("(e.EventName, e.EventID) > (%s, %s)")
+        params += after
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = f"""
+                SELECT e.EventID, e.EventName, e.EventDate
+                FROM Events e
+                {_where(conditions)}
+                ORDER BY e.EventName, e.EventID
+                LIMIT %s
+            """
+            cursor.execute(query, (*params, limit))
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error searching events:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 30. Search Available Teachers for a Given Event Date
+# -----------------------------------------------------------
+def search_available_teachers(event_date, text, after=None, limit=SEARCH_PAGE_SIZE, exclude_event_id=None):
+    """
+    Like fetch_available_teachers_for_date, but returns up to limit (TeacherID, UserName)
+    rows whose name contains text or whose ID starts with it, ordered by (UserName, UserID).
+    Pass the last row's (UserName, UserID) as after for the next page.
+    """
+    conditions = [
+        """NOT EXISTS (
+                    SELECT 1
+                    FROM Events e
+                    WHERE e.UserID = t.UserID
+                      AND e.BusyRange && daterange(%s::DATE, %s::DATE + 3, '[]')
+                      AND e.EventID IS DISTINCT FROM %s
+                )"""
+    ]
+    params = [event_date, event_date, exclude_event_id]
+    if text:
+        conditions.append("(u.UserName ILIKE %s OR lower(u.UserID) LIKE %s)")
+        params += search_patterns(text)
+    if after is not None:
+        conditions.append("(u.UserName, u.UserID) > (%s, %s)")
+        params += after
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = f"""
+                SELECT t.UserID, u.UserName
+                FROM Teachers t
+                JOIN Users u ON t.UserID = u.UserID
+                {_where(conditions)}
+                ORDER BY u.UserName, u.UserID
+                LIMIT %s
+            """
+            cursor.execute(query, (*params, limit))
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error searching available teachers:", e)
+            raise e
+
+# -----------------------------------------------------------
+# 31. Search a Teacher's Student Assignments
+# -----------------------------------------------------------
+def search_teacher_assignments(teacher_id, text, after=None, limit=SEARCH_PAGE_SIZE):
+    """
+    Fetches up to limit (StudentID, StudentName, EventID, EventName, EventDate) rows for
+    students assigned to the teacher's events, where the student's name, the event's name
+    or the start of the student ID matches text. Ordered by (EventDate, EventID, StudentID);
+    pass the last row's (EventDate, EventID, StudentID) as after for the next page.
+    The teacher's events are walked in that order on events_teacher_page_idx (migration 009).
+    """
+    conditions = ["e.UserID = %s"]
+    params = [normalize_user_id(teacher_id)]
+    if text:
+        contains, prefix = search_patterns(text)
+        conditions.append("(u.UserName ILIKE %s OR e.EventName ILIKE %s OR lower(ep.UserID) LIKE %s)")
+        params += [contains, contains, prefix]
+    if after is not None:
+        conditions.append("(e.EventDate, ep.EventID, ep.UserID) > (%s, %s, %s)")
+        params += after
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        try:
+            query = f"""
+                SELECT ep.UserID, u.UserName, ep.EventID, e.EventName, e.EventDate
+                FROM Event_Participation ep
+                JOIN Users u ON ep.UserID = u.UserID
+                JOIN Events e ON ep.EventID = e.EventID
+                {_where(conditions)}
+                ORDER BY e.EventDate, ep.EventID, ep.UserID
+                LIMIT %s
+            """
+            cursor.execute(query, (*params, limit))
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error searching assignments:", e)
+            raise e
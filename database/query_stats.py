@@ -0,0 +1,364 @@
+"""
+Per-statement instrumentation for every pooled connection.
+
+init_pool() opens the pool's connections with InstrumentedCursor, which times
+each execute, executemany and copy_expert and records, per (caller, function,
+statement):
+  - a latency histogram (BUCKET_BOUNDS_MS) with the count, errors, total and max,
+  - the rows returned or affected,
+  - the bytes returned, estimated from the first rows fetched per execute.
+
+function is the code that ran the statement (e.g. queries.fetch_event_files),
+found by walking the stack past the database plumbing. caller is the screen
+that asked for it (e.g. TeacherDashboard.load_files): BackgroundExecutor.submit
+records who submitted the work and runs it under tagged(caller); outside the
+executor caller is the function itself. Statements are grouped with their
+literals and VALUES lists folded, so execute_values pages count as one.
+
+Statements slower than DB_SLOW_QUERY_MS, and failed ones, are logged through
+loguru (to DB_SLOW_QUERY_LOG as well when set). The numbers are kept in
+memory; snapshot() and dump_json() expose them, and the admin dashboard shows
+them under Diagnostics. Set DB_QUERY_STATS=0 to open plain cursors instead.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+import psycopg2.extensions
+from loguru import logger
+
+QUERY_STATS_ENABLED = os.getenv("DB_QUERY_STATS", "1") != "0"
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "250"))
+SLOW_QUERY_LOG = os.getenv("DB_SLOW_QUERY_LOG")
+
+# Upper bounds of the latency histogram buckets; slower statements land in a last, open bucket.
+BUCKET_BOUNDS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Distinct (caller, function, statement) keys kept; later ones are pooled under OTHER_STATEMENT.
+MAX_STATEMENTS = 2000
+OTHER_STATEMENT = "(other statements)"
+
+# Statement text kept per key, and rows sampled per execute for the byte estimate.
+FINGERPRINT_CHARS = 2000
+BYTES_SAMPLE_ROWS = 16
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_VALUE = r"(?:\?|NULL|TRUE|FALSE)(?:::\w+(?:\[\])?)?"
+_ROW = rf"\({_VALUE}(?:, ?{_VALUE})*\)"
+_VALUE_LISTS = re.compile(rf"{_ROW}(?:, ?{_ROW})+", re.IGNORECASE)
+
+# Frames in these files are plumbing, never the function behind a statement.
+_PLUMBING = (
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "db_connection.py"),
+    os.path.dirname(os.path.abspath(psycopg2.__file__)),
+    os.path.abspath(sys.modules["contextlib"].__file__),
+)
+
+_context = threading.local()
+_fingerprints = {}
+_frame_names = {}  # (code object, skip) -> display name, or None to skip the frame
+
+
+def fingerprint(query):
+    """
+    Returns the statement with whitespace collapsed, literals replaced by ?
+    and multi-row VALUES lists folded, cut to FINGERPRINT_CHARS.
+    """
+    cached = _fingerprints.get(query)
+    if cached is not None:
+        return cached
+    if isinstance(query, bytes):
+        text = query[:FINGERPRINT_CHARS].decode("utf-8", "replace")
+    else:
+        text = str(query)[:FINGERPRINT_CHARS]
+    text = _LITERALS.sub("?", " ".join(text.split()))
+    text = _VALUE_LISTS.sub("(?), ...", text)
+    # Only parameterised (str) statements repeat verbatim; execute_values pages never do.
+    if isinstance(query, str) and len(_fingerprints) < MAX_STATEMENTS:
+        _fingerprints[query] = text
+    return text
+
+
+def _frame_name(code, module, skip):
+    key = (code, skip)
+    try:
+        return _frame_names[key]
+    except KeyError:
+        pass
+    if code.co_filename.startswith(skip):
+        name = None
+    else:
+        name = getattr(code, "co_qualname", code.co_name).replace(".<locals>", "")
+        if "." not in name:
+            name = f"{module.rsplit('.', 1)[-1]}.{name}"
+    _frame_names[key] = name
+    return name
+
+
+def calling_function(skip=_PLUMBING, depth=1):
+    """
+    Returns the name (Class.method or module.function) of the nearest frame
+    above the caller's `depth`-th caller whose file does not start with any of
+    the `skip` prefixes, or "unknown".
+    """
+    frame = sys._getframe(depth + 1)
+    while frame is not None:
+        name = _frame_name(frame.f_code, frame.f_globals.get("__name__", "?"), skip)
+        if name is not None:
+            return name
+        frame = frame.f_back
+    return "unknown"
+
+
+@contextmanager
+def tagged(caller):
+    """
+    Attributes the statements run in the block (on this thread) to caller.
+    """
+    previous = getattr(_context, "caller", None)
+    _context.caller = caller
+    try:
+        yield
+    finally:
+        _context.caller = previous
+
+
+def run_tagged(caller, fn, /, *args, **kwargs):
+    with tagged(caller):
+        return fn(*args, **kwargs)
+
+
+def _row_bytes(row):
+    size = 0
+    for value in row:
+        if isinstance(value, (str, bytes, bytearray, memoryview)):
+            size += len(value)
+        elif value is not None:
+            size += 8
+    return size
+
+
+class _StatementStats:
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "rows", "bytes", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def percentile(self, fraction):
+        """
+        Upper bound of the bucket holding the given fraction of the calls.
+        """
+        wanted = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS_MS, self.buckets):
+            seen += count
+            if seen >= wanted:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+class QueryStats:
+    """
+    Thread-safe registry of per-statement timings, fed by InstrumentedCursor.
+    """
+
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.started = time.time()
+
+    def observe(self, query, seconds, rows=0, error=None):
+        """
+        Records one statement run by the calling code. Returns its entry, for add_bytes().
+        """
+        site = calling_function()
+        caller = getattr(_context, "caller", None) or site
+        statement = fingerprint(query)
+        elapsed_ms = seconds * 1000
+        with self._lock:
+            key = (caller, site, statement)
+            entry = self._stats.get(key)
+            if entry is None:
+                if len(self._stats) >= MAX_STATEMENTS:
+                    key = (caller, site, OTHER_STATEMENT)
+                    entry = self._stats.get(key)
+                if entry is None:
+                    entry = self._stats[key] = _StatementStats()
+            entry.count += 1
+            entry.total_ms += elapsed_ms
+            if elapsed_ms > entry.max_ms:
+                entry.max_ms = elapsed_ms
+            entry.buckets[bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+            if error is not None:
+                entry.errors += 1
+            elif rows > 0:
+                entry.rows += rows
+
+        if error is not None:
+            logger.bind(query_log=True).error(
+                "Query failed after {:.1f} ms in {} ({}): {}: {}", elapsed_ms, caller, site, statement, error)
+        elif elapsed_ms >= self.slow_query_ms:
+            logger.bind(query_log=True).warning(
+                "Slow query: {:.1f} ms, {} row(s) in {} ({}): {}", elapsed_ms, rows, caller, site, statement)
+        return entry
+
+    def add_bytes(self, entry, size):
+        with self._lock:
+            entry.bytes += size
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        """
+        Returns one dict per (caller, function, statement), slowest total first.
+        """
+        with self._lock:
+            items = [(key, entry, list(entry.buckets)) for key, entry in self._stats.items()]
+        labels = [f"<={bound}" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}"]
+        rows = []
+        for (caller, site, statement), entry, buckets in items:
+            rows.append({
+                "caller": caller,
+                "function": site,
+                "statement": statement,
+                "calls": entry.count,
+                "errors": entry.errors,
+                "total_ms": round(entry.total_ms, 3),
+                "mean_ms": round(entry.total_ms / entry.count, 3),
+                "p50_ms": round(entry.percentile(0.5), 3),
+                "p95_ms": round(entry.percentile(0.95), 3),
+                "max_ms": round(entry.max_ms, 3),
+                "rows": entry.rows,
+                "bytes": entry.bytes,
+                "histogram_ms": dict(zip(labels, buckets)),
+            })
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    def summary(self):
+        snapshot = self.snapshot()
+        return {
+            "statements": len(snapshot),
+            "calls": sum(row["calls"] for row in snapshot),
+            "errors": sum(row["errors"] for row in snapshot),
+            "total_ms": round(sum(row["total_ms"] for row in snapshot), 3),
+            "slowest_caller": snapshot[0]["caller"] if snapshot else None,
+        }
+
+    def to_json(self, caches=None):
+        """
+        caches optionally maps a cache name to its stats() so hit rates can be
+        read next to the statements they save.
+        """
+        report = {
+            "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "slow_query_ms": self.slow_query_ms,
+            "summary": self.summary(),
+            "statements": self.snapshot(),
+        }
+        if caches:
+            report["caches"] = caches
+        return json.dumps(report, indent=2)
+
+    def dump_json(self, path, caches=None):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json(caches))
+
+
+query_stats = QueryStats()
+_log_configured = False
+
+
+def configure_logging():
+    """
+    Adds the DB_SLOW_QUERY_LOG file sink, once. Slow and failed statements go
+    to loguru's default sink (stderr) either way.
+    """
+    global _log_configured
+    if _log_configured:
+        return
+    _log_configured = True
+    if SLOW_QUERY_LOG:
+        logger.add(SLOW_QUERY_LOG, rotation="5 MB", retention=5,
+                   filter=lambda record: record["extra"].get("query_log", False))
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """
+    psycopg2 cursor that reports every statement to query_stats.
+    """
+
+    def execute(self, query, vars=None):
+        self._entry = None
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, vars)
+        except Exception as e:
+            query_stats.observe(query, time.perf_counter() - started, error=e)
+            raise
+        self._entry = query_stats.observe(query, time.perf_counter() - started, self.rowcount)
+        return result
+
+    def executemany(self, query, vars_list):
+        self._entry = None
+        started = time.perf_counter()
+        try:
+            result = super().executemany(query, vars_list)
+        except Exception as e:
+            query_stats.observe(query, time.perf_counter() - started, error=e)
+            raise
+        query_stats.observe(query, time.perf_counter() - started, self.rowcount)
+        return result
+
+    def copy_expert(self, sql, file, size=8192):
+        self._entry = None
+        started = time.perf_counter()
+        try:
+            result = super().copy_expert(sql, file, size)
+        except Exception as e:
+            query_stats.observe(sql, time.perf_counter() - started, error=e)
+            raise
+        query_stats.observe(sql, time.perf_counter() - started, self.rowcount)
+        return result
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self._sample((row,))
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._sample(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._sample(rows)
+        return rows
+
+    def _sample(self, rows):
+        # Estimate the result's size once per execute, from its first rows.
+        entry = getattr(self, "_entry", None)
+        if entry is None or not rows:
+            return
+        self._entry = None
+        sample = rows[:BYTES_SAMPLE_ROWS]
+        per_row = sum(_row_bytes(row) for row in sample) / len(sample)
+        query_stats.add_bytes(entry, int(per_row * max(self.rowcount, len(rows))))
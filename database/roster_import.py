@@ -0,0 +1,267 @@
+"""
+Bulk roster import: loads students and teachers from a CSV file.
+
+The file is validated row by row while it streams into a COPY into a temporary
+staging table; the staged rows are then merged into Users plus Students or
+Teachers in the same transaction. Bad lines are reported and skipped, and
+the good ones are still loaded.
+
+CSV columns (header row required, names case-insensitive):
+    UserID, UserRole (Student or Teacher), UserName, UserPass,
+    StudentClass (students), TeacherFName, TeacherLName (teachers)
+UserName defaults to TeacherFName for teachers; UserPass defaults to
+'<username>@123' like the Add Teachers form, with the username lower-cased,
+stripped of spaces and cut to 8 characters so it fits the column.
+
+Usage:
+    python -m database.roster_import roster.csv [--dry-run]
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+from collections import namedtuple
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.availability import student_availability
+from database.db_connection import pooled_connection, close_pool
+from database.queries import normalize_user_id
+
+ROLES = ("Student", "Teacher")
+
+# Column limits from database/schema.sql; over-long values are reported rather than truncated.
+MAX_LENGTHS = {
+    "userid": ("UserID", 10),
+    "username": ("UserName", 45),
+    "userpass": ("UserPass", 12),
+    "studentclass": ("StudentClass", 10),
+    "teacherfname": ("TeacherFName", 45),
+    "teacherlname": ("TeacherLName", 45),
+}
+
+# Staged column order; line_no ties merge-time errors back to the file.
+STAGING_COLUMNS = ("LineNo", "UserID", "UserName", "UserRole", "UserPass", "StudentClass", "TeacherFName", "TeacherLName")
+
+# errors is a list of (line_no, message) pairs, in file order.
+ImportResult = namedtuple("ImportResult", ["rows_read", "students_added", "teachers_added", "errors", "seconds"])
+
+
+def rows_per_second(result):
+    return result.rows_read / result.seconds if result.seconds else 0.0
+
+
+def default_password(user_name):
+    return "".join(user_name.lower().split())[:8] + "@123"
+
+
+def validate_row(row):
+    """
+    Validates one CSV row (keys lower-cased). Returns (staged_values, None) or (None, message).
+    """
+    values = {key: (row.get(key) or "").strip() for key in
+              ("userid", "userrole", "username", "userpass", "studentclass", "teacherfname", "teacherlname")}
+    values["userid"] = normalize_user_id(values["userid"])
+    role = values["userrole"].capitalize()
+
+    if not values["userid"]:
+        return None, "UserID is required"
+    if role not in ROLES:
+        return None, f"UserRole must be one of {', '.join(ROLES)}"
+    if role == "Student":
+        if not values["username"]:
+            return None, "UserName is required for students"
+        if not values["studentclass"]:
+            return None, "StudentClass is required for students"
+        values["teacherfname"] = values["teacherlname"] = ""
+    else:
+        if not values["teacherfname"] or not values["teacherlname"]:
+            return None, "TeacherFName and TeacherLName are required for teachers"
+        values["username"] = values["username"] or values["teacherfname"]
+        values["studentclass"] = ""
+    values["userpass"] = values["userpass"] or default_password(values["username"])
+
+    for key, (column, limit) in MAX_LENGTHS.items():
+        if len(values[key]) > limit:
+            return None, f"{column} is longer than {limit} characters"
+
+    return (values["userid"], values["username"], role, values["userpass"],
+            values["studentclass"] or None, values["teacherfname"] or None, values["teacherlname"] or None), None
+
+
+class _ValidatedRows(io.RawIOBase):
+    """
+    File-like object feeding COPY: reads the CSV lazily, validates each row and
+    yields the valid ones as CSV text, so the whole file is never held in memory.
+    Invalid lines land in self.errors.
+    """
+
+    def __init__(self, csv_file):
+        self._reader = csv.DictReader(csv_file)
+        self._reader.fieldnames = [name.strip().lower() for name in (self._reader.fieldnames or [])]
+        missing = [name for name in ("userid", "userrole") if name not in self._reader.fieldnames]
+        if missing:
+            raise ValueError(f"Roster file is missing column(s): {', '.join(missing)}")
+        self._buffer = b""
+        self._out = io.StringIO()
+        self._writer = csv.writer(self._out, lineterminator="\n")
+        self._seen = {}
+        self.errors = []
+        self.rows_read = 0
+        self.rows_staged = 0
+
+    def readable(self):
+        return True
+
+    def _next_chunk(self):
+        for row in self._reader:
+            self.rows_read += 1
+            line_no = self._reader.line_num
+            staged, error = validate_row(row)
+            if error is None and staged[0] in self._seen:
+                error = f"UserID {staged[0]} already appears on line {self._seen[staged[0]]}"
+            if error is not None:
+                self.errors.append((line_no, error))
+                continue
+            self._seen[staged[0]] = line_no
+            self.rows_staged += 1
+            self._writer.writerow((line_no,) + staged)
+            if self._out.tell() >= 64 * 1024:
+                break
+        chunk = self._out.getvalue().encode("utf-8")
+        self._out.seek(0)
+        self._out.truncate()
+        return chunk
+
+    def readinto(self, target):
+        while not self._buffer:
+            self._buffer = self._next_chunk()
+            if not self._buffer:
+                return 0
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def _merge(cursor, source, dry_run):
+    """
+    Stages the validated rows with COPY and merges them. Returns (students_added, teachers_added).
+    """
+    cursor.execute("""
+        CREATE TEMP TABLE roster_staging (
+            LineNo INTEGER,
+            UserID VARCHAR(10),
+            UserName VARCHAR(45),
+            UserRole VARCHAR(7),
+            UserPass VARCHAR(12),
+            StudentClass VARCHAR(10),
+            TeacherFName VARCHAR(45),
+            TeacherLName VARCHAR(45)
+        ) ON COMMIT DROP
+    """)
+    cursor.copy_expert(
+        f"COPY roster_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+        io.BufferedReader(source),
+    )
+
+    # Keep concurrent user creation out until the merge commits.
+    cursor.execute("LOCK TABLE Users IN SHARE ROW EXCLUSIVE MODE")
+    cursor.execute("""
+        DELETE FROM roster_staging s
+        USING Users u
+        WHERE u.UserID = s.UserID
+        RETURNING s.LineNo, s.UserID
+    """)
+    for line_no, user_id in cursor.fetchall():
+        source.errors.append((line_no, f"UserID {user_id} already exists"))
+
+    if dry_run:
+        cursor.execute("SELECT UserRole, COUNT(*) FROM roster_staging GROUP BY UserRole")
+        counts = dict(cursor.fetchall())
+        return counts.get("Student", 0), counts.get("Teacher", 0)
+
+    cursor.execute("""
+        INSERT INTO Users (UserID, UserName, UserRole, UserPass)
+        SELECT UserID, UserName, UserRole, UserPass FROM roster_staging
+    """)
+    cursor.execute("""
+        INSERT INTO Students (UserID, StudentClass)
+        SELECT UserID, StudentClass FROM roster_staging WHERE UserRole = 'Student'
+    """)
+    students_added = cursor.rowcount
+    cursor.execute("""
+        INSERT INTO Teachers (UserID, TeacherFName, TeacherLName)
+        SELECT UserID, TeacherFName, TeacherLName FROM roster_staging WHERE UserRole = 'Teacher'
+    """)
+    teachers_added = cursor.rowcount
+    return students_added, teachers_added
+
+
+def import_roster(csv_file, dry_run=False, conn=None):
+    """
+    Imports a roster CSV (an open text file or a path) in one transaction.
+    With dry_run the file is validated and staged but nothing is written.
+    Pass conn to run on a specific connection (the caller's search_path applies).
+    Returns an ImportResult.
+    """
+    if isinstance(csv_file, (str, os.PathLike)):
+        with open(csv_file, "r", encoding="utf-8-sig", newline="") as f:
+            return import_roster(f, dry_run, conn)
+    if conn is None:
+        with pooled_connection() as pooled:
+            return import_roster(csv_file, dry_run, pooled)
+
+    started = time.perf_counter()
+    source = _ValidatedRows(csv_file)
+    try:
+        with conn.cursor() as cursor:
+            students_added, teachers_added = _merge(cursor, source, dry_run)
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+            if students_added:
+                # New students get ordinals after the existing ones; the bitsets stay valid.
+                student_availability.invalidate_roster()
+    except Exception as e:
+        conn.rollback()
+        print("Error importing roster:", e)
+        raise e
+    return ImportResult(source.rows_read, students_added, teachers_added,
+                        sorted(source.errors), time.perf_counter() - started)
+
+
+def format_report(result, dry_run=False):
+    """
+    Renders an ImportResult as text for the console or the admin dashboard.
+    """
+    verb = "Would add" if dry_run else "Added"
+    lines = [
+        f"Read {result.rows_read} row(s) in {result.seconds:.2f}s ({rows_per_second(result):,.0f} rows/sec).",
+        f"{verb} {result.students_added} student(s) and {result.teachers_added} teacher(s).",
+    ]
+    if result.errors:
+        lines.append(f"{len(result.errors)} line(s) skipped:")
+        lines.extend(f"  line {line_no}: {message}" for line_no, message in result.errors)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_path")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report without writing anything.")
+    args = parser.parse_args()
+
+    try:
+        result = import_roster(args.csv_path, dry_run=args.dry_run)
+        print(format_report(result, args.dry_run))
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -38,7 +38,7 @@ CREATE TABLE Event_Files (
     UserID CHAR(10) REFERENCES Users(UserID),
     FileName VARCHAR(45) NOT NULL,
     FileContent BYTEA,
-    UploadDate DATE DEFAULT CURRENT_DATE
+    UploadDate DATE DEFAULT CURRENT_DATE,
     FileApprovalStatus VARCHAR(10) DEFAULT 'Pending'
 );
 
@@ -0,0 +1,295 @@
+"""
+Batch teacher assignment: gives every unassigned event (Events.UserID IS NULL)
+in a date range a teacher, respecting the 3-day rule and balancing workload.
+
+Events are planned in date order, each going to the least-loaded teacher with
+no booking within BUFFER_DAYS of it; a teacher's load counts the events they
+already have in the range. Taking events by date is the classic greedy for
+interval graphs: with no earlier bookings in the way it leaves an event
+unassigned only when every teacher is already busy on overlapping events
+(more events in some BUFFER_DAYS + 1 day stretch than there are teachers).
+Existing bookings after an event's date can still block it; for those events
+a repair step moves one conflicting planned event to another free teacher
+(an augmenting path of length two). Events nobody can take are reported.
+
+The events are read, planned and updated in one transaction, with writes to
+Events held off meanwhile so the plan cannot go stale before it commits.
+
+Usage:
+    python -m database.teacher_scheduler [--from 2025-01-06] [--to 2025-04-04] [--dry-run]
+"""
+import argparse
+import heapq
+import os
+import sys
+import time
+from bisect import bisect_left, insort
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+# Add the parent directory to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from psycopg2.extras import execute_values
+
+from database.conflicts import BUFFER_DAYS
+from database.db_connection import pooled_connection, close_pool
+from database.event_cache import event_cache
+
+# assignments is a list of (event_id, event_date, teacher_id) in date order;
+# unassigned a list of (event_id, event_date); loads maps teacher_id -> events
+# in the range after the plan, existing bookings included.
+Plan = namedtuple("Plan", ["assignments", "unassigned", "loads"])
+
+ScheduleResult = namedtuple("ScheduleResult", ["events_read", "plan", "solve_seconds", "seconds"])
+
+UNASSIGNED_EVENTS_QUERY = """
+    SELECT EventID, EventDate
+    FROM Events
+    WHERE UserID IS NULL
+      AND (%(start)s::DATE IS NULL OR EventDate >= %(start)s::DATE)
+      AND (%(end)s::DATE IS NULL OR EventDate <= %(end)s::DATE)
+    ORDER BY EventDate, EventID
+"""
+
+TEACHERS_QUERY = "SELECT UserID FROM Teachers ORDER BY UserID"
+
+BOOKINGS_QUERY = """
+    SELECT UserID, EventID, EventDate
+    FROM Events
+    WHERE UserID IS NOT NULL AND EventDate BETWEEN %s AND %s
+"""
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), "%Y-%m-%d").date()
+
+
+class _Calendar:
+    """
+    One teacher's booked days as sorted date ordinals, plus which of them are
+    planned (movable) rather than existing bookings.
+    """
+    __slots__ = ("days", "planned")
+
+    def __init__(self):
+        self.days = []
+        self.planned = {}  # day ordinal -> event index
+
+    def is_free(self, day):
+        i = bisect_left(self.days, day - BUFFER_DAYS)
+        return i == len(self.days) or self.days[i] > day + BUFFER_DAYS
+
+    def blockers(self, day):
+        i = bisect_left(self.days, day - BUFFER_DAYS)
+        found = []
+        while i < len(self.days) and self.days[i] <= day + BUFFER_DAYS:
+            found.append(self.days[i])
+            i += 1
+        return found
+
+    def book(self, day, index=None):
+        insort(self.days, day)
+        if index is not None:
+            self.planned[day] = index
+
+    def release(self, day):
+        self.days.pop(bisect_left(self.days, day))
+        return self.planned.pop(day)
+
+
+def plan_assignments(events, teachers, bookings=()):
+    """
+    Plans a teacher for each event.
+    events: (event_id, event_date) pairs to assign.
+    teachers: teacher UserIDs.
+    bookings: (teacher_id, event_id, event_date) for events teachers already
+    have; only those within BUFFER_DAYS of an event matter, and all of them
+    count towards the teacher's load.
+    Returns a Plan. Pure; touches no database.
+    """
+    events = sorted((_as_date(event_date), event_id) for event_id, event_date in events)
+    days = [event_date.toordinal() for event_date, _ in events]
+    calendars = {teacher_id: _Calendar() for teacher_id in teachers}
+    loads = dict.fromkeys(calendars, 0)
+    for teacher_id, _, event_date in bookings:
+        if teacher_id in calendars:
+            calendars[teacher_id].book(_as_date(event_date).toordinal())
+            loads[teacher_id] += 1
+
+    # Min-heap of (load, teacher position, teacher_id); entries whose load is
+    # out of date are skipped when popped.
+    order = {teacher_id: position for position, teacher_id in enumerate(calendars)}
+    heap = [(loads[teacher_id], order[teacher_id], teacher_id) for teacher_id in calendars]
+    heapq.heapify(heap)
+
+    assigned = [None] * len(events)
+    unassigned = []
+    for index, day in enumerate(days):
+        skipped = []
+        chosen = None
+        while heap:
+            entry = heapq.heappop(heap)
+            load, _, teacher_id = entry
+            if load != loads[teacher_id]:
+                continue
+            if calendars[teacher_id].is_free(day):
+                chosen = teacher_id
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+
+        if chosen is None:
+            chosen = _repair(index, days, assigned, calendars, loads, order, heap)
+            if chosen is None:
+                unassigned.append(index)
+                continue
+        else:
+            loads[chosen] += 1
+            heapq.heappush(heap, (loads[chosen], order[chosen], chosen))
+        calendars[chosen].book(day, index)
+        assigned[index] = chosen
+
+    return Plan(
+        [(event_id, event_date, assigned[index]) for index, (event_date, event_id) in enumerate(events)
+         if assigned[index] is not None],
+        [(events[index][1], events[index][0]) for index in unassigned],
+        loads,
+    )
+
+
+def _repair(index, days, assigned, calendars, loads, order, heap):
+    """
+    Frees a teacher for event `index` by handing their one conflicting planned
+    event to another teacher who is free for it. Returns the freed teacher (its
+    calendar no longer holds the moved event) or None.
+    """
+    day = days[index]
+    by_load = sorted(calendars, key=lambda t: (loads[t], order[t]))
+    takers = {}  # blocker day -> least-loaded teacher free that day, if any
+    for teacher_id in by_load:
+        calendar = calendars[teacher_id]
+        blockers = calendar.blockers(day)
+        if len(blockers) != 1 or blockers[0] not in calendar.planned:
+            continue
+        moved_day = blockers[0]
+        if moved_day not in takers:
+            # The taker must differ from the teacher being freed, who is not free that day anyway.
+            takers[moved_day] = next((t for t in by_load if calendars[t].is_free(moved_day)), None)
+        other_id = takers[moved_day]
+        if other_id is not None:
+            moved = calendar.release(moved_day)
+            calendars[other_id].book(moved_day, moved)
+            assigned[moved] = other_id
+            loads[other_id] += 1
+            heapq.heappush(heap, (loads[other_id], order[other_id], other_id))
+            return teacher_id
+    return None
+
+
+def _load(cursor, start, end):
+    """
+    Returns (events, teachers, bookings) for plan_assignments.
+    """
+    cursor.execute(UNASSIGNED_EVENTS_QUERY, {"start": start, "end": end})
+    events = cursor.fetchall()
+    cursor.execute(TEACHERS_QUERY)
+    teachers = [row[0] for row in cursor.fetchall()]
+    bookings = []
+    if events:
+        window_start = _as_date(events[0][1]) - timedelta(days=BUFFER_DAYS)
+        window_end = _as_date(events[-1][1]) + timedelta(days=BUFFER_DAYS)
+        cursor.execute(BOOKINGS_QUERY, (window_start, window_end))
+        bookings = cursor.fetchall()
+    return events, teachers, bookings
+
+
+def assign_teachers(start=None, end=None, dry_run=False, conn=None):
+    """
+    Assigns teachers to the unassigned events dated start..end (either bound
+    may be None for open-ended) and commits the whole plan in one transaction.
+    With dry_run the plan is computed but nothing is written.
+    Pass conn to run on a specific connection (the caller's search_path applies).
+    Returns a ScheduleResult.
+    """
+    if conn is None:
+        with pooled_connection() as pooled:
+            return assign_teachers(start, end, dry_run, pooled)
+
+    started = time.perf_counter()
+    try:
+        with conn.cursor() as cursor:
+            # Keep concurrent event writes out until the plan commits, so no
+            # teacher is booked behind its back.
+            cursor.execute("LOCK TABLE Events IN SHARE ROW EXCLUSIVE MODE")
+            events, teachers, bookings = _load(cursor, start, end)
+
+            solve_started = time.perf_counter()
+            plan = plan_assignments(events, teachers, bookings)
+            solve_seconds = time.perf_counter() - solve_started
+
+            if not dry_run and plan.assignments:
+                execute_values(cursor, """
+                    UPDATE Events e SET UserID = v.UserID
+                    FROM (VALUES %s) AS v(EventID, UserID)
+                    WHERE e.EventID = v.EventID AND e.UserID IS NULL
+                """, [(event_id, teacher_id) for event_id, _, teacher_id in plan.assignments],
+                    page_size=1000)
+        if dry_run or not plan.assignments:
+            conn.rollback()
+        else:
+            conn.commit()
+            event_cache.invalidate()
+    except Exception as e:
+        conn.rollback()
+        print("Error assigning teachers:", e)
+        raise e
+    return ScheduleResult(len(events), plan, solve_seconds, time.perf_counter() - started)
+
+
+def format_report(result, dry_run=False):
+    """
+    Renders a ScheduleResult as text for the console or the admin dashboard.
+    """
+    plan = result.plan
+    verb = "Would assign" if dry_run else "Assigned"
+    lines = [
+        f"Read {result.events_read} unassigned event(s); planned in {result.solve_seconds * 1000:.1f} ms, "
+        f"{result.seconds:.2f}s in total.",
+        f"{verb} {len(plan.assignments)} event(s) across {sum(1 for load in plan.loads.values() if load)} teacher(s).",
+    ]
+    if plan.unassigned:
+        lines.append(f"{len(plan.unassigned)} event(s) left unassigned (every teacher is booked within {BUFFER_DAYS} days):")
+        lines.extend(f"  {event_id} ({event_date})" for event_id, event_date in plan.unassigned)
+    if plan.assignments:
+        lines.append("")
+        lines.append("Events per teacher in range: " + ", ".join(
+            f"{teacher_id.strip()} {load}" for teacher_id, load in
+            sorted(plan.loads.items(), key=lambda item: (-item[1], item[0])) if load))
+        lines.append("")
+        lines.extend(f"  {event_date}  {event_id} -> {teacher_id.strip()}"
+                     for event_id, event_date, teacher_id in plan.assignments)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from", dest="start", type=_as_date, help="First event date (YYYY-MM-DD).")
+    parser.add_argument("--to", dest="end", type=_as_date, help="Last event date (YYYY-MM-DD).")
+    parser.add_argument("--dry-run", action="store_true", help="Plan and report without writing anything.")
+    args = parser.parse_args()
+
+    try:
+        result = assign_teachers(args.start, args.end, dry_run=args.dry_run)
+        print(format_report(result, args.dry_run))
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime, time as time_of_day
+
+from psycopg2 import errors
+
+from database.conflicts import IntervalTree
+from database.db_connection import pooled_connection
+from database.event_cache import CACHE_TTL
+
+# Dates whose venue bookings are kept; least recently used dates are dropped beyond it.
+VENUE_CACHE_DAYS = int(os.getenv("VENUE_CACHE_DAYS", 60))
+
+# The exclusion constraint from database/migrations/010_venue_bookings.sql.
+VENUE_CONSTRAINT = "events_venue_no_overlap"
+
+# An event holding `venue` from start_time until end_time (datetime.time values).
+VenueBooking = namedtuple("VenueBooking", ["event_id", "event_name", "venue", "start_time", "end_time"])
+
+VENUES_QUERY = "SELECT VenueName FROM Venues ORDER BY VenueName"
+
+DAY_BOOKINGS_QUERY = """
+    SELECT EventID, EventName, EventVenue, EventStartTime, EventEndTime
+    FROM Events
+    WHERE EventDate = %s
+"""
+
+_TIME_PATTERN = re.compile(r"^(\d{1,2})(?:[:.](\d{2}))?(?:[:.](\d{2}))?\s*(?:([ap])\.?m\.?)?$", re.IGNORECASE)
+
+
+def parse_time(text):
+    """
+    Parses a time as typed into the event forms: "9:30", "09:30:00", "14.15",
+    "2 pm" or "2:15pm". Returns a datetime.time; raises ValueError otherwise.
+    """
+    match = _TIME_PATTERN.match(str(text).strip())
+    if match is None:
+        raise ValueError(f"Invalid time '{text}'! Please use HH:MM, e.g. 09:30 or 2:15 pm.")
+    hour, minute, second, half = match.groups()
+    hour, minute, second = int(hour), int(minute or 0), int(second or 0)
+    if half is not None:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"Invalid time '{text}'! Hours run from 1 to 12 with am/pm.")
+        hour = hour % 12 + (12 if half.lower() == "p" else 0)
+    if hour > 23 or minute > 59 or second > 59:
+        raise ValueError(f"Invalid time '{text}'! Please use HH:MM, e.g. 09:30 or 2:15 pm.")
+    return time_of_day(hour, minute, second)
+
+
+def parse_times(start_text, end_text):
+    """
+    Parses an event's start and end time. Returns (start, end); raises
+    ValueError if either is invalid or the event does not end after it starts.
+    """
+    start, end = parse_time(start_text), parse_time(end_text)
+    if start >= end:
+        raise ValueError("Start time must be before end time!")
+    return start, end
+
+
+def format_booking(booking):
+    return (f"{booking.start_time.strftime('%H:%M')}-{booking.end_time.strftime('%H:%M')}  "
+            f"{booking.event_name} ({booking.event_id})")
+
+
+def describe_venue_conflicts(venue, conflicts):
+    """
+    Formats the bookings that clash with a proposed slot, one line each.
+    """
+    return f"{venue} is already booked:\n" + "\n".join(format_booking(booking) for booking in conflicts)
+
+
+def is_venue_clash(error):
+    """
+    True if a write failed because it would double-book a venue.
+    """
+    return (isinstance(error, errors.ExclusionViolation)
+            and getattr(error.diag, "constraint_name", None) == VENUE_CONSTRAINT)
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), "%Y-%m-%d").date()
+
+
+def _seconds(value):
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+class VenueBookings:
+    """
+    Answers "which events hold this venue at these times" from memory, for
+    feedback while an event form is being filled in.
+
+    Each date's bookings are loaded in one query and kept as one IntervalTree
+    per venue over seconds since midnight. Events hold a venue for [start, end),
+    stored as the closed interval [start, end - 1s], so back-to-back events do
+    not clash, as with the VenueSlot exclusion constraint. Dates expire after
+    `ttl` seconds; event writes must call invalidate_events()/invalidate_dates(),
+    and apply_change() does both for change notifications from other clients.
+    The venue list is reloaded after `ttl` seconds as well.
+    Safe to use from the dashboard worker threads.
+    """
+
+    def __init__(self, connect=pooled_connection, ttl=CACHE_TTL, max_days=VENUE_CACHE_DAYS):
+        self.connect = connect
+        self.ttl = ttl
+        self.max_days = max_days
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._venues = None
+        self._venues_expire = 0.0
+        self._days = OrderedDict()  # date -> (expires_at, {venue: IntervalTree})
+        self._day_events = {}  # date -> event ids on that date
+        self._event_dates = {}  # event id -> date, for events on cached dates
+        self.hits = 0
+        self.misses = 0
+
+    def venues(self):
+        """
+        Returns the venue names from the Venues table, in order.
+        """
+        with self._lock:
+            if self._venues is not None and time.monotonic() < self._venues_expire:
+                return self._venues
+        with self.connect() as conn, conn.cursor() as cursor:
+            cursor.execute(VENUES_QUERY)
+            venues = [row[0] for row in cursor.fetchall()]
+        with self._lock:
+            self._venues = venues
+            self._venues_expire = time.monotonic() + self.ttl
+        return venues
+
+    def conflicts(self, venue, event_date, start_time, end_time, exclude_event_id=None):
+        """
+        Returns the VenueBookings that overlap [start_time, end_time) at venue
+        on event_date, ordered by start time. Pass exclude_event_id when editing
+        so the event does not clash with itself.
+        """
+        trees = self._day(_as_date(event_date))
+        tree = trees.get(venue)
+        if tree is None:
+            return []
+        found = tree.query(_seconds(start_time), _seconds(end_time) - 1)
+        return sorted((booking for booking in found if booking.event_id != exclude_event_id),
+                      key=lambda booking: (booking.start_time, booking.event_id))
+
+    def invalidate(self):
+        """
+        Drops every cached date and the venue list.
+        """
+        with self._lock:
+            self._generation += 1
+            self._venues = None
+            self._days.clear()
+            self._day_events.clear()
+            self._event_dates.clear()
+
+    def invalidate_dates(self, dates):
+        """
+        Drops the bookings of the given dates (date objects or ISO strings).
+        """
+        with self._lock:
+            self._generation += 1
+            for day in dates:
+                self._forget_day(_as_date(day))
+
+    def invalidate_events(self, event_ids):
+        """
+        Drops the dates the given events were cached on, e.g. after they were
+        moved, retimed or deleted.
+        """
+        with self._lock:
+            self._generation += 1
+            for event_id in event_ids:
+                day = self._event_dates.get(event_id)
+                if day is not None:
+                    self._forget_day(day)
+
+    def apply_change(self, change):
+        """
+        Change-listener subscriber (see database.change_listener).
+        """
+        if change.op == "RESYNC":
+            self.invalidate()
+        elif change.table == "events":
+            self.invalidate_events(change.event_ids)
+            self.invalidate_dates(change.dates)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "days": len(self._days),
+            }
+
+    # ---- internals ----
+
+    def _day(self, day):
+        """
+        Returns {venue: IntervalTree} for the date, loading it if needed.
+        """
+        with self._lock:
+            entry = self._days.get(day)
+            if entry is not None and entry[0] > time.monotonic():
+                self._days.move_to_end(day)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        with self.connect() as conn, conn.cursor() as cursor:
+            cursor.execute(DAY_BOOKINGS_QUERY, (day,))
+            rows = cursor.fetchall()
+        by_venue = {}
+        for event_id, event_name, venue, start_time, end_time in rows:
+            booking = VenueBooking(event_id, event_name, venue, start_time, end_time)
+            by_venue.setdefault(venue, []).append((_seconds(start_time), _seconds(end_time) - 1, booking))
+        trees = {venue: IntervalTree(intervals) for venue, intervals in by_venue.items()}
+
+        with self._lock:
+            # Skip storing if invalidated while loading.
+            if generation == self._generation:
+                self._forget_day(day)
+                self._days[day] = (time.monotonic() + self.ttl, trees)
+                self._day_events[day] = {row[0] for row in rows}
+                for event_id in self._day_events[day]:
+                    self._event_dates[event_id] = day
+                while len(self._days) > self.max_days:
+                    self._forget_day(next(iter(self._days)))
+        return trees
+
+    def _forget_day(self, day):
+        self._days.pop(day, None)
+        for event_id in self._day_events.pop(day, ()):
+            if self._event_dates.get(event_id) == day:
+                del self._event_dates[event_id]
+
+# Shared instance used by the event forms.
+venue_bookings = VenueBookings()
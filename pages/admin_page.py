@@ -1,49 +1,65 @@
 from datetime import datetime
+from functools import partial
 import tkinter as tk
-from tkinter import messagebox, Text, ttk
+from tkinter import messagebox, filedialog, Text, ttk
 from tkcalendar import Calendar, DateEntry
 import sys
 import os
-from database.db_connection import get_connection
+from database import queries
+from database.queries import normalize_user_id
+from database.roster_import import format_report, import_roster
+from database.query_stats import query_stats
+from database.venue_bookings import is_venue_clash, parse_times
+from database import teacher_scheduler
+from pages.calendar_window import MonthWindow, as_date, describe_event
+from pages.search_picker import SearchPicker
+from pages.venue_field import VenueField
+from pages.view_pool import pooled_view
+from psycopg2 import errors
 
 # Add parent directory to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 class AdminDashboard:
-    def __init__(self, root, user_id):
-        self.root = root
-        self.user_id = user_id
+    def __init__(self, router):
+        self.router = router
+        self.root = router.root
+        self.frame = tk.Frame(self.root, bg="#f0f0f0")
+        self.user_id = None
+
+        # All database work runs on background threads; results come back via root.after.
+        self.db = router.db
+        self.create_widgets()
+
+    def show(self, user_id):
+        """
+        Called by the router each time the dashboard is displayed for a signed-in admin.
+        """
+        self.user_id = normalize_user_id(user_id)
         self.root.title("Admin Dashboard - Intra-School Event Management")
         self.root.configure(bg="#f0f0f0")
-        self.root.geometry(f"{root.winfo_screenwidth()}x{root.winfo_screenheight()}")
+        self.root.geometry(f"{self.root.winfo_screenwidth()}x{self.root.winfo_screenheight()}")
         self.root.state("zoomed")
 
-        # PostgreSQL connection
-        try:
-            self.conn = get_connection()
-            self.cursor = self.conn.cursor()
-        except Exception as e:
-            messagebox.showerror("Database Connection Error", f"Error connecting to the database: {e}")
-            self.conn = None
-            self.cursor = None
-
-        self.create_widgets()
-
     def create_widgets(self):
-        header = tk.Label(self.root, text="Admin Dashboard", font=("Arial", 18, "bold"), bg="#f0f0f0")
+        header = tk.Label(self.frame, text="Admin Dashboard", font=("Arial", 18, "bold"), bg="#f0f0f0")
         header.pack(pady=20)
 
-        btn_frame = tk.Frame(self.root, bg="#f0f0f0")
+        btn_frame = tk.Frame(self.frame, bg="#f0f0f0")
         btn_frame.pack(pady=10)
 
         btn_style = {"font": ("Arial", 12), "width": 25, "bd": 2, "relief": "raised"}
         tk.Button(btn_frame, text="Dashboard", bg="#007BFF", fg="white", **btn_style, command=self.dashboard).grid(row=0, column=0, pady=10)
         tk.Button(btn_frame, text="Add Teachers", bg="#007BFF", fg="white", **btn_style, command=self.add_teachers).grid(row=1, column=0, pady=10)
-        tk.Button(btn_frame, text="Add Events", bg="#007BFF", fg="white", **btn_style, command=self.add_events).grid(row=2, column=0, pady=10)
-        tk.Button(btn_frame, text="Edit Events", bg="#007BFF", fg="white", **btn_style, command=self.edit_events).grid(row=3, column=0, pady=10)
-        tk.Button(btn_frame, text="Delete Events", bg="#DC3545", fg="white", **btn_style, command=self.delete_events).grid(row=4, column=0, pady=10)
-        tk.Button(btn_frame, text="Logout", bg="#DC3545", fg="white", **btn_style, command=self.logout).grid(row=5, column=0, pady=10)
-
+        tk.Button(btn_frame, text="Import Roster", bg="#007BFF", fg="white", **btn_style, command=self.import_roster).grid(row=2, column=0, pady=10)
+        tk.Button(btn_frame, text="Add Events", bg="#007BFF", fg="white", **btn_style, command=self.add_events).grid(row=3, column=0, pady=10)
+        tk.Button(btn_frame, text="Edit Events", bg="#007BFF", fg="white", **btn_style, command=self.edit_events).grid(row=4, column=0, pady=10)
+        tk.Button(btn_frame, text="Assign Teachers", bg="#007BFF", fg="white", **btn_style, command=self.assign_teachers).grid(row=5, column=0, pady=10)
+        tk.Button(btn_frame, text="Delete Events", bg="#DC3545", fg="white", **btn_style, command=self.delete_events).grid(row=6, column=0, pady=10)
+        tk.Button(btn_frame, text="Diagnostics", bg="#6C757D", fg="white", **btn_style, command=self.diagnostics).grid(row=7, column=0, pady=10)
+        tk.Button(btn_frame, text="Logout", bg="#DC3545", fg="white", **btn_style, command=self.logout).grid(row=8, column=0, pady=10)
+
+    @pooled_view
     def dashboard(self):
         """Opens the Dashboard window with a calendar that highlights event dates based on the database."""
         dash_win = tk.Toplevel(self.root)
@@ -60,36 +76,33 @@ class AdminDashboard:
         calendar = Calendar(cal_frame, selectmode='day', date_pattern="yyyy-MM-dd", font=("Arial", 12))
         calendar.pack(padx=20, pady=10)
 
+        # Configure tags with distinct colors
+        calendar.tag_config("completed", background="red", foreground="white")
+        calendar.tag_config("upcoming", background="green", foreground="white")
+        calendar.tag_config("current", background="blue", foreground="white")
+
         today = datetime.today().date()
 
-        # Fetch events from the database
-        try:
-            query = "SELECT EventName, EventDate FROM Events"
-            self.cursor.execute(query)
-            events = self.cursor.fetchall()
-
-            for event_name, event_date in events:
-                # Ensure event_date is in date format
-                if isinstance(event_date, str):
-                    event_date = datetime.strptime(event_date, "%Y-%m-%d").date()
-
-                if event_date < today:
-                    tag = "completed"  # Completed event
-                elif event_date > today:
-                    tag = "upcoming"  # Upcoming event
-                else:
-                    tag = "current"  # Current event
+        def place_event(row):
+            event_id, event_name, event_date = row[:3]
+            # Ensure event_date is in date format
+            event_date = as_date(event_date)
 
-                calendar.calevent_create(event_date, event_name, tag)
+            if event_date < today:
+                tag = "completed"  # Completed event
+            elif event_date > today:
+                tag = "upcoming"  # Upcoming event
+            else:
+                tag = "current"  # Current event
 
-            # Configure tags with distinct colors
-            calendar.tag_config("completed", background="red", foreground="white")
-            calendar.tag_config("upcoming", background="green", foreground="white")
-            calendar.tag_config("current", background="blue", foreground="white")
+            calendar.calevent_create(event_date, event_name, tag)
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Error fetching events: {e}")
-            return
+        # Only the displayed month and its neighbours are fetched; paging loads more.
+        months = MonthWindow(
+            self.db, calendar, queries.fetch_events_between, place_event, dash_win,
+            on_error=lambda e: messagebox.showerror("Error", f"Error fetching events: {e}", parent=dash_win),
+        )
+        months.refresh()
 
         # Label for instructions
         instruction_label = tk.Label(dash_win, text="Event dates are highlighted on the calendar.", font=("Arial", 12), bg="white")
@@ -100,34 +113,52 @@ class AdminDashboard:
         event_details.pack(pady=10)
 
         def on_date_select(event):
-            """Handles the selection of a date on the calendar."""
+            """Shows the selected day's events, from the loaded months when possible."""
             selected_date = calendar.get_date()
-            try:
-                query = "SELECT EventName FROM Events WHERE EventDate = %s"
-                self.cursor.execute(query, (selected_date,))
-                results = self.cursor.fetchall()
 
+            def show_date_events(results):
+                # Ignore results for a day that is no longer selected
+                if calendar.get_date() != selected_date:
+                    return
                 event_details.config(state="normal")
                 event_details.delete("1.0", tk.END)
 
                 if results:
                     for row in results:
-                        event_details.insert(tk.END, f"Event: {row[0]}\n")
+                        event_details.insert(tk.END, describe_event(row) + "\n")
                 else:
                     event_details.insert(tk.END, "No events on the selected day.")
 
                 event_details.config(state="disabled")
 
-            except Exception as e:
-                messagebox.showerror("Error", f"Error fetching events for the selected date: {e}")
+            months.events_on(selected_date, show_date_events)
 
         # Bind the calendar date selection event
         calendar.bind("<<CalendarSelected>>", on_date_select)
 
+        def on_change(change):
+            """Reloads only the months holding events another client changed."""
+            if change.op == "RESYNC":
+                months.invalidate()
+            elif change.table == "events":
+                months.invalidate(change.dates)
+                if calendar.get_date() in change.dates:
+                    on_date_select(None)
+
+        def refresh():
+            """Reloads the months and the selected day when the dashboard is reopened."""
+            months.invalidate()
+            if calendar.get_date():
+                on_date_select(None)
+
+        self.db.watch_changes(on_change, owner=dash_win)
+        return dash_win, refresh
+
+    @pooled_view
     def add_teachers(self):
         """Handles adding new teachers to the system."""
         def submit_teacher():
-            user_id = user_id_entry.get().strip()
+            user_id = normalize_user_id(user_id_entry.get())
             first_name = fname_entry.get().strip()
             last_name = lname_entry.get().strip()
 
@@ -135,26 +166,16 @@ class AdminDashboard:
                 messagebox.showerror("Error", "All fields are required!")
                 return
 
-            try:
-                query_users = """
-                    INSERT INTO Users (UserID, UserName, UserRole, UserPass)
-                    VALUES (%s, %s, 'Teacher', %s)
-                """
-                user_pass = f"{first_name.lower()}@123"
-                self.cursor.execute(query_users, (user_id, first_name, user_pass))
-
-                query_teachers = """
-                    INSERT INTO Teachers (UserID, TeacherFName, TeacherLName)
-                    VALUES (%s, %s, %s)
-                """
-                self.cursor.execute(query_teachers, (user_id, first_name, last_name))
-                self.conn.commit()
-
+            def on_added(_):
                 messagebox.showinfo("Success", f"Teacher {first_name} added successfully!")
-                add_window.destroy()
-            except Exception as e:
-                self.conn.rollback()
-                messagebox.showerror("Database Error", f"Error adding teacher: {e}")
+                self.router.views.close(add_window)
+
+            self.db.submit(
+                queries.add_teacher, user_id, first_name, last_name,
+                on_success=on_added,
+                on_error=lambda e: messagebox.showerror("Database Error", f"Error adding teacher: {e}", parent=add_window),
+                owner=add_window,
+            )
 
         add_window = tk.Toplevel(self.root)
         add_window.title("Add Teachers")
@@ -180,7 +201,70 @@ class AdminDashboard:
 
         tk.Button(add_window, text="Submit", font=("Arial", 12, "bold"), bg="#007BFF", fg="white", width=15, command=submit_teacher).pack(pady=10)
 
+        def clear_form():
+            for entry in (user_id_entry, fname_entry, lname_entry):
+                entry.delete(0, tk.END)
+
+        return add_window, clear_form
 
+    @pooled_view
+    def import_roster(self):
+        """
+        Bulk-loads students and teachers from a CSV file and shows the per-line report.
+        See database/roster_import.py for the expected columns.
+        """
+        import_win = tk.Toplevel(self.root)
+        import_win.title("Import Roster")
+        import_win.geometry(f"{import_win.winfo_screenwidth()}x{import_win.winfo_screenheight()}")
+        import_win.state("zoomed")
+        import_win.configure(bg="white")
+
+        tk.Label(import_win, text="Import Roster", font=("Arial", 16, "bold"), bg="white").pack(pady=10)
+        tk.Label(
+            import_win,
+            text="CSV columns: UserID, UserRole (Student/Teacher), UserName, UserPass, StudentClass, TeacherFName, TeacherLName",
+            font=("Arial", 11), bg="white",
+        ).pack(pady=5)
+
+        dry_run_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(import_win, text="Validate only (do not save)", variable=dry_run_var, font=("Arial", 12), bg="white").pack(pady=5)
+
+        report = Text(import_win, height=25, width=100, font=("Arial", 11), state="disabled")
+
+        def show_report(text):
+            report.config(state="normal")
+            report.delete("1.0", tk.END)
+            report.insert(tk.END, text)
+            report.config(state="disabled")
+
+        def choose_file():
+            csv_path = filedialog.askopenfilename(
+                parent=import_win,
+                title="Select a Roster CSV",
+                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            )
+            if not csv_path:
+                return
+            dry_run = dry_run_var.get()
+            show_report(f"Importing {os.path.basename(csv_path)}...")
+            self.db.submit(
+                import_roster, csv_path, dry_run,
+                on_success=lambda result: show_report(format_report(result, dry_run)),
+                on_error=lambda e: show_report(f"Import failed, nothing was saved: {e}"),
+                owner=import_win,
+            )
+
+        tk.Button(import_win, text="Choose CSV File", font=("Arial", 12, "bold"), bg="#007BFF", fg="white", width=15, command=choose_file).pack(pady=10)
+        report.pack(padx=20, pady=10)
+
+        def reset():
+            dry_run_var.set(False)
+            show_report("")
+
+        return import_win, reset
+
+
+    @pooled_view
     def add_events(self):
         """
         Admin functionality to add events.
@@ -190,10 +274,10 @@ class AdminDashboard:
             event_date = event_date_entry.get().strip()
             start_time = start_time_entry.get().strip()
             end_time = end_time_entry.get().strip()
-            venue = venue_var.get().strip()
-            selected_teacher = teacher_var.get()
+            venue = venue_field.get()
+            selected_teacher = teacher_picker.get()
 
-            if not event_name or not event_date or not start_time or not end_time or venue == "Select Venue" or selected_teacher == "Select Teacher":
+            if not event_name or not event_date or not start_time or not end_time or venue is None:
                 messagebox.showerror("Error", "All fields are required!")
                 return
 
@@ -201,57 +285,40 @@ class AdminDashboard:
                 # Format event_date
                 day, month, year = map(int, event_date.split('/'))
                 formatted_date = f"{year:04d}-{month:02d}-{day:02d}"
+            except ValueError:
+                messagebox.showerror("Error", "Invalid date format! Please use DD/MM/YYYY.")
+                return
 
-                # Validate times
-                if start_time >= end_time:
-                    messagebox.showerror("Error", "Start time must be before end time!")
-                    return
-
-                # Generate EventID
-                query_id = "SELECT MAX(EventID) FROM Events"
-                self.cursor.execute(query_id)
-                max_id = self.cursor.fetchone()[0]
-                if max_id:
-                    numeric_part = int(max_id[3:])  # Extract numeric part
-                    event_id = f"EID{numeric_part + 1:02d}"  # Increment and format
-                else:
-                    event_id = "EID001"  # Default ID
-
-                user_id = selected_teacher.split(" - ")[0]  # Extract TeacherID which is UserID
+            try:
+                start, end = parse_times(start_time, end_time)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
 
-                # Insert event into the database
-                query = """
-                    INSERT INTO Events (EventID, EventName, EventDate, EventStartTime, EventEndTime, EventVenue, UserID)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """
-                values = (event_id, event_name, formatted_date, start_time, end_time, venue, user_id)
-                self.cursor.execute(query, values)
-                self.conn.commit()
+            # TeacherID is the UserID; without one the event waits for Assign Teachers.
+            user_id = normalize_user_id(selected_teacher[0]) if selected_teacher is not None else None
 
+            def on_created(event_id):
                 messagebox.showinfo("Success", f"Event '{event_name}' created successfully!")
-                add_event_win.destroy()
-            except Exception as e:
-                self.conn.rollback()
-                messagebox.showerror("Database Error", f"Error adding event: {e}")
+                self.router.views.close(add_event_win)
+
+            def on_failed(e):
+                if is_venue_clash(e):
+                    messagebox.showerror("Error", "The venue was just booked for an overlapping time. Please pick another time or venue.", parent=add_event_win)
+                    venue_field.check()
+                elif isinstance(e, errors.ExclusionViolation):
+                    # Another workstation booked this teacher within 3 days since the list was loaded.
+                    messagebox.showerror("Error", "The selected teacher was just booked for another event within 3 days. Please pick another teacher.", parent=add_event_win)
+                    update_teacher_dropdown()
+                else:
+                    messagebox.showerror("Database Error", f"Error adding event: {e}", parent=add_event_win)
 
-        def fetch_available_teachers(event_date):
-            """Fetch teachers who are not assigned to events within 3 days of the given date."""
-            try:
-                query = """
-                    SELECT Teachers.UserID, Users.UserName
-                    FROM Teachers
-                    JOIN Users ON Teachers.UserID = Users.UserID
-                    WHERE Teachers.UserID NOT IN (
-                        SELECT e.UserID
-                        FROM Events e
-                        WHERE e.EventDate BETWEEN (%s::DATE - INTERVAL '3 days') AND (%s::DATE + INTERVAL '3 days')
-                    )
-                """
-                self.cursor.execute(query, (event_date, event_date))
-                return [f"{row[0]} - {row[1]}" for row in self.cursor.fetchall()]
-            except Exception as e:
-                messagebox.showerror("Error", f"Error fetching teachers: {e}")
-                return []
+            self.db.submit(
+                queries.add_event_with_teacher, event_name, formatted_date, start, end, venue, user_id,
+                on_success=on_created,
+                on_error=on_failed,
+                owner=add_event_win,
+            )
 
         add_event_win = tk.Toplevel(self.root)
         add_event_win.title("Add Event")
@@ -284,86 +351,56 @@ class AdminDashboard:
         end_time_entry = tk.Entry(frame, font=("Arial", 12), width=25)
         end_time_entry.grid(row=3, column=1, pady=5)
 
-        # Venue
+        # Venue, with a live check for events already booked there at those times
         tk.Label(frame, text="Venue:", font=("Arial", 12), bg="white").grid(row=4, column=0, sticky="e", padx=5, pady=5)
-        venue_var = tk.StringVar(value="Select Venue")
-        venues = ["Central Auditorium", "Sports Ground", "Classroom"]
-        venue_menu = tk.OptionMenu(frame, venue_var, *venues)
-        venue_menu.config(font=("Arial", 12), width=20)
-        venue_menu.grid(row=4, column=1, pady=5)
-
-        # Teacher Dropdown
-        tk.Label(frame, text="Assign Teacher:", font=("Arial", 12), bg="white").grid(row=5, column=0, sticky="e", padx=5, pady=5)
-        teacher_var = tk.StringVar(value="Select Teacher")
-        teacher_menu = tk.OptionMenu(frame, teacher_var, "Select Event Date First")
-        teacher_menu.config(font=("Arial", 12), width=20)
-        teacher_menu.grid(row=5, column=1, pady=5)
+        venue_field = VenueField(
+            frame, self.db, add_event_win, event_date_entry.get_date,
+            event_date_entry, start_time_entry, end_time_entry,
+        )
+        venue_field.menu.grid(row=4, column=1, pady=5)
+        venue_field.status.grid(row=5, column=1, sticky="w", pady=(0, 5))
+
+        # Teacher Picker: type to search the teachers free within 3 days of the event date.
+        # Optional; events left without one are assigned in bulk by Assign Teachers.
+        tk.Label(frame, text="Assign Teacher:", font=("Arial", 12), bg="white").grid(row=6, column=0, sticky="ne", padx=5, pady=5)
+
+        def available_teachers():
+            return partial(queries.search_available_teachers, event_date_entry.get_date().strftime("%Y-%m-%d"))
+
+        teacher_picker = SearchPicker(
+            frame, self.db, available_teachers(),
+            describe=lambda row: f"{row[0]} - {row[1]}",
+            key=lambda row: (row[1], row[0]),
+            owner=add_event_win, width=25,
+        )
+        teacher_picker.frame.grid(row=6, column=1, pady=5)
 
         def update_teacher_dropdown(*args):
-            selected_date = event_date_entry.get_date()
-            formatted_date = selected_date.strftime("%Y-%m-%d")
-            teachers = fetch_available_teachers(formatted_date)
-            teacher_menu["menu"].delete(0, "end")
-            for teacher in teachers:
-                teacher_menu["menu"].add_command(label=teacher, command=tk._setit(teacher_var, teacher))
+            """Search only teachers who are not assigned to events within 3 days of the selected date."""
+            teacher_picker.search = available_teachers()
+            teacher_picker.clear()
 
-        event_date_entry.bind("<<DateEntrySelected>>", update_teacher_dropdown)
+        event_date_entry.bind("<<DateEntrySelected>>", update_teacher_dropdown, add="+")
 
         # Submit Button
         tk.Button(add_event_win, text="Submit Event", font=("Arial", 12, "bold"), bg="#007BFF", fg="white", width=15, command=submit_event).pack(pady=10)
 
+        def clear_form():
+            for entry in (event_name_entry, start_time_entry, end_time_entry):
+                entry.delete(0, tk.END)
+            venue_field.reset()
+            # Teacher availability may have changed since the window was last open.
+            update_teacher_dropdown()
+
+        return add_event_win, clear_form
 
+
+    @pooled_view
     def edit_events(self):
         """
         Admin functionality to edit events.
         """
-        def fetch_events():
-            """Fetch all events for the dropdown."""
-            try:
-                self.cursor.execute("SELECT EventID, EventName, EventDate FROM Events")
-                return [f"{row[0]} - {row[1]} ({row[2]})" for row in self.cursor.fetchall()]
-            except Exception as e:
-                messagebox.showerror("Error", f"Error fetching events: {e}")
-                return []
-
-        def fetch_event_details(event_id):
-            """Fetch details of a specific event."""
-            try:
-                query = """
-                    SELECT EventName, EventDate, EventStartTime, EventEndTime, EventVenue
-                    FROM Events
-                    WHERE EventID = %s
-                """
-                self.cursor.execute(query, (event_id,))
-                return self.cursor.fetchone()
-            except Exception as e:
-                messagebox.showerror("Error", f"Error fetching event details: {e}")
-                return None
-
-        def fetch_teacher_conflicts(new_date, exclude_event):
-            """Fetch teachers unavailable for the given date."""
-            try:
-                query = """
-                    SELECT DISTINCT e.UserID
-                    FROM Events e
-                    WHERE e.EventID != %s 
-                    AND %s BETWEEN (e.EventDate - INTERVAL '3 days') AND (e.EventDate + INTERVAL '3 days')
-                """
-                self.cursor.execute(query, (exclude_event, new_date))
-                return [row[0] for row in self.cursor.fetchall()]
-            except Exception as e:
-                messagebox.showerror("Error", f"Error fetching conflicts: {e}")
-                return []
-
-        def populate_event_data(*args):
-            """Populate event details when an event is selected."""
-            selected_event = event_var.get()
-            if selected_event == "Select Event":
-                return
-
-            event_id = selected_event.split(" - ")[0]
-            event_details = fetch_event_details(event_id)
-
+        def show_event_details(event_details):
             if event_details:
                 event_name, event_date, start_time, end_time, venue = event_details
                 event_name_entry.delete(0, tk.END)
@@ -373,41 +410,61 @@ class AdminDashboard:
                 start_time_entry.insert(0, start_time)
                 end_time_entry.delete(0, tk.END)
                 end_time_entry.insert(0, end_time)
-                venue_var.set(venue)
+                venue_field.set(venue)
+
+        def populate_event_data(row):
+            """Populate event details when an event is selected."""
+            self.db.submit(
+                queries.fetch_event_details, row[0],
+                on_success=show_event_details,
+                on_error=lambda e: messagebox.showerror("Error", f"Error fetching event details: {e}", parent=edit_win),
+                owner=edit_win,
+            )
+
+        def on_updated(_):
+            messagebox.showinfo("Success", "Event updated successfully!")
+            self.router.views.close(edit_win)
+
+        def on_failed(e):
+            if isinstance(e, ValueError):
+                # edit_event lists the teacher/student bookings that clash with the new date.
+                messagebox.showerror("Error", str(e), parent=edit_win)
+            elif is_venue_clash(e):
+                messagebox.showerror("Error", "The venue was just booked for an overlapping time. Please pick another time or venue.", parent=edit_win)
+                venue_field.check()
+            elif isinstance(e, errors.ExclusionViolation):
+                # Another workstation booked the event's teacher within 3 days of the new date.
+                messagebox.showerror("Error", "The event's teacher was just booked for another event within 3 days. Please pick another date.", parent=edit_win)
+            else:
+                messagebox.showerror("Database Error", f"Error updating event: {e}", parent=edit_win)
 
         def submit_changes():
-            selected_event = event_var.get()
+            selected_event = event_picker.get()
             new_name = event_name_entry.get().strip()
             new_date = event_date_entry.get_date().strftime("%Y-%m-%d")
             new_start_time = start_time_entry.get().strip()
             new_end_time = end_time_entry.get().strip()
-            new_venue = venue_var.get()
+            new_venue = venue_field.get()
 
-            if not selected_event or not new_name or not new_date or not new_start_time or not new_end_time or new_venue == "Select Venue":
+            if not selected_event or not new_name or not new_date or not new_start_time or not new_end_time or new_venue is None:
                 messagebox.showerror("Error", "All fields are required!")
                 return
 
-            event_id = selected_event.split(" - ")[0]
-
-            # Validate dates and conflicts
-            conflicting_teachers = fetch_teacher_conflicts(new_date, event_id)
-            if conflicting_teachers:
-                messagebox.showerror("Error", "The selected teacher is unavailable on the new date!")
+            try:
+                new_start, new_end = parse_times(new_start_time, new_end_time)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
                 return
 
-            try:
-                query = """
-                    UPDATE Events
-                    SET EventName = %s, EventDate = %s, EventStartTime = %s, EventEndTime = %s, EventVenue = %s
-                    WHERE EventID = %s
-                """
-                self.cursor.execute(query, (new_name, new_date, new_start_time, new_end_time, new_venue, event_id))
-                self.conn.commit()
-                messagebox.showinfo("Success", "Event updated successfully!")
-                edit_win.destroy()
-            except Exception as e:
-                self.conn.rollback()
-                messagebox.showerror("Database Error", f"Error updating event: {e}")
+            event_id = selected_event[0]
+
+            # edit_event validates the new date for everyone on the event, then updates
+            self.db.submit(
+                queries.edit_event, event_id, new_name, new_date, new_start, new_end, new_venue,
+                on_success=on_updated,
+                on_error=on_failed,
+                owner=edit_win,
+            )
 
         edit_win = tk.Toplevel(self.root)
         edit_win.title("Edit Events")
@@ -417,12 +474,15 @@ class AdminDashboard:
 
         tk.Label(edit_win, text="Edit Event", font=("Arial", 16, "bold"), bg="white").pack(pady=10)
 
-        # Events Dropdown
+        # Event Picker: type part of the name or the start of the ID
         tk.Label(edit_win, text="Select Event:", font=("Arial", 12), bg="white").pack(anchor="w", padx=20)
-        event_var = tk.StringVar(value="Select Event")
-        event_menu = ttk.Combobox(edit_win, textvariable=event_var, values=fetch_events(), state="readonly", font=("Arial", 12))
-        event_menu.pack(pady=10)
-        event_menu.bind("<<ComboboxSelected>>", populate_event_data)
+        event_picker = SearchPicker(
+            edit_win, self.db, queries.search_events,
+            describe=lambda row: f"{row[0]} - {row[1]} ({row[2]})",
+            key=lambda row: (row[1], row[0]),
+            owner=edit_win, on_select=populate_event_data,
+        )
+        event_picker.frame.pack(pady=10)
 
         frame = tk.Frame(edit_win, bg="white", padx=20, pady=20)
         frame.pack(pady=10)
@@ -445,41 +505,111 @@ class AdminDashboard:
         end_time_entry.grid(row=3, column=1, pady=5)
 
         tk.Label(frame, text="Venue:", font=("Arial", 12), bg="white").grid(row=4, column=0, sticky="e", padx=5, pady=5)
-        venue_var = tk.StringVar(value="Select Venue")
-        venues = ["Central Auditorium", "Sports Ground", "Classroom"]
-        venue_menu = tk.OptionMenu(frame, venue_var, *venues)
-        venue_menu.config(font=("Arial", 12), width=20)
-        venue_menu.grid(row=4, column=1, pady=5)
+        venue_field = VenueField(
+            frame, self.db, edit_win, event_date_entry.get_date,
+            event_date_entry, start_time_entry, end_time_entry,
+            exclude_event_id=lambda: event_picker.get()[0] if event_picker.get() else None,
+        )
+        venue_field.menu.grid(row=4, column=1, pady=5)
+        venue_field.status.grid(row=5, column=1, sticky="w", pady=(0, 5))
 
         tk.Button(edit_win, text="Submit Changes", font=("Arial", 12, "bold"), bg="#007BFF", fg="white", width=20, command=submit_changes).pack(pady=20)
 
+        def reset():
+            for entry in (event_name_entry, start_time_entry, end_time_entry):
+                entry.delete(0, tk.END)
+            venue_field.reset()
+            event_picker.clear()
+
+        return edit_win, reset
+
+
+    @pooled_view
+    def assign_teachers(self):
+        """
+        Gives every event without a teacher in a date range one, balancing
+        workload under the 3-day rule, and shows the plan.
+        See database/teacher_scheduler.py.
+        """
+        assign_win = tk.Toplevel(self.root)
+        assign_win.title("Assign Teachers")
+        assign_win.geometry(f"{assign_win.winfo_screenwidth()}x{assign_win.winfo_screenheight()}")
+        assign_win.state("zoomed")
+        assign_win.configure(bg="white")
+
+        tk.Label(assign_win, text="Assign Teachers", font=("Arial", 16, "bold"), bg="white").pack(pady=10)
+        tk.Label(
+            assign_win,
+            text="Assigns a teacher to every event without one between the dates below.",
+            font=("Arial", 11), bg="white",
+        ).pack(pady=5)
+
+        frame = tk.Frame(assign_win, bg="white")
+        frame.pack(pady=5)
+        tk.Label(frame, text="From (DD/MM/YYYY):", font=("Arial", 12), bg="white").grid(row=0, column=0, sticky="e", padx=5, pady=5)
+        start_entry = DateEntry(frame, font=("Arial", 12), width=15, date_pattern="dd/MM/yyyy")
+        start_entry.grid(row=0, column=1, pady=5)
+        tk.Label(frame, text="To (DD/MM/YYYY):", font=("Arial", 12), bg="white").grid(row=1, column=0, sticky="e", padx=5, pady=5)
+        end_entry = DateEntry(frame, font=("Arial", 12), width=15, date_pattern="dd/MM/yyyy")
+        end_entry.grid(row=1, column=1, pady=5)
+
+        dry_run_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(assign_win, text="Preview only (do not save)", variable=dry_run_var, font=("Arial", 12), bg="white").pack(pady=5)
+
+        report = Text(assign_win, height=25, width=100, font=("Arial", 11), state="disabled")
+
+        def show_report(text):
+            report.config(state="normal")
+            report.delete("1.0", tk.END)
+            report.insert(tk.END, text)
+            report.config(state="disabled")
+
+        def run():
+            start, end = start_entry.get_date(), end_entry.get_date()
+            if start > end:
+                messagebox.showerror("Error", "The start date must not be after the end date!", parent=assign_win)
+                return
+            dry_run = dry_run_var.get()
+            show_report("Planning...")
+            self.db.submit(
+                teacher_scheduler.assign_teachers, start, end, dry_run,
+                on_success=lambda result: show_report(teacher_scheduler.format_report(result, dry_run)),
+                on_error=lambda e: show_report(f"Assignment failed, nothing was saved: {e}"),
+                owner=assign_win,
+            )
+
+        tk.Button(assign_win, text="Assign Teachers", font=("Arial", 12, "bold"), bg="#007BFF", fg="white", width=15, command=run).pack(pady=10)
+        report.pack(padx=20, pady=10)
+
+        def reset():
+            dry_run_var.set(True)
+            show_report("")
+
+        return assign_win, reset
+
 
+    @pooled_view
     def delete_events(self):
         """
         Admin functionality to delete events.
         """
+        def on_deleted(selected_event):
+            messagebox.showinfo("Success", f"Event {selected_event} deleted successfully!")
+            self.router.views.close(delete_window)
+
         def delete_event():
-            selected_event = event_var.get()
-            if selected_event == "Select Event":
+            selected_event = event_picker.get()
+            if selected_event is None:
                 messagebox.showerror("Error", "Please select a valid event to delete!")
                 return
 
-            event_id = selected_event.split(" - ")[0]
-            try:
-                # Delete from dependent tables
-                query_delete_participation = "DELETE FROM Event_Participation WHERE EventID = %s"
-                self.cursor.execute(query_delete_participation, (event_id,))
-
-                # Delete from Events table
-                query_delete_event = "DELETE FROM Events WHERE EventID = %s"
-                self.cursor.execute(query_delete_event, (event_id,))
-                self.conn.commit()
-
-                messagebox.showinfo("Success", f"Event {selected_event} deleted successfully!")
-                delete_window.destroy()
-            except Exception as e:
-                self.conn.rollback()
-                messagebox.showerror("Database Error", f"Error deleting event: {e}")
+            event_id = selected_event[0]
+            self.db.submit(
+                queries.delete_event_with_integrity, event_id,
+                on_success=lambda _: on_deleted(f"{event_id} - {selected_event[1]}"),
+                on_error=lambda e: messagebox.showerror("Database Error", f"Error deleting event: {e}", parent=delete_window),
+                owner=delete_window,
+            )
 
         delete_window = tk.Toplevel(self.root)
         delete_window.title("Delete Events")
@@ -492,42 +622,123 @@ class AdminDashboard:
         frame = tk.Frame(delete_window, bg="white", padx=20, pady=20)
         frame.pack(pady=10)
 
-        tk.Label(frame, text="Select Event:", font=("Arial", 12), bg="white").grid(row=0, column=0, sticky="e", padx=5, pady=5)
+        tk.Label(frame, text="Select Event:", font=("Arial", 12), bg="white").grid(row=0, column=0, sticky="ne", padx=5, pady=5)
 
-        event_var = tk.StringVar(value="Select Event")
-        event_menu = tk.OptionMenu(frame, event_var, "Loading...")
-        event_menu.config(font=("Arial", 12), width=30)
-        event_menu.grid(row=0, column=1, pady=5)
+        # Event Picker: type part of the name or the start of the ID
+        event_picker = SearchPicker(
+            frame, self.db, queries.search_events,
+            describe=lambda row: f"{row[0]} - {row[1]}",
+            key=lambda row: (row[1], row[0]),
+            owner=delete_window, width=30,
+        )
+        event_picker.frame.grid(row=0, column=1, pady=5)
 
-        try:
-            query = "SELECT EventID, EventName FROM Events"
-            self.cursor.execute(query)
-            events = self.cursor.fetchall()
+        tk.Button(delete_window, text="Delete Event", font=("Arial", 12, "bold"), bg="#DC3545", fg="white", width=15, command=delete_event).pack(pady=10)
+        return delete_window, event_picker.clear
 
-            if events:
-                event_menu["menu"].delete(0, "end")
-                for event in events:
-                    event_menu["menu"].add_command(label=f"{event[0]} - {event[1]}", command=tk._setit(event_var, f"{event[0]} - {event[1]}"))
-            else:
-                event_menu["menu"].delete(0, "end")
-                event_menu["menu"].add_command(label="No Events Available", command=lambda: None)
 
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Error fetching events: {e}")
+    @pooled_view
+    def diagnostics(self):
+        """
+        Shows the per-statement timings recorded by database.query_stats in this
+        client, slowest total first, with the latency histogram of the selected row.
+        """
+        diag_win = tk.Toplevel(self.root)
+        diag_win.title("Query Diagnostics")
+        diag_win.geometry(f"{diag_win.winfo_screenwidth()}x{diag_win.winfo_screenheight()}")
+        diag_win.state("zoomed")
+        diag_win.configure(bg="white")
+
+        tk.Label(diag_win, text="Query Diagnostics", font=("Arial", 16, "bold"), bg="white").pack(pady=10)
+        summary_label = tk.Label(diag_win, text="", font=("Arial", 11), bg="white")
+        summary_label.pack(pady=5)
+
+        columns = ("caller", "function", "calls", "errors", "total_ms", "mean_ms", "p95_ms", "max_ms", "rows", "kb", "statement")
+        headings = ("Caller", "Function", "Calls", "Errors", "Total ms", "Mean ms", "p95 ms", "Max ms", "Rows", "KB", "Statement")
+        widths = (220, 200, 60, 60, 80, 70, 70, 70, 70, 60, 500)
+        tree_frame = tk.Frame(diag_win, bg="white")
+        tree_frame.pack(fill="both", expand=True, padx=20, pady=5)
+        tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=18)
+        for column, heading, width in zip(columns, headings, widths):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor="w" if column in ("caller", "function", "statement") else "e")
+        scrollbar = tk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        details = Text(diag_win, height=10, width=140, font=("Courier", 10), state="disabled")
+        rows = {}
+
+        def show_details(event):
+            selection = tree.selection()
+            if not selection:
+                return
+            row = rows[selection[0]]
+            peak = max(row["histogram_ms"].values()) or 1
+            lines = [row["statement"], ""]
+            lines += [f"{bucket:>8} ms  {count:>7}  {'#' * round(40 * count / peak)}"
+                      for bucket, count in row["histogram_ms"].items()]
+            details.config(state="normal")
+            details.delete("1.0", tk.END)
+            details.insert(tk.END, "\n".join(lines))
+            details.config(state="disabled")
+
+        tree.bind("<<TreeviewSelect>>", show_details)
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            rows.clear()
+            for row in query_stats.snapshot():
+                item = tree.insert("", tk.END, values=(
+                    row["caller"], row["function"], row["calls"], row["errors"], f"{row['total_ms']:.1f}",
+                    f"{row['mean_ms']:.2f}", f"{row['p95_ms']:.2f}", f"{row['max_ms']:.2f}", row["rows"],
+                    f"{row['bytes'] / 1024:.1f}", row["statement"],
+                ))
+                rows[item] = row
+            summary = query_stats.summary()
+            summary_label.config(text=(
+                f"{summary['calls']:,} statement(s) in {summary['statements']} group(s), "
+                f"{summary['errors']} failed, {summary['total_ms'] / 1000:.2f}s in the database. "
+                f"Statements over {query_stats.slow_query_ms:.0f} ms are logged as slow."
+            ))
+            details.config(state="normal")
+            details.delete("1.0", tk.END)
+            details.config(state="disabled")
+
+        def export_json():
+            path = filedialog.asksaveasfilename(
+                parent=diag_win, title="Save Query Diagnostics",
+                defaultextension=".json", filetypes=[("JSON files", "*.json")],
+            )
+            if not path:
+                return
+            try:
+                query_stats.dump_json(path)
+            except OSError as e:
+                messagebox.showerror("Error", f"Could not save the diagnostics: {e}", parent=diag_win)
 
-        tk.Button(delete_window, text="Delete Event", font=("Arial", 12, "bold"), bg="#DC3545", fg="white", width=15, command=delete_event).pack(pady=10)
+        def reset_stats():
+            query_stats.reset()
+            refresh()
+
+        btn_frame = tk.Frame(diag_win, bg="white")
+        btn_frame.pack(pady=5)
+        tk.Button(btn_frame, text="Refresh", font=("Arial", 12, "bold"), bg="#007BFF", fg="white", width=15, command=refresh).grid(row=0, column=0, padx=5)
+        tk.Button(btn_frame, text="Export JSON", font=("Arial", 12, "bold"), bg="#007BFF", fg="white", width=15, command=export_json).grid(row=0, column=1, padx=5)
+        tk.Button(btn_frame, text="Reset", font=("Arial", 12, "bold"), bg="#DC3545", fg="white", width=15, command=reset_stats).grid(row=0, column=2, padx=5)
+        details.pack(padx=20, pady=10)
 
+        refresh()
+        return diag_win, refresh
 
     def logout(self):
-        self.root.destroy()
-        from pages.login_page import LoginPage
-        root = tk.Tk()
-        root.state("zoomed")  # Ensure the login page opens in full screen
-        LoginPage(root)
-        root.mainloop()
+        self.router.logout()
 
 if __name__ == "__main__":
+    from pages.router import ViewRouter
     root = tk.Tk()
-    root.state("zoomed")  # Open the admin page in full screen
-    AdminDashboard(root)
+    router = ViewRouter(root)
+    router.show_dashboard("Admin", "test_user")  # Replace "test_user" with an actual user ID
     root.mainloop()
+    router.shutdown()
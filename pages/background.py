@@ -0,0 +1,236 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox
+
+from database.change_listener import get_listener
+from database.query_stats import calling_function, run_tagged
+
+# How often the Tk thread checks for finished background work.
+POLL_INTERVAL_MS = 25
+# How often windows watching for database changes pick up new notifications.
+CHANGE_POLL_INTERVAL_MS = 250
+
+# Frames skipped when naming the screen that submitted work (for query_stats):
+# this module and the pager that submits on a screen's behalf.
+SUBMITTER_PLUMBING = (
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "paging.py"),
+)
+
+
+class BackgroundTask:
+    """
+    Handle for work submitted to a BackgroundExecutor.
+    cancel() drops the result: the callbacks will not run. Work that has not
+    started yet is not run at all.
+    """
+
+    def __init__(self, future, on_success, on_error, owner, on_progress=None):
+        self.future = future
+        self.on_success = on_success
+        self.on_error = on_error
+        self.owner = owner
+        self.on_progress = on_progress
+        self.cancelled = False
+        # Latest progress arguments from the worker; only the newest is shown.
+        self.pending_progress = None
+
+    def report_progress(self, *args):
+        """
+        Called from the worker thread; on_progress(*args) runs on the next poll.
+        """
+        self.pending_progress = args
+
+    def cancel(self):
+        self.cancelled = True
+        self.future.cancel()
+
+
+class BackgroundExecutor:
+    """
+    Runs database calls on worker threads so the Tk main loop never blocks.
+
+    Results are handed back on the Tk thread: a poll loop scheduled with
+    root.after() picks up finished futures and invokes on_success(result) or
+    on_error(exception). Widgets must only be touched from those callbacks.
+
+    Work can be tied to an owner window. While the owner has work in flight its
+    cursor shows as busy, and when the owner is destroyed its pending work is
+    cancelled so callbacks never run against dead widgets.
+    """
+
+    def __init__(self, root, max_workers=4):
+        self.root = root
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._tasks = []
+        self._busy_counts = {}
+        self._watched_owners = set()
+        self._poll_id = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, fn, *args, on_success=None, on_error=None, owner=None, on_progress=None, **kwargs):
+        """
+        Runs fn(*args, **kwargs) on a worker thread.
+        on_success(result) / on_error(exception) run later on the Tk thread.
+        When on_error is omitted, errors are shown in a message box.
+        With on_progress, fn also gets a progress=... keyword it may call from the
+        worker; on_progress receives the latest arguments on the Tk thread.
+        owner defaults to the root window.
+        Statements fn runs are attributed to the method that called submit()
+        in database.query_stats.
+        Returns a BackgroundTask that can be cancelled.
+        """
+        if self._closed:
+            raise RuntimeError("BackgroundExecutor has been shut down.")
+        owner = owner or self.root
+        task = BackgroundTask(None, on_success, on_error, owner, on_progress)
+        if on_progress is not None:
+            kwargs["progress"] = task.report_progress
+        caller = calling_function(SUBMITTER_PLUMBING)
+        task.future = self._pool.submit(run_tagged, caller, fn, *args, **kwargs)
+        with self._lock:
+            self._tasks.append(task)
+        self._watch_owner(owner)
+        self._set_busy(owner, +1)
+        self._schedule_poll()
+        return task
+
+    def watch_changes(self, on_change, owner=None):
+        """
+        Calls on_change(notification) on the Tk thread for every change notification
+        (see database.change_listener) until owner is destroyed or the executor shuts down.
+        Notifications that arrive while owner is hidden (a closed pooled view) are
+        dropped; the view's refresh() reloads it when it is opened again.
+        Does nothing when no change listener is running.
+        """
+        listener = get_listener()
+        if listener is None:
+            return
+        owner = owner or self.root
+        inbox = queue.SimpleQueue()
+        unsubscribe = listener.subscribe(inbox.put)
+
+        def drain():
+            if self._closed or not self._owner_alive(owner):
+                unsubscribe()
+                return
+            hidden = self._owner_hidden(owner)
+            while True:
+                try:
+                    notification = inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if not hidden:
+                    on_change(notification)
+            self.root.after(CHANGE_POLL_INTERVAL_MS, drain)
+
+        self.root.after(CHANGE_POLL_INTERVAL_MS, drain)
+
+    def cancel_owner(self, owner):
+        """
+        Cancels every pending task tied to the given window.
+        """
+        with self._lock:
+            tasks = [task for task in self._tasks if task.owner is owner]
+        for task in tasks:
+            task.cancel()
+
+    def shutdown(self):
+        """
+        Cancels all pending work and stops the worker threads without waiting for them.
+        """
+        self._closed = True
+        with self._lock:
+            tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---- Tk-thread internals ----
+
+    def _watch_owner(self, owner):
+        if owner in self._watched_owners or owner is self.root:
+            return
+        self._watched_owners.add(owner)
+
+        def on_destroy(event):
+            # <Destroy> also fires for every child widget; react only to the owner itself.
+            if event.widget is owner:
+                self._watched_owners.discard(owner)
+                self._busy_counts.pop(owner, None)
+                self.cancel_owner(owner)
+
+        owner.bind("<Destroy>", on_destroy, add="+")
+
+    def _set_busy(self, owner, delta):
+        count = self._busy_counts.get(owner, 0) + delta
+        if count > 0:
+            self._busy_counts[owner] = count
+        else:
+            self._busy_counts.pop(owner, None)
+        try:
+            if owner.winfo_exists():
+                owner.configure(cursor="watch" if count > 0 else "")
+        except Exception:
+            pass
+
+    def _schedule_poll(self):
+        if self._poll_id is None and not self._closed:
+            self._poll_id = self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        with self._lock:
+            finished = [task for task in self._tasks if task.future.done() or task.cancelled]
+            self._tasks = [task for task in self._tasks if task not in finished]
+        for task in finished:
+            self._finish(task)
+        for task in list(self._tasks):
+            self._deliver_progress(task)
+        if self._tasks:
+            self._schedule_poll()
+
+    def _deliver_progress(self, task):
+        progress, task.pending_progress = task.pending_progress, None
+        if progress is not None and not task.cancelled and self._owner_alive(task.owner):
+            task.on_progress(*progress)
+
+    def _finish(self, task):
+        owner_alive = self._owner_alive(task.owner)
+        if owner_alive:
+            self._set_busy(task.owner, -1)
+        if task.cancelled or not owner_alive:
+            return
+        if task.on_progress is not None:
+            self._deliver_progress(task)
+        error = task.future.exception()
+        if error is not None:
+            if task.on_error is not None:
+                task.on_error(error)
+            else:
+                messagebox.showerror("Database Error", str(error), parent=task.owner)
+        elif task.on_success is not None:
+            task.on_success(task.future.result())
+
+    @staticmethod
+    def _owner_alive(owner):
+        try:
+            return bool(owner.winfo_exists())
+        except Exception:
+            return False
+
+    @staticmethod
+    def _owner_hidden(owner):
+        try:
+            return owner.state() == "withdrawn"
+        except Exception:
+            return False
@@ -0,0 +1,157 @@
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+# Months of events a calendar view keeps; older ones are fetched again when revisited.
+MONTH_CACHE_SIZE = 12
+# Months loaded on each side of the displayed one, so paging to them is instant.
+PREFETCH_MONTHS = 1
+
+
+def add_months(first_of_month, count):
+    index = first_of_month.year * 12 + first_of_month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def format_time(value):
+    return value.strftime("%H:%M") if hasattr(value, "strftime") else str(value)[:5]
+
+
+def describe_event(row):
+    """
+    One line of the date details box for a range-query row.
+    """
+    event_id, event_name, _, start_time, end_time, venue, teacher_name = row
+    line = f"{format_time(start_time)}-{format_time(end_time)}  {event_name} ({event_id}) at {venue}"
+    return f"{line}, {teacher_name}" if teacher_name else line
+
+
+def as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    return value
+
+
+class MonthWindow:
+    """
+    Keeps a tkcalendar Calendar populated with only the events around the displayed
+    month, instead of every event ever created.
+
+    fetch_range(start, end) runs on the executor and returns rows starting with
+    (EventID, EventName, EventDate) with start <= EventDate < end; place(row) draws
+    one row on the calendar. The displayed month plus PREFETCH_MONTHS on each side
+    are fetched in one range query, and again whenever <<CalendarMonthChanged>>
+    moves the window onto months not loaded yet. Loaded months are kept, least
+    recently shown evicted first, up to cache_size, and their rows are indexed by
+    date so a clicked day is answered from memory (see events_on).
+    """
+
+    def __init__(self, executor, calendar, fetch_range, place, owner, on_error=None, cache_size=MONTH_CACHE_SIZE):
+        self.executor = executor
+        self.calendar = calendar
+        self.fetch_range = fetch_range
+        self.place = place
+        self.owner = owner
+        self.on_error = on_error
+        self.cache_size = cache_size
+        self._months = OrderedDict()  # first day of month -> rows
+        self._days = {}  # date -> rows, for every loaded month
+        self._loading = set()
+        self._generation = 0
+        calendar.bind("<<CalendarMonthChanged>>", lambda event: self.refresh(), add="+")
+
+    def window(self):
+        """
+        The first days of the months that should be loaded right now, in order.
+        """
+        month, year = self.calendar.get_displayed_month()
+        shown = date(year, month, 1)
+        return [add_months(shown, n) for n in range(-PREFETCH_MONTHS, PREFETCH_MONTHS + 1)]
+
+    def events_on(self, day, on_result):
+        """
+        Calls on_result(rows) with the events on day: at once when its month is
+        loaded, otherwise after a one-day query on the executor.
+        """
+        day = as_date(day)
+        if day.replace(day=1) in self._months:
+            on_result(self._days.get(day, []))
+            return
+        self.executor.submit(self.fetch_range, day, day + timedelta(days=1),
+                             on_success=on_result, on_error=self.on_error, owner=self.owner)
+
+    def refresh(self):
+        """
+        Redraws the window from the loaded months and fetches the ones missing.
+        """
+        months = self.window()
+        missing = [month for month in months if month not in self._months and month not in self._loading]
+        if missing:
+            self._load(missing[0], add_months(missing[-1], 1))
+        self._paint(months)
+
+    def invalidate(self, dates=None):
+        """
+        Forgets the months holding any of the given dates (all months when None)
+        and reloads the ones on screen. Loads already running are discarded.
+        """
+        self._generation += 1
+        if dates is None:
+            self._months.clear()
+            self._days.clear()
+        else:
+            for day in dates:
+                self._forget(as_date(day).replace(day=1))
+        self.refresh()
+
+    # ---- internals ----
+
+    def _load(self, start, end):
+        span = []
+        month = start
+        while month < end:
+            span.append(month)
+            month = add_months(month, 1)
+        self._loading.update(span)
+        generation = self._generation
+
+        def on_loaded(rows):
+            self._loading.difference_update(span)
+            if generation != self._generation:
+                # Invalidated while loading: these rows may be stale.
+                self.refresh()
+                return
+            by_month = {month: [] for month in span}
+            for row in rows:
+                by_month[as_date(row[2]).replace(day=1)].append(row)
+            for month, month_rows in by_month.items():
+                self._remember(month, month_rows)
+            self._paint(self.window())
+
+        def on_failed(error):
+            self._loading.difference_update(span)
+            if self.on_error is not None:
+                self.on_error(error)
+
+        self.executor.submit(self.fetch_range, start, end, on_success=on_loaded, on_error=on_failed, owner=self.owner)
+
+    def _remember(self, month, rows):
+        self._forget(month)
+        self._months[month] = rows
+        for row in rows:
+            self._days.setdefault(as_date(row[2]), []).append(row)
+        while len(self._months) > self.cache_size:
+            self._forget(next(iter(self._months)))
+
+    def _forget(self, month):
+        for row in self._months.pop(month, ()):
+            self._days.pop(as_date(row[2]), None)
+
+    def _paint(self, months):
+        self.calendar.calevent_remove("all")
+        for month in months:
+            if month in self._months:
+                self._months.move_to_end(month)
+                for row in self._months[month]:
+                    self.place(row)
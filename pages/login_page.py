@@ -6,29 +6,44 @@ import os
 # Add the parent directory to the system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Import the database connection module
-from database.db_connection import get_connection
+# Import the database query module
+from database.queries import get_user, normalize_user_id
 
 class LoginPage:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Intra-School Event Management - Login")
-        self.root.state("zoomed")  # Set the window to full screen
-        self.root.configure(bg="#f0f0f0")  # Light gray background
+    def __init__(self, router):
+        self.router = router
+        self.root = router.root
+        self.frame = tk.Frame(self.root, bg="#f0f0f0")  # Light gray background
 
         # Placeholder strings
         self.username_placeholder = "Enter Username"
         self.password_placeholder = "Enter Password"
 
+        # The credential check runs on a background thread so the window stays responsive.
+        self.db = router.db
         self.create_widgets()
 
+    def show(self):
+        """
+        Called by the router each time the login page is displayed; clears the previous user's input.
+        """
+        self.root.title("Intra-School Event Management - Login")
+        self.root.state("zoomed")  # Set the window to full screen
+        self.root.configure(bg="#f0f0f0")
+        for entry, placeholder in ((self.username_entry, self.username_placeholder),
+                                   (self.password_entry, self.password_placeholder)):
+            entry.delete(0, tk.END)
+            entry.config(show="")
+            self.set_placeholder(entry, placeholder)
+        self.role_var.set("Select Role")
+
     def create_widgets(self):
         """
         Creates the UI elements for the login page, including placeholder text for
         username and password fields.
         """
         # Frame for the login area (white background, with a groove border)
-        login_frame = tk.Frame(self.root, bg="white", padx=20, pady=20, bd=2, relief="groove")
+        login_frame = tk.Frame(self.frame, bg="white", padx=20, pady=20, bd=2, relief="groove")
         login_frame.place(relx=0.5, rely=0.5, anchor="center")
 
         # Title label
@@ -130,56 +145,33 @@ class LoginPage:
             messagebox.showerror("Error", "Please select a role.")
             return
 
-        try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            query = """
-                SELECT UserID, UserRole FROM Users
-                WHERE UserName = %s AND UserPass = %s AND UserRole = %s
-            """
-            cursor.execute(query, (username, password, role))
-            result = cursor.fetchone()
-
+        def on_result(result):
             if result:
                 user_id, user_role = result
+                user_id = normalize_user_id(user_id)
                 messagebox.showinfo("Success", f"Welcome, {role}!")
                 self.navigate_to_dashboard(user_role, user_id)
             else:
                 messagebox.showerror("Error", "Invalid credentials or role")
-            
-            cursor.close()
-            conn.close()
-        except Exception as e:
-            messagebox.showerror("Error", f"Database error: {e}")
+
+        self.db.submit(
+            get_user, username, password, role,
+            on_success=on_result,
+            on_error=lambda e: messagebox.showerror("Error", f"Database error: {e}"),
+        )
 
     def navigate_to_dashboard(self, role, user_id):
         """
-        Closes the current window and opens the role-specific dashboard.
+        Swaps the login page for the role-specific dashboard in the same window.
         Passes the `user_id` to the relevant dashboard.
         """
-        self.root.destroy()
-        if role == "Admin":
-            from pages.admin_page import AdminDashboard
-            root = tk.Tk()
-            root.state("zoomed")
-            AdminDashboard(root, user_id)
-            root.mainloop()
-        elif role == "Teacher":
-            from pages.teacher_page import TeacherDashboard
-            root = tk.Tk()
-            root.state("zoomed")
-            TeacherDashboard(root, user_id)
-            root.mainloop()
-        elif role == "Student":
-            from pages.student_page import StudentDashboard
-            root = tk.Tk()
-            root.state("zoomed")
-            StudentDashboard(root, user_id)
-            root.mainloop()
+        self.router.show_dashboard(role, user_id)
 
 
 if __name__ == "__main__":
+    from pages.router import ViewRouter
     root = tk.Tk()
-    root.state("zoomed")  # Open the login page in full screen
-    LoginPage(root)
+    router = ViewRouter(root)
+    router.show_login()
     root.mainloop()
+    router.shutdown()
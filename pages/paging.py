@@ -0,0 +1,94 @@
+from tkinter import messagebox
+
+from database.queries import SEARCH_PAGE_SIZE
+
+# Fetch the next page once a list is scrolled past this fraction.
+NEXT_PAGE_AT = 0.9
+
+
+class KeysetPager:
+    """
+    Loads a long query result one page at a time for a scrolling list.
+
+    fetch(after=..., limit=...) runs on the executor and returns up to limit rows
+    following the row whose key is after (None for the first page); key(row)
+    gives that cursor, e.g. (EventDate, EventID). on_rows(rows) is called on the
+    Tk thread with each page as it arrives, to be appended to the widget.
+
+    Hook the widget's yscrollcommand to scrolled(first, last): the next page is
+    fetched once the view nears the end, so only pages the user scrolls to are
+    queried and rendered. A view that is not yet full also reports the end, so
+    pages keep coming until it fills or the rows run out. reset() starts over;
+    replies for earlier resets are dropped.
+    """
+
+    def __init__(self, executor, fetch, key, owner, on_rows, on_error=None, page_size=SEARCH_PAGE_SIZE):
+        self.executor = executor
+        self.fetch = fetch
+        self.key = key
+        self.owner = owner
+        self.on_rows = on_rows
+        self.on_error = on_error
+        self.page_size = page_size
+        self.rows = []
+        self.exhausted = False
+        self._generation = 0
+        self._task = None
+
+    def reset(self, fetch=None):
+        """
+        Drops the loaded rows and fetches the first page, with a new fetch if given.
+        The caller clears the widget.
+        """
+        if fetch is not None:
+            self.fetch = fetch
+        self.cancel()
+        self.rows = []
+        self.exhausted = False
+        self._load(None)
+
+    def cancel(self):
+        """
+        Stops loading; a page still in flight is discarded.
+        """
+        self._generation += 1
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def more(self):
+        """
+        Fetches the next page unless one is loading or there are no more rows.
+        """
+        if self.rows and not self.exhausted and self._task is None:
+            self._load(self.key(self.rows[-1]))
+
+    def scrolled(self, first, last):
+        if float(last) >= NEXT_PAGE_AT:
+            self.more()
+
+    def _load(self, after):
+        generation = self._generation
+
+        def on_loaded(rows):
+            if generation != self._generation:
+                return
+            self._task = None
+            self.rows.extend(rows)
+            self.exhausted = len(rows) < self.page_size
+            self.on_rows(rows)
+
+        def on_failed(error):
+            if generation != self._generation:
+                return
+            self._task = None
+            self.exhausted = True
+            if self.on_error is not None:
+                self.on_error(error)
+            else:
+                messagebox.showerror("Error", f"Error loading rows: {error}", parent=self.owner)
+
+        self._task = self.executor.submit(
+            self.fetch, after=after, limit=self.page_size,
+            on_success=on_loaded, on_error=on_failed, owner=self.owner,
+        )
@@ -0,0 +1,69 @@
+import tkinter as tk
+
+from pages.admin_page import AdminDashboard
+from pages.background import BackgroundExecutor
+from pages.login_page import LoginPage
+from pages.student_page import StudentDashboard
+from pages.teacher_page import TeacherDashboard
+from pages.view_pool import ViewPool
+
+DASHBOARDS = {
+    "Admin": AdminDashboard,
+    "Teacher": TeacherDashboard,
+    "Student": StudentDashboard,
+}
+
+
+class ViewRouter:
+    """
+    Owns the application's single Tk root and swaps full-window views in place.
+
+    Each view builds its widgets once into its own frame (view.frame) and is cached
+    by class, so logging in and out repeatedly re-packs existing frames instead of
+    creating new roots and nested main loops. view.show(...) rebinds the view to the
+    current user. The views share one BackgroundExecutor for the life of the app.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        # All database work runs on background threads; results come back via root.after.
+        self.db = BackgroundExecutor(root)
+        # Dashboard sub-windows are built once per login and reused.
+        self.views = ViewPool(root)
+        self.current = None
+        self._views = {}
+
+    def show_login(self):
+        self._show(LoginPage)
+
+    def show_dashboard(self, role, user_id):
+        if role not in DASHBOARDS:
+            raise ValueError(f"Unknown role: {role}")
+        self._show(DASHBOARDS[role], user_id)
+
+    def logout(self):
+        """
+        Closes every window the signed-in user opened, pooled or not, and returns to
+        the login page. Their pending database work is cancelled along with the windows.
+        """
+        self.views.clear()
+        self.close_windows()
+        self.show_login()
+
+    def close_windows(self):
+        for widget in self.root.winfo_children():
+            if isinstance(widget, tk.Toplevel):
+                widget.destroy()
+
+    def shutdown(self):
+        self.db.shutdown()
+
+    def _show(self, view_class, *args):
+        view = self._views.get(view_class)
+        if view is None:
+            view = self._views[view_class] = view_class(self)
+        if self.current is not None and self.current is not view:
+            self.current.frame.pack_forget()
+        self.current = view
+        view.show(*args)
+        view.frame.pack(fill="both", expand=True)
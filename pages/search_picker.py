@@ -0,0 +1,127 @@
+import tkinter as tk
+from functools import partial
+from tkinter import messagebox
+
+from database.queries import SEARCH_PAGE_SIZE
+from pages.paging import KeysetPager
+
+# Quiet time after the last keystroke before a search is sent.
+SEARCH_DELAY_MS = 250
+
+
+class SearchPicker:
+    """
+    Type-ahead picker for lists too long to load into a menu.
+
+    The user types into an entry; once typing pauses for delay_ms the text is
+    sent to search(text, after=..., limit=...) on the executor, and the first
+    page of matching rows is listed below. Scrolling near the end of the list
+    fetches the next page, passing key(last row) as after (see KeysetPager).
+    Replies to searches that have since been superseded are dropped.
+
+    describe(row) gives the text shown for a row. get() returns the picked row,
+    or None when nothing is picked or the text was edited afterwards.
+    Place the picker with picker.frame. Assign a new search (e.g. a
+    functools.partial with other filters) and call clear() to start over.
+    """
+
+    def __init__(self, parent, executor, search, describe, key, owner, on_select=None,
+                 page_size=SEARCH_PAGE_SIZE, delay_ms=SEARCH_DELAY_MS, width=40, height=6, font=("Arial", 12)):
+        self.search = search
+        self.describe = describe
+        self.owner = owner
+        self.on_select = on_select
+        self.delay_ms = delay_ms
+        self.selected = None
+        self._text = None
+        self._after_id = None
+        self.pager = KeysetPager(
+            executor, None, key, owner, self._show_rows,
+            on_error=lambda e: messagebox.showerror("Error", f"Error searching: {e}", parent=owner),
+            page_size=page_size,
+        )
+
+        self.frame = tk.Frame(parent, bg="white")
+        self.entry = tk.Entry(self.frame, font=font, width=width)
+        self.entry.pack(fill="x")
+        list_frame = tk.Frame(self.frame, bg="white")
+        list_frame.pack(fill="both", expand=True)
+        self.listbox = tk.Listbox(list_frame, font=font, width=width, height=height, exportselection=False)
+        scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=self.listbox.yview)
+        self._scrollbar = scrollbar
+        self.listbox.config(yscrollcommand=self._on_scroll)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        self.entry.bind("<KeyRelease>", self._on_key)
+        self.entry.bind("<Down>", lambda event: self._focus_list())
+        self.listbox.bind("<<ListboxSelect>>", self._on_pick)
+        self.listbox.bind("<Return>", self._on_pick)
+
+        self.reload()
+
+    def get(self):
+        return self.selected
+
+    def clear(self):
+        """
+        Empties the entry and the selection and lists the first page again.
+        """
+        self.entry.delete(0, tk.END)
+        self.selected = None
+        self.reload()
+
+    def reload(self):
+        """
+        Runs the search for the current text again, from the first page.
+        """
+        if self._after_id is not None:
+            self.frame.after_cancel(self._after_id)
+            self._after_id = None
+        self._text = self.entry.get().strip()
+        self.listbox.delete(0, tk.END)
+        self.pager.reset(partial(self.search, self._text))
+
+    # ---- internals ----
+
+    def _show_rows(self, rows):
+        for row in rows:
+            self.listbox.insert(tk.END, self.describe(row))
+
+    def _on_key(self, event):
+        text = self.entry.get().strip()
+        if text == self._text and self._after_id is None:
+            return
+        self.selected = None
+        if self._after_id is not None:
+            self.frame.after_cancel(self._after_id)
+        self._after_id = self.frame.after(self.delay_ms, self._search_typed)
+
+    def _search_typed(self):
+        self._after_id = None
+        if self.entry.get().strip() != self._text:
+            self.reload()
+
+    def _on_scroll(self, first, last):
+        self._scrollbar.set(first, last)
+        self.pager.scrolled(first, last)
+
+    def _focus_list(self):
+        if self.pager.rows:
+            self.listbox.focus_set()
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox.selection_set(0)
+            self.listbox.activate(0)
+
+    def _on_pick(self, event):
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+        row = self.pager.rows[selection[0]]
+        self.selected = row
+        self.entry.delete(0, tk.END)
+        self.entry.insert(0, self.describe(row))
+        # The entry now shows the pick, not search text; don't search for it.
+        self._text = self.entry.get().strip()
+        if self.on_select is not None:
+            self.on_select(row)
@@ -3,31 +3,43 @@ import sys
 import tkinter as tk
 from tkinter import messagebox, filedialog, ttk
 from datetime import datetime
-from database.db_connection import get_connection
+from database import queries
+from database.blob_store import MAX_UPLOAD_SIZE
+from database.queries import normalize_user_id
+from pages.calendar_window import MonthWindow, as_date, describe_event
+from pages.view_pool import pooled_view
 
 # Define project root (one level above the pages folder)
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
 class StudentDashboard:
-    def __init__(self, root, user_id):
-        self.root = root
-        self.user_id = user_id
+    def __init__(self, router):
+        self.router = router
+        self.root = router.root
+        self.frame = tk.Frame(self.root, bg="#f0f0f0")
+        self.user_id = None
+
+        # All database work runs on background threads; results come back via root.after.
+        self.db = router.db
+        # Entry widget name -> full path of the PDF picked for it
+        self.picked_files = {}
+        # Entry widget name -> (progress bar, status label) shown under it while uploading
+        self.upload_progress = {}
+        self.create_widgets()
+
+    def show(self, user_id):
+        """
+        Called by the router each time the dashboard is displayed for a signed-in student.
+        """
+        self.user_id = normalize_user_id(user_id)
+        # The previous user's upload windows are gone; drop what referred to them.
+        self.picked_files = {}
+        self.upload_progress = {}
         self.root.title("Student Dashboard - Intra-School Event Management")
         self.root.configure(bg="#f0f0f0")
         self.root.geometry("700x500")
 
-        # PostgreSQL connection
-        try:
-            self.conn = get_connection()
-            self.cursor = self.conn.cursor()
-        except Exception as e:
-            messagebox.showerror("Database Connection Error", f"Error connecting to the database: {e}")
-            self.conn = None
-            self.cursor = None
-
-        self.create_widgets()
-
     def create_widgets(self):
         """
         Creates the main Student Dashboard with 4 buttons:
@@ -36,10 +48,10 @@ class StudentDashboard:
         3. View Feedback
         4. Logout
         """
-        header = tk.Label(self.root, text="Student Dashboard", font=("Arial", 18, "bold"), bg="#f0f0f0")
+        header = tk.Label(self.frame, text="Student Dashboard", font=("Arial", 18, "bold"), bg="#f0f0f0")
         header.pack(pady=20)
 
-        btn_frame = tk.Frame(self.root, bg="#f0f0f0")
+        btn_frame = tk.Frame(self.frame, bg="#f0f0f0")
         btn_frame.pack(pady=10)
 
         btn_style = {"font": ("Arial", 12), "width": 25, "bd": 2, "relief": "raised"}
@@ -60,24 +72,19 @@ class StudentDashboard:
         new_win.configure(bg="white")
         return new_win
 
-    def fetch_student_events(self):
+    def fetch_student_events(self, on_loaded, owner):
         """
-        Fetches events associated with the logged-in student.
-        Returns a list of tuples (EventID, EventName, EventDate).
+        Fetches events associated with the logged-in student in the background.
+        on_loaded receives a list of tuples (EventID, EventName, EventDate).
         """
-        try:
-            query = """
-                SELECT e.EventID, e.EventName, e.EventDate 
-                FROM Events e
-                JOIN Event_Participation ep ON e.EventID = ep.EventID
-                WHERE TRIM(LOWER(ep.UserID)) = LOWER(TRIM(%s))
-            """
-            self.cursor.execute(query, (self.user_id,))
-            return self.cursor.fetchall()
-        except Exception as e:
-            messagebox.showerror("Error", f"Error fetching events: {e}")
-            return []
+        self.db.submit(
+            queries.fetch_student_events, self.user_id,
+            on_success=on_loaded,
+            on_error=lambda e: messagebox.showerror("Error", f"Error fetching events: {e}", parent=owner),
+            owner=owner,
+        )
 
+    @pooled_view
     def view_events(self):
         """
         Opens a window to display a calendar and event details.
@@ -95,13 +102,11 @@ class StudentDashboard:
         calendar.pack(padx=20, pady=10, expand=True, fill="x")
 
         today_date = datetime.today().date()
-        events = self.fetch_student_events()
-        for event_id, event_name, event_date in events:
+
+        def place_event(row):
+            event_id, event_name, event_date = row[:3]
             try:
-                if isinstance(event_date, str):
-                    ev_date = datetime.strptime(event_date, "%Y-%m-%d").date()
-                else:
-                    ev_date = event_date
+                ev_date = as_date(event_date)
                 if ev_date < today_date:
                     tag = "completed"
                 elif ev_date > today_date:
@@ -112,6 +117,15 @@ class StudentDashboard:
             except Exception as ex:
                 print(f"Error creating calendar event: {ex}")
 
+        # Only the displayed month and its neighbours are fetched; paging loads more.
+        months = MonthWindow(
+            self.db, calendar,
+            lambda start, end: queries.fetch_student_events_between(self.user_id, start, end),
+            place_event, view_win,
+            on_error=lambda e: messagebox.showerror("Error", f"Error fetching events: {e}", parent=view_win),
+        )
+        months.refresh()
+
         calendar.tag_config("completed", background="red", foreground="white")
         calendar.tag_config("upcoming", background="green", foreground="white")
         calendar.tag_config("current", background="blue", foreground="white")
@@ -123,28 +137,47 @@ class StudentDashboard:
 
         def on_date_select(event):
             selected_date = calendar.get_date()  # Format: yyyy-mm-dd
-            try:
-                query = """
-                    SELECT e.EventName 
-                    FROM Events e
-                    JOIN Event_Participation ep ON e.EventID = ep.EventID
-                    WHERE TRIM(LOWER(ep.UserID)) = LOWER(TRIM(%s)) AND e.EventDate = %s
-                """
-                self.cursor.execute(query, (self.user_id, selected_date))
-                results = self.cursor.fetchall()
+
+            def on_results(results):
+                # Ignore results for a day that is no longer selected
+                if calendar.get_date() != selected_date:
+                    return
                 event_details.config(state="normal")
                 event_details.delete("1.0", tk.END)
                 if results:
                     for row in results:
-                        event_details.insert(tk.END, f"Event: {row[0]}\n")
+                        event_details.insert(tk.END, describe_event(row) + "\n")
                 else:
                     event_details.insert(tk.END, "No events on the selected day.")
                 event_details.config(state="disabled")
-            except Exception as e:
-                messagebox.showerror("Error", f"Error fetching events: {e}")
+
+            # Answered from the loaded months; only other days need a query.
+            months.events_on(selected_date, on_results)
 
         calendar.bind("<<CalendarSelected>>", on_date_select)
 
+        def on_change(change):
+            """Reloads this student's events when another client changes them."""
+            if change.op == "RESYNC" or (change.table == "event_participation" and self.user_id in change.user_ids):
+                months.invalidate()
+            elif change.table == "events":
+                # Old and new dates are both listed, so this covers events moved in or out.
+                months.invalidate(change.dates)
+            else:
+                return
+            if calendar.get_date():
+                on_date_select(None)
+
+        def refresh():
+            """Reloads the months and the selected day when the view is reopened."""
+            months.invalidate()
+            if calendar.get_date():
+                on_date_select(None)
+
+        self.db.watch_changes(on_change, owner=view_win)
+        return view_win, refresh
+
+    @pooled_view
     def upload_files(self):
         """
         Opens a window where students can upload up to 3 files associated with an event.
@@ -153,11 +186,18 @@ class StudentDashboard:
         upload_win = self.open_fullscreen_window("Upload Files")
         tk.Label(upload_win, text="Upload Files", font=("Arial", 16, "bold"), bg="white").pack(pady=10)
 
-        events = self.fetch_student_events()
         tk.Label(upload_win, text="Select Event:", font=("Arial", 12), bg="white").pack(pady=10, anchor="w")
         selected_event = tk.StringVar(upload_win)
-        event_options = [f"{row[0]} - {row[1]} ({row[2]})" for row in events]
-        tk.OptionMenu(upload_win, selected_event, *event_options).pack(pady=5, anchor="w")
+        event_menu = tk.OptionMenu(upload_win, selected_event, "Loading...")
+        event_menu.pack(pady=5, anchor="w")
+
+        def on_events_loaded(events):
+            event_menu["menu"].delete(0, "end")
+            for row in events:
+                option = f"{row[0]} - {row[1]} ({row[2]})"
+                event_menu["menu"].add_command(label=option, command=tk._setit(selected_event, option))
+
+        self.fetch_student_events(on_events_loaded, upload_win)
 
         file_entries = []
         for i in range(1, 4):
@@ -183,6 +223,12 @@ class StudentDashboard:
             )
             browse_button.pack(pady=5)
 
+            progress_bar = ttk.Progressbar(section_frame, orient="horizontal", mode="determinate", length=300)
+            progress_bar.pack(pady=(5, 0))
+            status_label = tk.Label(section_frame, text="", font=("Arial", 10), bg="white")
+            status_label.pack()
+            self.upload_progress[str(file_name_entry)] = (progress_bar, status_label)
+
         tk.Button(
             upload_win,
             text="Request Feedback",
@@ -190,9 +236,21 @@ class StudentDashboard:
             bg="#007BFF",
             fg="white",
             width=15,
-            command=lambda: self.submit_files(selected_event.get(), file_entries)
+            command=lambda: self.submit_files(selected_event.get(), file_entries, upload_win)
         ).pack(pady=20)
 
+        def reset():
+            selected_event.set("")
+            for entry in file_entries:
+                entry.delete(0, tk.END)
+                progress_bar, status_label = self.upload_progress[str(entry)]
+                progress_bar["value"] = 0
+                status_label.config(text="")
+            self.picked_files.clear()
+            self.fetch_student_events(on_events_loaded, upload_win)
+
+        return upload_win, reset
+
     def pick_pdf_file(self, entry_widget):
         """
         Opens a file dialog restricted to PDF files, updates the entry if valid.
@@ -204,21 +262,19 @@ class StudentDashboard:
         if file_path:
             if not file_path.lower().endswith(".pdf"):
                 messagebox.showerror("Error", "Only PDF files are allowed.")
+            elif os.path.getsize(file_path) > MAX_UPLOAD_SIZE:
+                messagebox.showerror("Error", f"Files larger than {MAX_UPLOAD_SIZE // (1024 * 1024)} MB cannot be uploaded.")
             else:
-                uploads_dir = os.path.join(PROJECT_ROOT, "uploads")
-                if not os.path.exists(uploads_dir):
-                    os.makedirs(uploads_dir)
-                dest_path = os.path.join(uploads_dir, os.path.basename(file_path))
-                with open(file_path, "rb") as src_file:
-                    with open(dest_path, "wb") as dest_file:
-                        dest_file.write(src_file.read())
+                # The file is read straight from where it was picked when submitted;
+                # the blob store keeps the only copy.
                 file_name = os.path.basename(file_path)
+                self.picked_files[str(entry_widget)] = file_path
                 entry_widget.delete(0, tk.END)
                 entry_widget.insert(0, file_name)
 
-    def submit_files(self, event_str, file_entries):
+    def submit_files(self, event_str, file_entries, owner):
         """
-        Submits the files to the database and saves them locally in the uploads directory.
+        Submits the files to the blob store and the database.
         Updates the file record with FileApprovalStatus set to "Pending".
         """
         if not event_str:
@@ -231,32 +287,46 @@ class StudentDashboard:
             messagebox.showerror("Error", f"Error parsing event details: {ex}")
             return
 
+        uploads_dir = os.path.join(PROJECT_ROOT, "uploads")
         for entry in file_entries:
             file_name = entry.get().strip()
             if file_name:
-                try:
-                    uploads_dir = os.path.join(PROJECT_ROOT, "uploads")
-                    if not os.path.exists(uploads_dir):
-                        os.makedirs(uploads_dir)
+                picked_path = self.picked_files.get(str(entry))
+                if picked_path and os.path.basename(picked_path) == file_name:
+                    file_path = picked_path
+                else:
                     file_path = os.path.join(uploads_dir, file_name)
-                    with open(file_path, "rb") as file_obj:
-                        file_content = file_obj.read()
-
-                    from database.queries import generate_unique_file_id
-                    file_id = generate_unique_file_id()
-
-                    query = """
-                        INSERT INTO Event_Files (FileID, EventID, UserID, FileName, FileContent, FileApprovalStatus)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """
-                    self.cursor.execute(query, (file_id, event_id, self.user_id, file_name, file_content, "Pending"))
-                    self.conn.commit()
-
-                    messagebox.showinfo("Success", f"File '{file_name}' uploaded successfully.")
-                except Exception as e:
-                    self.conn.rollback()
-                    messagebox.showerror("Error", f"Failed to upload '{file_name}': {e}")
-
+                progress_bar, status_label = self.upload_progress[str(entry)]
+                progress_bar["value"] = 0
+                status_label.config(text="Uploading...")
+
+                def on_progress(copied, total, bar=progress_bar, label=status_label):
+                    if total:
+                        bar["value"] = 100 * copied / total
+                        label.config(text=f"{copied / (1024 * 1024):.1f} of {total / (1024 * 1024):.1f} MB")
+                    else:
+                        label.config(text=f"{copied / (1024 * 1024):.1f} MB")
+
+                def on_uploaded(_, name=file_name, bar=progress_bar, label=status_label):
+                    bar["value"] = 100
+                    label.config(text="Uploaded")
+                    messagebox.showinfo("Success", f"File '{name}' uploaded successfully.", parent=owner)
+
+                def on_failed(e, name=file_name, bar=progress_bar, label=status_label):
+                    bar["value"] = 0
+                    label.config(text="Upload failed")
+                    messagebox.showerror("Error", f"Failed to upload '{name}': {e}", parent=owner)
+
+                # Bind the widgets per iteration so each callback updates its own file.
+                self.db.submit(
+                    queries.add_event_file, event_id, self.user_id, file_name, file_path,
+                    on_success=on_uploaded,
+                    on_error=on_failed,
+                    on_progress=on_progress,
+                    owner=owner,
+                )
+
+    @pooled_view
     def view_feedback(self):
         """
         Opens a window for the student to view feedback for a selected event.
@@ -272,24 +342,24 @@ class StudentDashboard:
         top_frame.pack(pady=10)
         tk.Label(top_frame, text="Select Event:", font=("Arial", 12), bg="white").grid(row=0, column=0, sticky="e", padx=5, pady=5)
         self.feedback_event_var = tk.StringVar(value="Select Event")
-        try:
-            # Fetch events for the logged-in student along with the teacher name
-            query = """
-                SELECT e.EventID, e.EventName, u.UserName
-                FROM Events e
-                JOIN Event_Participation ep ON e.EventID = ep.EventID
-                JOIN Users u ON e.UserID = u.UserID
-                WHERE TRIM(LOWER(ep.UserID)) = LOWER(TRIM(%s))
-            """
-            self.cursor.execute(query, (self.user_id,))
-            events_data = self.cursor.fetchall()
-            # Format: "EventID-EventName-TeacherName"
-            events_list = [f"{row[0]}-{row[1]}-{row[2]}" for row in events_data]
-        except Exception as e:
-            messagebox.showerror("Error", f"Error fetching events: {e}")
-            events_list = []
-        event_menu = ttk.Combobox(top_frame, textvariable=self.feedback_event_var, values=events_list, state="readonly", width=40)
+        event_menu = ttk.Combobox(top_frame, textvariable=self.feedback_event_var, values=[], state="readonly", width=40)
         event_menu.grid(row=0, column=1, padx=5, pady=5)
+        self.feedback_win = feedback_win
+
+        def on_events_loaded(events_data):
+            # Format: "EventID-EventName-TeacherName"
+            event_menu["values"] = [f"{row[0]}-{row[1]}-{row[2]}" for row in events_data]
+
+        # Fetch events for the logged-in student along with the teacher name
+        def load_events():
+            self.db.submit(
+                queries.fetch_student_events_with_teachers, self.user_id,
+                on_success=on_events_loaded,
+                on_error=lambda e: messagebox.showerror("Error", f"Error fetching events: {e}", parent=feedback_win),
+                owner=feedback_win,
+            )
+
+        load_events()
 
         # Button to load feedback for the selected event
         tk.Button(top_frame, text="Load Feedback", font=("Arial", 12, "bold"), bg="#007BFF", fg="white",
@@ -301,6 +371,15 @@ class StudentDashboard:
         self.feedback_display = tk.Text(feedback_win, font=("Arial", 12), width=70, height=15, bd=2, relief="sunken", state="disabled")
         self.feedback_display.pack(padx=20, pady=10)
 
+        def reset():
+            self.feedback_event_var.set("Select Event")
+            self.feedback_display.config(state="normal")
+            self.feedback_display.delete("1.0", tk.END)
+            self.feedback_display.config(state="disabled")
+            load_events()
+
+        return feedback_win, reset
+
     def load_feedback(self):
         """
         Loads and displays the teacher feedback and file status for the selected event.
@@ -318,16 +397,7 @@ class StudentDashboard:
             messagebox.showerror("Error", f"Error parsing event details: {e}")
             return
 
-        try:
-            query = """
-                SELECT f.Feedback, ef.FileApprovalStatus
-                FROM Feedback f
-                JOIN Event_Files ef ON f.FileID = ef.FileID
-                WHERE ef.EventID = %s AND ef.UserID = %s
-            """
-            self.cursor.execute(query, (event_id, self.user_id))
-            feedback_results = self.cursor.fetchall()
-
+        def on_feedback_loaded(feedback_results):
             self.feedback_display.config(state="normal")
             self.feedback_display.delete("1.0", tk.END)
             if feedback_results:
@@ -336,21 +406,23 @@ class StudentDashboard:
             else:
                 self.feedback_display.insert(tk.END, "No feedback found for the selected event.")
             self.feedback_display.config(state="disabled")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error loading feedback: {e}")
+
+        self.db.submit(
+            queries.fetch_feedback, event_id, self.user_id,
+            on_success=on_feedback_loaded,
+            on_error=lambda e: messagebox.showerror("Error", f"Error loading feedback: {e}", parent=self.feedback_win),
+            owner=self.feedback_win,
+        )
 
 
     def logout(self):
-        self.root.destroy()
-        from pages.login_page import LoginPage
-        root = tk.Tk()
-        root.state("zoomed")  # Ensure the login page opens in full screen
-        LoginPage(root)
-        root.mainloop()
+        self.router.logout()
 
 
 if __name__ == "__main__":
+    from pages.router import ViewRouter
     root = tk.Tk()
-    root.state("zoomed")  # Ensure the main window opens in full screen
-    StudentDashboard(root, user_id="test_user")  # Replace "test_user" with an actual user ID
+    router = ViewRouter(root)
+    router.show_dashboard("Student", "test_user")  # Replace "test_user" with an actual user ID
     root.mainloop()
+    router.shutdown()
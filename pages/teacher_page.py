@@ -1,10 +1,19 @@
 import os
 import sys
 import tkinter as tk
+from datetime import datetime
+from functools import partial
 from tkinter import messagebox, ttk
-from datetime import timedelta
-from database.db_connection import get_connection
-from database.queries import generate_unique_feedback
+from database import queries
+from database.availability import student_availability
+from database.download_cache import download_cache
+from database.queries import normalize_user_id
+from database.venue_bookings import is_venue_clash, parse_times
+from pages.paging import KeysetPager
+from pages.search_picker import SearchPicker
+from pages.venue_field import VenueField
+from pages.view_pool import pooled_view
+from psycopg2 import errors
 
 
 # Append the parent directory (project root) to the Python path
@@ -17,35 +26,43 @@ try:
 except ImportError:
     CALENDAR_AVAILABLE = False
 
+# Files fetched per page in provide_feedback: two screens of the file list.
+FILE_PAGE_SIZE = 20
+
 
 # Helper function to underline text
 def underline_text(text):
     return "".join([char + "\u0332" for char in text])
 
+
 class TeacherDashboard:
-    def __init__(self, root, user_id):
-        self.root = root
-        self.user_id = user_id
+    def __init__(self, router):
+        self.router = router
+        self.root = router.root
+        self.frame = tk.Frame(self.root, bg="#f0f0f0")
+        self.user_id = None
+
+        # All database work runs on background threads; results come back via root.after.
+        self.db = router.db
+        # FileID -> (ContentHash, FileName) of the files listed in Provide Feedback
+        self.listed_files = {}
+        self.create_widgets()
+
+    def show(self, user_id):
+        """
+        Called by the router each time the dashboard is displayed for a signed-in teacher.
+        """
+        self.user_id = normalize_user_id(user_id)
+        self.listed_files = {}
         self.root.title("Teacher Dashboard - Intra-School Event Management")
         self.root.configure(bg="#f0f0f0")
         self.root.geometry("700x500")
 
-        # PostgreSQL connection
-        try:
-            self.conn = get_connection()
-            self.cursor = self.conn.cursor()
-        except Exception as e:
-            messagebox.showerror("Database Connection Error", f"Error connecting to the database: {e}")
-            self.conn = None
-            self.cursor = None
-
-        self.create_widgets()
-
     def create_widgets(self):
-        header = tk.Label(self.root, text="Teacher Dashboard", font=("Arial", 18, "bold"), bg="#f0f0f0")
+        header = tk.Label(self.frame, text="Teacher Dashboard", font=("Arial", 18, "bold"), bg="#f0f0f0")
         header.pack(pady=20)
 
-        btn_frame = tk.Frame(self.root, bg="#f0f0f0")
+        btn_frame = tk.Frame(self.frame, bg="#f0f0f0")
         btn_frame.pack(pady=10)
 
         btn_style = {"font": ("Arial", 12), "width": 25, "bd": 2, "relief": "raised"}
@@ -59,6 +76,7 @@ class TeacherDashboard:
     # ----------------------------------------------------
     # 1. Create Events
     # ----------------------------------------------------
+    @pooled_view
     def create_events(self):
         """
         Opens a window to create new events.
@@ -70,10 +88,10 @@ class TeacherDashboard:
             event_date = event_date_entry.get().strip()
             start_time = start_time_entry.get().strip()
             end_time = end_time_entry.get().strip()
-            venue = venue_var.get().strip()
+            venue = venue_field.get()
 
             # Validate inputs
-            if not event_name or not event_date or not start_time or not end_time or venue == "Select Venue":
+            if not event_name or not event_date or not start_time or not end_time or venue is None:
                 messagebox.showerror("Error", "All fields are required!")
                 return
 
@@ -81,41 +99,37 @@ class TeacherDashboard:
                 # Convert event_date from DD/MM/YYYY to YYYY-MM-DD
                 day, month, year = map(int, event_date.split('/'))
                 formatted_date = f"{year:04d}-{month:02d}-{day:02d}"
+            except ValueError:
+                messagebox.showerror("Error", "Invalid date format! Please use DD/MM/YYYY.")
+                return
 
-                # Example validation: Start time should be before End time
-                if start_time >= end_time:
-                    messagebox.showerror("Error", "Start time must be before End time.")
-                    return
-
-                # Generate EventID
-                query_id = "SELECT MAX(EventID) FROM Events"
-                self.cursor.execute(query_id)
-                max_id = self.cursor.fetchone()[0]
-                if max_id:
-                    numeric_part = int(max_id[3:])  # Extract numeric part
-                    event_id = f"EID{numeric_part + 1:02d}"  # Increment and format
-                else:
-                    event_id = "EID001"  # Default ID
-
-                # Assuming 'UserID' of the logged-in teacher is available as 'self.user_id'
-                user_id = self.user_id
-
-                # Save to database
-                query = """
-                    INSERT INTO Events (EventID, EventName, EventDate, EventStartTime, EventEndTime, EventVenue, UserID)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """
-                values = (event_id, event_name, formatted_date, start_time, end_time, venue, user_id)
-                self.cursor.execute(query, values)
-                self.conn.commit()
+            try:
+                start, end = parse_times(start_time, end_time)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
 
+            def on_created(event_id):
                 # Success message
                 messagebox.showinfo("Success", f"Event '{event_name}' created successfully!")
-                create_win.destroy()
-            except ValueError:
-                messagebox.showerror("Error", "Invalid date format! Please use DD/MM/YYYY.")
-            except Exception as e:
-                messagebox.showerror("Database Error", f"An error occurred: {e}")
+                self.router.views.close(create_win)
+
+            def on_failed(e):
+                if is_venue_clash(e):
+                    messagebox.showerror("Error", "The venue was just booked for an overlapping time. Please pick another time or venue.", parent=create_win)
+                    venue_field.check()
+                elif isinstance(e, errors.ExclusionViolation):
+                    messagebox.showerror("Error", "You already have an event within 3 days of this date.", parent=create_win)
+                else:
+                    messagebox.showerror("Database Error", f"An error occurred: {e}", parent=create_win)
+
+            # The logged-in teacher is assigned to the events they create
+            self.db.submit(
+                queries.add_event_with_teacher, event_name, formatted_date, start, end, venue, self.user_id,
+                on_success=on_created,
+                on_error=on_failed,
+                owner=create_win,
+            )
 
         # Create Event Window
         create_win = tk.Toplevel(self.root)
@@ -154,13 +168,15 @@ class TeacherDashboard:
         end_time_entry = tk.Entry(frame, font=("Arial", 12), width=25)
         end_time_entry.grid(row=3, column=1, pady=5)
 
-        # Venue
+        # Venue, with a live check for events already booked there at those times
         tk.Label(frame, text="Venue:", font=("Arial", 12), bg="white").grid(row=4, column=0, sticky="e", padx=5, pady=5)
-        venue_var = tk.StringVar(value="Select Venue")
-        venues = ["Central Auditorium", "Sports Ground", "Classroom"]
-        venue_menu = tk.OptionMenu(frame, venue_var, *venues)
-        venue_menu.config(font=("Arial", 12), width=20)
-        venue_menu.grid(row=4, column=1, pady=5)
+        venue_field = VenueField(
+            frame, self.db, create_win,
+            lambda: datetime.strptime(event_date_entry.get().strip(), "%d/%m/%Y").date(),
+            event_date_entry, start_time_entry, end_time_entry,
+        )
+        venue_field.menu.grid(row=4, column=1, pady=5)
+        venue_field.status.grid(row=5, column=1, sticky="w", pady=(0, 5))
 
         # Submit Button
         tk.Button(
@@ -173,14 +189,24 @@ class TeacherDashboard:
             command=save_event
         ).pack(pady=10)
 
+        def clear_form():
+            for entry in (event_name_entry, start_time_entry, end_time_entry):
+                entry.delete(0, tk.END)
+            venue_field.reset()
+
+        return create_win, clear_form
+
 
     # ----------------------------------------------------
     # 2. Add Students
     # ----------------------------------------------------
+    @pooled_view
     def add_students(self):
         """
-        Opens a window to add students to an event or assign roles.
-        Dynamically fetches events and students based on the teacher's user_id.
+        Opens a roster window to assign several students to an event at once.
+        The teacher selects students (Ctrl/Shift-click), sets a responsibility per student,
+        and assigns them all in one batch; rows that cannot be assigned are reported
+        individually and the window stays open for further changes.
         """
         add_win = tk.Toplevel(self.root)
         add_win.title("Add Students")
@@ -190,150 +216,149 @@ class TeacherDashboard:
 
         tk.Label(add_win, text="Add Students", font=("Arial", 16, "bold"), bg="white").pack(pady=10)
 
-        def fetch_teacher_events():
-            """
-            Fetches events associated with the logged-in teacher.
-            """
-            try:
-                query = "SELECT EventID, EventName FROM Events WHERE UserID = %s"
-                self.cursor.execute(query, (self.user_id,))
-                result = self.cursor.fetchall()
-                return [(row[0], row[1]) for row in result]  # Return a list of (EventID, EventName)
-            except Exception as e:
-                messagebox.showerror("Database Error", f"Error fetching events: {e}")
-                return []
-
-        def fetch_available_students(selected_event_id):
-            """
-            Fetches students not assigned to events and those who meet the criteria for the selected event.
-            """
-            try:
-                # Get the event date for the selected event
-                query_event_date = "SELECT EventDate FROM Events WHERE EventID = %s"
-                self.cursor.execute(query_event_date, (selected_event_id,))
-                event_date = self.cursor.fetchone()[0]
-
-                # Fetch students who are not assigned to any event
-                query_no_event = """
-                    SELECT Students.UserID, Users.UserName 
-                    FROM Students
-                    JOIN Users ON Students.UserID = Users.UserID
-                    WHERE Students.UserID NOT IN (SELECT UserID FROM Event_Participation)
-                """
-
-                query_not_conflicting = """
-                    SELECT Students.UserID, Users.UserName 
-                    FROM Students
-                    JOIN Users ON Students.UserID = Users.UserID
-                    WHERE Students.UserID NOT IN (
-                        SELECT ep.UserID
-                        FROM Event_Participation ep
-                        JOIN Events e ON ep.EventID = e.EventID
-                        WHERE e.EventDate BETWEEN %s AND %s
-                    )
-                """
-
-                # Calculate date range (3 days before and 3 days after the event date)
-                date_start = (event_date - timedelta(days=3)).strftime('%Y-%m-%d')
-                date_end = (event_date + timedelta(days=3)).strftime('%Y-%m-%d')
-
-                # Execute queries
-                self.cursor.execute(query_no_event)
-                no_event_students = self.cursor.fetchall()
-
-                self.cursor.execute(query_not_conflicting, (date_start, date_end))
-                not_conflicting_students = self.cursor.fetchall()
-
-                # Merge results and ensure unique entries
-                unique_students = {row[0]: row[1] for row in no_event_students + not_conflicting_students}
-
-                # Return formatted list of (StudentID, StudentName)
-                return [(student_id, student_name) for student_id, student_name in unique_students.items()]
-            except Exception as e:
-                messagebox.showerror("Database Error", f"Error fetching students: {e}")
-                return []
-
-        def add_student_to_event():
-            """
-            Adds the selected student to the selected event with the specified responsibility.
-            """
-            selected_event = event_var.get()
-            selected_student = student_var.get()
-            responsibility = responsibility_entry.get().strip()
+        frame = tk.Frame(add_win, bg="white", padx=20, pady=10)
+        frame.pack()
+
+        # Event Picker: type to search this teacher's events
+        tk.Label(frame, text="Select Event:", font=("Arial", 12), bg="white").grid(row=0, column=0, sticky="ne", padx=5, pady=5)
+        event_picker = SearchPicker(
+            frame, self.db, partial(queries.search_events, teacher_id=self.user_id),
+            describe=lambda row: f"{row[0]} - {row[1]}",
+            key=lambda row: (row[1], row[0]),
+            owner=add_win, width=30,
+            on_select=lambda row: on_event_select(row[0]),
+        )
+        event_picker.frame.grid(row=0, column=1, pady=5, sticky="w")
+
+        # Responsibility applied to the selected roster rows
+        tk.Label(frame, text="Responsibility:", font=("Arial", 12), bg="white").grid(row=1, column=0, sticky="e", padx=5, pady=5)
+        responsibility_entry = tk.Entry(frame, font=("Arial", 12), width=30)
+        responsibility_entry.grid(row=1, column=1, pady=5, sticky="w")
 
-            if selected_event == "Select Event" or selected_student == "Select Student" or not responsibility:
-                messagebox.showerror("Error", "All fields are required!")
+        def set_responsibility():
+            responsibility = responsibility_entry.get().strip()
+            selected = roster.selection()
+            if not selected:
+                messagebox.showerror("Error", "Select one or more students in the roster first.", parent=add_win)
                 return
+            for item in selected:
+                roster.set(item, "Responsibility", responsibility)
+
+        tk.Button(frame, text="Set for Selected", font=("Arial", 11), command=set_responsibility).grid(row=1, column=2, padx=10, pady=5)
+
+        # Roster of available students; multi-select with Ctrl/Shift-click
+        roster = ttk.Treeview(add_win, columns=("StudentID", "StudentName", "Responsibility"), show="headings", height=15, selectmode="extended")
+        roster.heading("StudentID", text="Student ID")
+        roster.heading("StudentName", text="Student Name")
+        roster.heading("Responsibility", text="Responsibility")
+        roster.column("StudentID", width=120)
+        roster.column("StudentName", width=250)
+        roster.column("Responsibility", width=250)
+        roster.pack(padx=20, pady=10)
+
+        tk.Label(add_win, text="Ctrl/Shift-click to select several students. Double-click a row to edit its responsibility.",
+                 font=("Arial", 10), bg="white").pack()
+
+        def edit_responsibility(event):
+            """Edits one row's responsibility in place."""
+            item = roster.identify_row(event.y)
+            if not item:
+                return
+            x, y, width, height = roster.bbox(item, "Responsibility")
+            editor = tk.Entry(roster, font=("Arial", 11))
+            editor.insert(0, roster.set(item, "Responsibility"))
+            editor.place(x=x, y=y, width=width, height=height)
+            editor.focus_set()
+
+            def commit(_=None):
+                roster.set(item, "Responsibility", editor.get().strip())
+                editor.destroy()
+
+            editor.bind("<Return>", commit)
+            editor.bind("<FocusOut>", commit)
+            editor.bind("<Escape>", lambda _: editor.destroy())
+
+        roster.bind("<Double-1>", edit_responsibility)
+
+        # Per-row outcome of the last batch
+        report = tk.Text(add_win, height=8, width=90, font=("Arial", 11), state="disabled")
+
+        def show_report(lines):
+            report.config(state="normal")
+            report.delete("1.0", tk.END)
+            report.insert(tk.END, "\n".join(lines))
+            report.config(state="disabled")
+
+        def load_roster(selected_event_id):
+            def on_students_loaded(available_students):
+                # Ignore results for an event that is no longer selected
+                selected = event_picker.get()
+                if selected is None or selected[0] != selected_event_id:
+                    return
+                roster.delete(*roster.get_children())
+                for sid, sname in available_students:
+                    roster.insert("", tk.END, iid=sid, values=(sid, sname, ""))
 
-            try:
-                event_id = selected_event.split(" - ")[0]
-                student_id = selected_student.split(" - ")[0]
-
-                query_insert = """
-                    INSERT INTO Event_Participation (EventID, UserID, Responsibility)
-                    VALUES (%s, %s, %s)
-                """
-                self.cursor.execute(query_insert, (event_id, student_id, responsibility))
-                self.conn.commit()
-
-                messagebox.showinfo("Success", f"Student {selected_student} assigned to event successfully!")
-                add_win.destroy()
-            except Exception as e:
-                messagebox.showerror("Database Error", f"Error assigning student to event: {e}")
-
-        frame = tk.Frame(add_win, bg="white", padx=20, pady=20)
-        frame.pack(pady=10)
-
-        # Fetch events associated with the teacher
-        teacher_events = fetch_teacher_events()
-        if not teacher_events:
-            messagebox.showerror("Error", "No events found for this teacher!")
-            add_win.destroy()
-            return
-
-        # Event Dropdown
-        tk.Label(frame, text="Select Event:", font=("Arial", 12), bg="white").grid(row=0, column=0, sticky="e", padx=5, pady=5)
-        event_var = tk.StringVar(value="Select Event")
-        event_menu = tk.OptionMenu(frame, event_var, *[f"{eid} - {ename}" for eid, ename in teacher_events])
-        event_menu.config(font=("Arial", 12), width=30)
-        event_menu.grid(row=0, column=1, pady=5)
+            self.db.submit(
+                student_availability.available_students, selected_event_id,
+                on_success=on_students_loaded,
+                on_error=lambda e: messagebox.showerror("Database Error", f"Error fetching students: {e}", parent=add_win),
+                owner=add_win,
+            )
 
         # Fetch students dynamically when an event is selected
-        def on_event_select(*args):
-            selected_event_id = event_var.get().split(" - ")[0]
-            available_students = fetch_available_students(selected_event_id)
+        def on_event_select(event_id):
+            show_report([])
+            load_roster(event_id)
 
-            # Update the students dropdown
-            student_menu["menu"].delete(0, "end")
-            for sid, sname in available_students:
-                student_menu["menu"].add_command(label=f"{sid} - {sname}", command=tk._setit(student_var, f"{sid} - {sname}"))
-
-            student_var.set("Select Student")
-
-        event_var.trace_add("write", on_event_select)
-
-        # Student Dropdown
-        tk.Label(frame, text="Select Student:", font=("Arial", 12), bg="white").grid(row=1, column=0, sticky="e", padx=5, pady=5)
-        student_var = tk.StringVar(value="Select Student")
-        student_menu = tk.OptionMenu(frame, student_var, "Select Event First")
-        student_menu.config(font=("Arial", 12), width=30)
-        student_menu.grid(row=1, column=1, pady=5)
+        def assign_selected():
+            """
+            Assigns every selected student to the selected event in one batch.
+            """
+            selected_event = event_picker.get()
+            selected = roster.selection()
+            if selected_event is None or not selected:
+                messagebox.showerror("Error", "Select an event and at least one student.", parent=add_win)
+                return
 
-        # Responsibility / Role
-        tk.Label(frame, text="Responsibility:", font=("Arial", 12), bg="white").grid(row=2, column=0, sticky="e", padx=5, pady=5)
-        responsibility_entry = tk.Entry(frame, font=("Arial", 12), width=30)
-        responsibility_entry.grid(row=2, column=1, pady=5)
+            event_id = selected_event[0]
+            assignments = [(roster.set(item, "StudentID"), roster.set(item, "Responsibility")) for item in selected]
+
+            def on_assigned(result):
+                assigned, rejected = result
+                # Assigned students are no longer available for this event
+                for student_id in assigned:
+                    if roster.exists(student_id):
+                        roster.delete(student_id)
+                lines = [f"Assigned {len(assigned)} of {len(assignments)} selected student(s) to {event_id}."]
+                lines += [f"{student_id}: {reason}" for student_id, reason in rejected]
+                show_report(lines)
+
+            self.db.submit(
+                queries.assign_students, event_id, assignments,
+                on_success=on_assigned,
+                on_error=lambda e: messagebox.showerror("Database Error", f"Error assigning students to event: {e}", parent=add_win),
+                owner=add_win,
+            )
 
         # Submit Button
         tk.Button(
             add_win,
-            text="Add",
+            text="Assign Selected",
             font=("Arial", 12, "bold"),
             bg="#007BFF",
             fg="white",
             width=15,
-            command=add_student_to_event
-        ).pack(pady=20)
+            command=assign_selected
+        ).pack(pady=10)
+        report.pack(padx=20, pady=10)
+
+        def reset():
+            roster.delete(*roster.get_children())
+            show_report([])
+            event_picker.clear()
+
+        return add_win, reset
 
 
     # ----------------------------------------------------
@@ -343,6 +368,7 @@ class TeacherDashboard:
     def underline_text(text):
         return "".join([char + "\u0332" for char in text])
 
+    @pooled_view
     def provide_feedback(self):
         """
         Opens a window for the teacher to:
@@ -357,6 +383,7 @@ class TeacherDashboard:
         feedback_win.geometry(f"{feedback_win.winfo_screenwidth()}x{feedback_win.winfo_screenheight()}")
         feedback_win.state("zoomed")  # Set the window to full screen
         feedback_win.configure(bg="white")
+        self.feedback_win = feedback_win
 
         # -- Top Section: Fetch assignments dynamically for this teacher --
         top_label = tk.Label(feedback_win, text="Select Assignment", font=("Arial", 14, "bold"), bg="white")
@@ -365,41 +392,50 @@ class TeacherDashboard:
         top_frame = tk.Frame(feedback_win, bg="white", padx=20, pady=10)
         top_frame.pack()
 
-        tk.Label(top_frame, text="Assignment:", font=("Arial", 12), bg="white").grid(row=0, column=0, sticky="e", padx=5, pady=5)
-        self.assignment_var = tk.StringVar(value="Select Assignment")
-        try:
-            query = """
-                SELECT ep.UserID, u.UserName, ep.EventID, e.EventName 
-                FROM Event_Participation ep
-                JOIN Users u ON ep.UserID = u.UserID
-                JOIN Events e ON ep.EventID = e.EventID
-                WHERE e.UserID = %s
-                ORDER BY e.EventDate
-            """
-            self.cursor.execute(query, (self.user_id,))
-            assignments_data = self.cursor.fetchall()
-            assignments = [f"{row[0]} - {row[1]} - {row[2]} - {row[3]}" for row in assignments_data]
-        except Exception as e:
-            messagebox.showerror("Error", f"Error fetching assignments: {e}")
-            assignments = []
-        assignment_menu = ttk.Combobox(top_frame, textvariable=self.assignment_var, values=assignments, state="readonly", width=50)
-        assignment_menu.grid(row=0, column=1, padx=5, pady=5)
+        # Type a student or event name, or the start of a student ID
+        tk.Label(top_frame, text="Assignment:", font=("Arial", 12), bg="white").grid(row=0, column=0, sticky="ne", padx=5, pady=5)
+        self.assignment_picker = SearchPicker(
+            top_frame, self.db, partial(queries.search_teacher_assignments, self.user_id),
+            describe=lambda row: f"{row[0]} - {row[1]} - {row[2]} - {row[3]}",
+            key=lambda row: (row[4], row[2], row[0]),
+            owner=feedback_win, width=50,
+        )
+        self.assignment_picker.frame.grid(row=0, column=1, padx=5, pady=5)
 
-        tk.Button(top_frame, text="Load Files", font=("Arial", 12, "bold"), bg="#007BFF", fg="white", command=self.load_files).grid(row=0, column=2, padx=10, pady=5)
+        tk.Button(top_frame, text="Load Files", font=("Arial", 12, "bold"), bg="#007BFF", fg="white", command=self.load_files).grid(row=0, column=2, padx=10, pady=5, sticky="n")
 
         # -- Middle Section: Display File Details --
-        self.files_tree = ttk.Treeview(feedback_win, columns=("FileID", "FileName", "Format", "Size", "Download"), show="headings", height=10)
+        files_frame = tk.Frame(feedback_win, bg="white")
+        files_frame.pack(padx=20, pady=10)
+        self.files_tree = ttk.Treeview(files_frame, columns=("FileID", "FileName", "Format", "Size", "Pages", "Download"), show="headings", height=10)
         self.files_tree.heading("FileID", text="File ID")
         self.files_tree.heading("FileName", text="File Name")
         self.files_tree.heading("Format", text="Format")
         self.files_tree.heading("Size", text="Size (KB)")
+        self.files_tree.heading("Pages", text="Pages")
         self.files_tree.heading("Download", text="Download")
         self.files_tree.column("FileID", width=80)
         self.files_tree.column("FileName", width=250)
         self.files_tree.column("Format", width=80)
         self.files_tree.column("Size", width=80)
+        self.files_tree.column("Pages", width=60)
         self.files_tree.column("Download", width=100)
-        self.files_tree.pack(padx=20, pady=10)
+        files_scrollbar = tk.Scrollbar(files_frame, orient="vertical", command=self.files_tree.yview)
+        self.files_tree.pack(side="left")
+        files_scrollbar.pack(side="right", fill="y")
+
+        # Files are fetched a page at a time as the list is scrolled (see load_files).
+        self.file_pager = KeysetPager(
+            self.db, None, key=lambda row: (row[6], row[0]), owner=feedback_win, on_rows=self.show_files,
+            on_error=lambda e: messagebox.showerror("Error", f"Error loading files: {e}", parent=feedback_win),
+            page_size=FILE_PAGE_SIZE,
+        )
+
+        def on_files_scrolled(first, last):
+            files_scrollbar.set(first, last)
+            self.file_pager.scrolled(first, last)
+
+        self.files_tree.config(yscrollcommand=on_files_scrolled)
 
         # Bind click event to detect clicks on the Download column.
         self.files_tree.bind("<Button-1>", self.on_tree_click)
@@ -419,6 +455,15 @@ class TeacherDashboard:
         tk.Button(btn_frame, text="Approve", font=("Arial", 12, "bold"), bg="#28A745", fg="white", width=15, command=lambda: self.update_file_status("Approved")).grid(row=0, column=0, padx=10)
         tk.Button(btn_frame, text="Decline", font=("Arial", 12, "bold"), bg="#DC3545", fg="white", width=15, command=lambda: self.update_file_status("Declined")).grid(row=0, column=1, padx=10)
 
+        def reset():
+            self.file_pager.cancel()
+            self.files_tree.delete(*self.files_tree.get_children())
+            self.feedback_text.delete("1.0", tk.END)
+            self.listed_files = {}
+            self.assignment_picker.clear()
+
+        return feedback_win, reset
+
     def on_tree_click(self, event):
         """
         Handler for clicks on the Treeview. If the click is on the 'Download' column,
@@ -427,8 +472,8 @@ class TeacherDashboard:
         region = self.files_tree.identify("region", event.x, event.y)
         if region == "cell":
             column = self.files_tree.identify_column(event.x)
-            # Check if click is on the 5th column ("#5") which is Download
-            if column == "#5":
+            # Check if click is on the 6th column ("#6") which is Download
+            if column == "#6":
                 item = self.files_tree.identify_row(event.y)
                 if item:
                     file_id = self.files_tree.item(item)['values'][0]
@@ -437,64 +482,60 @@ class TeacherDashboard:
     def load_files(self):
         """
         Loads the file records from the database for the selected assignment.
-        Displays the FileID, FileName, fixed 'PDF' format, file size (in KB),
+        Displays the FileID, FileName, format, file size (in KB), page count
         and an underlined 'Download' option in the Treeview.
+        Only file metadata is fetched, one page at a time as the list is scrolled;
+        contents are read when a file is downloaded.
         """
         # Clear existing rows
-        for item in self.files_tree.get_children():
-            self.files_tree.delete(item)
+        self.files_tree.delete(*self.files_tree.get_children())
+        self.listed_files = {}
 
-        assignment = self.assignment_var.get()
-        if assignment == "Select Assignment":
+        assignment = self.assignment_picker.get()
+        if assignment is None:
+            self.file_pager.cancel()
             messagebox.showerror("Error", "Please select an assignment.")
             return
+        student_id, event_id = assignment[0], assignment[2]
+        self.file_pager.reset(partial(queries.fetch_event_files, event_id, student_id))
 
-        try:
-            parts = assignment.split("-")
-            student_id = parts[0].strip()
-            event_id = parts[2].strip()
-        except Exception as e:
-            messagebox.showerror("Error", f"Error parsing assignment: {e}")
+    def show_files(self, rows):
+        """
+        Appends one page of fetch_event_files rows to the Treeview.
+        """
+        if not self.file_pager.rows:
+            messagebox.showinfo("Load Files", "No files found for the selected assignment.", parent=self.feedback_win)
             return
-
-        try:
-            query = """
-                SELECT FileID, FileName, 'PDF' AS Format, COALESCE(ROUND(LENGTH(FileContent)/1024.0), 0) AS Size
-                FROM Event_Files
-                WHERE EventID = %s AND UserID = %s
-            """
-            self.cursor.execute(query, (event_id, student_id))
-            results = self.cursor.fetchall()
-            if results:
-                for row in results:
-                    self.files_tree.insert("", tk.END, values=(row[0], row[1], row[2], str(row[3]), "Download"))
-            else:
-                messagebox.showinfo("Load Files", "No files found for the selected assignment.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error loading files: {e}")
+        for row in rows:
+            self.listed_files[str(row[0])] = (row[5], row[1])
+            self.files_tree.insert("", tk.END, values=(row[0], row[1], row[2], str(row[3]), row[4] if row[4] is not None else "", "Download"))
+        # Warm the download cache so opening a listed file is instant.
+        download_cache.prefetch((row[0], row[5], row[1]) for row in rows)
 
     def download_file(self, file_id):
         """
-        Downloads the file with the given FileID from the database,
-        saves it locally in the 'downloads' folder (at the project root), and opens it.
+        Opens the file with the given FileID from the local download cache, streaming
+        it from the database into the 'downloads' folder (at the project root) first on a miss.
         """
-        try:
-            query = "SELECT FileName, FileContent FROM Event_Files WHERE FileID = %s"
-            self.cursor.execute(query, (file_id,))
-            result = self.cursor.fetchone()
-            if result:
-                file_name, file_content = result
-                download_dir = os.path.join(PROJECT_ROOT, "downloads")
-                if not os.path.exists(download_dir):
-                    os.makedirs(download_dir)
-                file_path = os.path.join(download_dir, file_name)
-                with open(file_path, "wb") as f:
-                    f.write(file_content)
+        content_hash, file_name = self.listed_files.get(str(file_id), (None, None))
+        cached_path = download_cache.lookup(content_hash, file_name)
+        if cached_path:
+            os.startfile(cached_path)
+            return
+
+        def on_saved(file_path):
+            if file_path:
                 os.startfile(file_path)
             else:
-                messagebox.showerror("Error", "File not found in database.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error downloading file: {e}")
+                messagebox.showerror("Error", "File not found in database.", parent=self.feedback_win)
+
+        # Fetching and writing the file both happen off the Tk thread.
+        self.db.submit(
+            download_cache.fetch, file_id, content_hash, file_name,
+            on_success=on_saved,
+            on_error=lambda e: messagebox.showerror("Error", f"Error downloading file: {e}", parent=self.feedback_win),
+            owner=self.feedback_win,
+        )
 
     def update_file_status(self, status):
         """
@@ -508,41 +549,24 @@ class TeacherDashboard:
         file_id = self.files_tree.item(selected_item)['values'][0]
         feedback_text = self.feedback_text.get("1.0", tk.END).strip()
 
-        try:
-            # Update file status
-            query = "UPDATE Event_Files SET FileApprovalStatus = %s WHERE FileID = %s"
-            self.cursor.execute(query, (status, file_id))
-
-            # Insert feedback into Feedback table
-            if feedback_text:
-                from database.queries import generate_unique_feedback
-                feedback_id = generate_unique_feedback()
-                feedback_query = """
-                    INSERT INTO Feedback (FeedbackID, FileID, UserID, Feedback)
-                    VALUES (%s, %s, %s, %s)
-                """
-                self.cursor.execute(feedback_query, (feedback_id, file_id, self.user_id, feedback_text))
-
-            self.conn.commit()
-            messagebox.showinfo("Success", f"File status updated to {status}.")
-        except Exception as e:
-            self.conn.rollback()
-            messagebox.showerror("Error", f"Failed to update file status: {e}")
+        self.db.submit(
+            queries.review_file, file_id, status, self.user_id, feedback_text or None,
+            on_success=lambda _: messagebox.showinfo("Success", f"File status updated to {status}.", parent=self.feedback_win),
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to update file status: {e}", parent=self.feedback_win),
+            owner=self.feedback_win,
+        )
 
 
     # ----------------------------------------------------
     # 4. Logout
     # ----------------------------------------------------
     def logout(self):
-        self.root.destroy()
-        from pages.login_page import LoginPage
-        root = tk.Tk()
-        root.state("zoomed")  # Ensure the login page opens in full screen
-        LoginPage(root)
-        root.mainloop()
+        self.router.logout()
 
 if __name__ == "__main__":
+    from pages.router import ViewRouter
     root = tk.Tk()
-    root.state("zoomed")  # Open the teacher page in full screen
-    TeacherDashboard(root)
+    router = ViewRouter(root)
+    router.show_dashboard("Teacher", "test_user")  # Replace "test_user" with an actual user ID
     root.mainloop()
+    router.shutdown()
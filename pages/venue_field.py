@@ -0,0 +1,132 @@
+import tkinter as tk
+
+from database.venue_bookings import describe_venue_conflicts, parse_times, venue_bookings
+
+PLACEHOLDER = "Select Venue"
+
+# Quiet time after the last keystroke in a time or date field before checking the venue.
+CHECK_DELAY_MS = 150
+
+
+class VenueField:
+    """
+    Venue menu for the event forms, filled from the Venues table, with a status
+    line that says whether the venue is free at the entered date and times.
+
+    The check reruns as the user types into the time or date entries (after
+    delay_ms of quiet) and when another venue is picked. It is answered by
+    venue_bookings, from memory once the date's bookings are loaded; replies to
+    checks that have since been superseded are dropped. get_date() returns the
+    form's date, or raises ValueError while it is incomplete.
+    Place the widgets with field.menu and field.status. Pass exclude_event_id()
+    when editing so the event does not clash with itself.
+    """
+
+    def __init__(self, parent, executor, owner, get_date, date_entry, start_entry, end_entry,
+                 exclude_event_id=lambda: None, delay_ms=CHECK_DELAY_MS, font=("Arial", 12)):
+        self.executor = executor
+        self.owner = owner
+        self.get_date = get_date
+        self.start_entry = start_entry
+        self.end_entry = end_entry
+        self.exclude_event_id = exclude_event_id
+        self.delay_ms = delay_ms
+        self._after_id = None
+        self._generation = 0
+
+        self.var = tk.StringVar(value=PLACEHOLDER)
+        self.menu = tk.OptionMenu(parent, self.var, PLACEHOLDER)
+        self.menu.config(font=font, width=20)
+        self.status = tk.Label(parent, text="", font=("Arial", 10), bg="white", justify="left", anchor="w")
+
+        self.var.trace_add("write", lambda *args: self.check())
+        for entry in (start_entry, end_entry, date_entry):
+            entry.bind("<KeyRelease>", self._on_key, add="+")
+        date_entry.bind("<<DateEntrySelected>>", lambda event: self.check(), add="+")
+
+        self.load_venues()
+
+    def get(self):
+        """
+        Returns the picked venue, or None.
+        """
+        venue = self.var.get()
+        return None if venue == PLACEHOLDER else venue
+
+    def set(self, venue):
+        self.var.set(venue)
+
+    def reset(self):
+        """
+        Clears the pick and the status, and reloads the venue list.
+        """
+        self.var.set(PLACEHOLDER)
+        self.load_venues()
+
+    def load_venues(self):
+        self.executor.submit(
+            venue_bookings.venues,
+            on_success=self._show_venues,
+            on_error=lambda e: self._show_status(f"Could not load venues: {e}", "#DC3545"),
+            owner=self.owner,
+        )
+
+    def check(self):
+        """
+        Checks the entered venue, date and times now.
+        """
+        if self._after_id is not None:
+            self.menu.after_cancel(self._after_id)
+            self._after_id = None
+        self._generation += 1
+        venue = self.get()
+        start_text, end_text = self.start_entry.get().strip(), self.end_entry.get().strip()
+        if venue is None or not start_text or not end_text:
+            self._show_status("")
+            return
+        try:
+            event_date = self.get_date()
+            start, end = parse_times(start_text, end_text)
+        except ValueError as e:
+            self._show_status(str(e), "#DC3545")
+            return
+
+        generation = self._generation
+
+        def show(conflicts):
+            if generation != self._generation:
+                return
+            if conflicts:
+                self._show_status(describe_venue_conflicts(venue, conflicts), "#DC3545")
+            else:
+                self._show_status(f"{venue} is free {start.strftime('%H:%M')}-{end.strftime('%H:%M')}.", "#28A745")
+
+        def failed(e):
+            if generation == self._generation:
+                self._show_status(f"Could not check the venue: {e}", "#DC3545")
+
+        self.executor.submit(
+            venue_bookings.conflicts, venue, event_date, start, end, self.exclude_event_id(),
+            on_success=show,
+            on_error=failed,
+            owner=self.owner,
+        )
+
+    # ---- internals ----
+
+    def _on_key(self, event):
+        if self._after_id is not None:
+            self.menu.after_cancel(self._after_id)
+        self._after_id = self.menu.after(self.delay_ms, self.check)
+
+    def _show_venues(self, venues):
+        menu = self.menu["menu"]
+        menu.delete(0, tk.END)
+        for venue in venues:
+            menu.add_command(label=venue, command=tk._setit(self.var, venue))
+        # Keep an existing pick (e.g. an edited event's venue) even if the list predates it.
+        if self.get() is not None and self.get() not in venues:
+            menu.add_command(label=self.get(), command=tk._setit(self.var, self.get()))
+
+    def _show_status(self, text, colour="black"):
+        self.status.config(text=text, fg=colour)
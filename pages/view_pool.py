@@ -0,0 +1,107 @@
+import os
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+# Widgets kept alive in closed (hidden) windows before the least recently used ones are destroyed.
+HIDDEN_WIDGET_BUDGET = int(os.getenv("VIEW_POOL_WIDGETS", 2000))
+
+PooledView = namedtuple("PooledView", ["window", "refresh"])
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+class ViewPool:
+    """
+    Builds each dashboard sub-window once and reuses it.
+
+    Opening a view that already exists raises it and calls its refresh() to reload
+    data, instead of building a new Toplevel with all its widgets. Closing a view
+    only hides it. Hidden windows are destroyed lazily, least recently used first,
+    once together they hold more than `budget` widgets; a destroyed view is simply
+    built again on its next open.
+    """
+
+    def __init__(self, root, budget=HIDDEN_WIDGET_BUDGET):
+        self.root = root
+        self.budget = budget
+        self._views = OrderedDict()  # key -> PooledView, least recently used first
+        self._trim_id = None
+
+    def open(self, key, build):
+        """
+        Shows the view for key. build() is called only when no live instance exists
+        and must return (window, refresh); refresh may be None.
+        Returns the window.
+        """
+        view = self._views.get(key)
+        if view is not None and _alive(view.window):
+            self._views.move_to_end(key)
+            view.window.deiconify()
+            view.window.lift()
+            view.window.focus_set()
+            if view.refresh is not None:
+                view.refresh()
+            return view.window
+
+        window, refresh = build()
+        window.protocol("WM_DELETE_WINDOW", lambda: self.close(window))
+        self._views[key] = PooledView(window, refresh)
+        return window
+
+    def close(self, window):
+        """
+        Hides a pooled window (destroys any other) and schedules a trim to the budget.
+        """
+        if not any(view.window is window for view in self._views.values()):
+            window.destroy()
+            return
+        window.withdraw()
+        if self._trim_id is None:
+            self._trim_id = self.root.after_idle(self._trim)
+
+    def clear(self):
+        """
+        Destroys every pooled window, e.g. when the user logs out.
+        """
+        for view in self._views.values():
+            if _alive(view.window):
+                view.window.destroy()
+        self._views.clear()
+
+    def _trim(self):
+        self._trim_id = None
+        hidden = []
+        total = 0
+        for key, view in list(self._views.items()):
+            if not _alive(view.window):
+                del self._views[key]
+            elif view.window.state() == "withdrawn":
+                size = count_widgets(view.window)
+                hidden.append((key, view, size))
+                total += size
+        for key, view, size in hidden:
+            if total <= self.budget:
+                break
+            view.window.destroy()
+            del self._views[key]
+            total -= size
+
+
+def _alive(window):
+    try:
+        return bool(window.winfo_exists())
+    except Exception:
+        return False
+
+
+def pooled_view(method):
+    """
+    Decorator for dashboard methods that build a sub-window. The method must return
+    (window, refresh); while the window lives, later calls raise it and call refresh().
+    """
+    @wraps(method)
+    def wrapper(self):
+        return self.router.views.open((type(self).__name__, method.__name__), lambda: method(self))
+    return wrapper
@@ -0,0 +1,95 @@
+import os
+from contextlib import contextmanager
+
+import pytest
+
+from database.blob_store import BlobStore
+
+
+class FakeCursor:
+    """
+    Stands in for a psycopg2 cursor: every execute() is passed to
+    respond(query, params), which returns the result rows or raises.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.statements.append((" ".join(query.split()), params))
+        self.rows = list(self.conn.respond(query, params) or [])
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+
+class FakeConnection:
+    def __init__(self, respond, fail_commit=False, fail_rollback=False):
+        self.respond = respond
+        self.fail_commit = fail_commit
+        self.fail_rollback = fail_rollback
+        self.closed = 0
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        if self.fail_commit:
+            raise RuntimeError("commit failed")
+        self.commits += 1
+
+    def rollback(self):
+        if self.fail_rollback:
+            raise RuntimeError("server closed the connection unexpectedly")
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def fake_db():
+    """
+    Returns make(respond, fail_commit=False, fail_rollback=False)
+    -> (connection, pooled_connection replacement).
+    """
+    def make(respond, fail_commit=False, fail_rollback=False):
+        conn = FakeConnection(respond, fail_commit, fail_rollback)
+
+        @contextmanager
+        def pooled_connection(timeout=None):
+            yield conn
+
+        return conn, pooled_connection
+
+    return make
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path / "blobs"))
+
+
+@pytest.fixture
+def stored_files(store):
+    """
+    Returns a function listing every file under the store, temp files included.
+    """
+    def list_files():
+        found = []
+        for directory, _, files in os.walk(store.root):
+            found.extend(os.path.relpath(os.path.join(directory, name), store.root) for name in files)
+        return sorted(found)
+
+    return list_files
@@ -0,0 +1,112 @@
+import hashlib
+
+import pytest
+
+from database import blob_migrator, queries
+
+
+def upload_responder(fail_on=None):
+    def respond(query, params):
+        if "nextval" in query:
+            return [(7,)]
+        if fail_on and fail_on in query:
+            raise RuntimeError(f"{fail_on} failed")
+        return []
+    return respond
+
+
+@pytest.fixture
+def upload(tmp_path):
+    path = tmp_path / "essay.pdf"
+    path.write_bytes(b"%PDF-1.4 essay" * 1000)
+    return str(path)
+
+
+def test_add_event_file_stores_blob_after_commit(fake_db, store, stored_files, monkeypatch, upload):
+    conn, pooled = fake_db(upload_responder())
+    monkeypatch.setattr(queries, "pooled_connection", pooled)
+    monkeypatch.setattr(queries, "blob_store", store)
+
+    file_id = queries.add_event_file("EID01", "ST01", "essay.pdf", upload)
+
+    assert file_id == "FILEID-007"
+    assert conn.commits == 1
+    content_hash = hashlib.sha256(open(upload, "rb").read()).hexdigest()
+    assert stored_files() == [store.path_for(content_hash)[len(store.root) + 1:]]
+
+
+@pytest.mark.parametrize("fail_on, fail_commit", [
+    ("INSERT INTO Event_Files", False),
+    ("INSERT INTO File_Blobs", False),
+    (None, True),
+])
+def test_add_event_file_leaves_nothing_when_transaction_fails(fake_db, store, stored_files, monkeypatch, upload,
+                                                               fail_on, fail_commit):
+    conn, pooled = fake_db(upload_responder(fail_on), fail_commit)
+    monkeypatch.setattr(queries, "pooled_connection", pooled)
+    monkeypatch.setattr(queries, "blob_store", store)
+
+    with pytest.raises(RuntimeError):
+        queries.add_event_file("EID01", "ST01", "essay.pdf", upload)
+
+    assert conn.rollbacks == 1
+    assert stored_files() == []
+
+
+def bytea_responder(contents, fail_update_of=None):
+    """
+    Serves Event_Files rows holding BYTEA content, sliced like SUBSTRING does.
+    """
+    def respond(query, params):
+        if "octet_length" in query:
+            return [(file_id, f"{file_id}.pdf", len(data)) for file_id, data in contents.items()]
+        if "SUBSTRING" in query:
+            start, length, file_id = params
+            return [(memoryview(contents[file_id][start - 1:start - 1 + length]),)]
+        if "UPDATE Event_Files" in query and params[-1] == fail_update_of:
+            raise RuntimeError("update failed")
+        return []
+    return respond
+
+
+def test_migrate_batch_streams_rows_in_chunks(fake_db, store, stored_files, monkeypatch):
+    contents = {"FILEID-001": b"a" * (2 * queries.CHUNK_SIZE + 5), "FILEID-002": b"%PDF-1.4 b"}
+    conn, pooled = fake_db(bytea_responder(contents))
+    monkeypatch.setattr(blob_migrator, "pooled_connection", pooled)
+
+    assert blob_migrator.migrate_batch(store=store) == 2
+
+    slices = [params for query, params in conn.statements if "SUBSTRING" in query]
+    assert [params[0] for params in slices] == [1, queries.CHUNK_SIZE + 1, 2 * queries.CHUNK_SIZE + 1, 1]
+    for data in contents.values():
+        with store.open(hashlib.sha256(data).hexdigest()) as blob:
+            assert blob.read() == data
+    assert not any(name.startswith("tmp") for name in stored_files())
+
+
+def test_migrate_batch_leaves_nothing_when_a_row_fails(fake_db, store, stored_files, monkeypatch):
+    contents = {"FILEID-001": b"first", "FILEID-002": b"second"}
+    conn, pooled = fake_db(bytea_responder(contents, fail_update_of="FILEID-002"))
+    monkeypatch.setattr(blob_migrator, "pooled_connection", pooled)
+
+    with pytest.raises(RuntimeError):
+        blob_migrator.migrate_batch(store=store)
+
+    assert conn.rollbacks == 1
+    assert stored_files() == []
+
+
+def test_background_migrator_gives_up_on_repeated_failures(monkeypatch):
+    calls = []
+
+    def failing_batch(batch_size):
+        calls.append(batch_size)
+        raise RuntimeError('relation "file_blobs" does not exist')
+
+    monkeypatch.setattr(blob_migrator, "migrate_batch", failing_batch)
+    migrator = blob_migrator.BlobMigrator(retry_pause=0, max_repeated_failures=3)
+    migrator.start()
+    migrator._thread.join(timeout=5)
+
+    assert not migrator._thread.is_alive()
+    assert len(calls) == 3
@@ -0,0 +1,78 @@
+import random
+from datetime import date, timedelta
+
+from database.conflicts import BUFFER_DAYS, Conflict, IntervalTree, find_reschedule_conflicts
+
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(6)
+    for _ in range(300):
+        intervals = []
+        for payload in range(rng.randrange(0, 60)):
+            start = rng.randrange(0, 200)
+            intervals.append((start, start + rng.randrange(0, 20), payload))
+        tree = IntervalTree(intervals)
+        assert len(tree) == len(intervals)
+        for _ in range(20):
+            lo = rng.randrange(-10, 220)
+            hi = lo + rng.randrange(0, 30)
+            expected = sorted(payload for start, end, payload in intervals if start <= hi and end >= lo)
+            assert sorted(tree.query(lo, hi)) == expected
+
+
+def schedule_responder(teachers, participation, dates):
+    """
+    Answers _fetch_schedules from in-memory tables: teachers maps event -> teacher
+    (or None), participation is a set of (event, student), dates maps event -> date.
+    """
+    def people_of(event_id):
+        people = {person for event, person in participation if event == event_id}
+        if teachers.get(event_id) is not None:
+            people.add(teachers[event_id])
+        return people
+
+    def respond(query, params):
+        moved, window_start, window_end = params[0], params[1], params[2]
+        rows = [("member", person, event_id, None) for event_id in moved for person in people_of(event_id)]
+        persons = {row[1] for row in rows}
+        for event_id, day in dates.items():
+            if window_start <= day <= window_end:
+                rows.extend(("booked", person, event_id, day) for person in people_of(event_id) & persons)
+        return rows
+
+    return respond
+
+
+def test_find_reschedule_conflicts_matches_brute_force(fake_db):
+    rng = random.Random(60)
+    start = date(2024, 3, 1)
+    for _ in range(300):
+        events = [f"EID{i:02d}" for i in range(rng.randrange(1, 15))]
+        people = [f"P{i}" for i in range(rng.randrange(1, 8))]
+        dates = {event: start + timedelta(days=rng.randrange(30)) for event in events}
+        teachers = {event: rng.choice(people + [None]) for event in events}
+        participation = {(event, person) for event in events for person in people if rng.random() < 0.25}
+        changes = {event: start + timedelta(days=rng.randrange(30))
+                   for event in rng.sample(events, rng.randrange(1, len(events) + 1))}
+        conn, _ = fake_db(schedule_responder(teachers, participation, dates))
+
+        got = find_reschedule_conflicts(changes, conn.cursor())
+
+        proposed = {**dates, **changes}
+        members = {event: {p for e, p in participation if e == event} | ({teachers[event]} - {None})
+                   for event in events}
+        expected = [
+            Conflict(person, event, other, proposed[other])
+            for event in sorted(changes)
+            for person in sorted(members[event])
+            for other in events
+            if other != event and person in members[other]
+            and abs((proposed[other] - changes[event]).days) <= BUFFER_DAYS
+        ]
+        assert sorted(got) == sorted(expected)
+
+
+def test_no_changes_runs_no_query(fake_db):
+    conn, _ = fake_db(lambda query, params: [])
+    assert find_reschedule_conflicts({}, conn.cursor()) == []
+    assert conn.statements == []
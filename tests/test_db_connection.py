@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+
+from database import db_connection
+
+
+class FakePool:
+    def __init__(self):
+        self.returned = []
+
+    def putconn(self, conn, close=False):
+        self.returned.append((conn, close))
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    fake = FakePool()
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(db_connection, "_pool", fake)
+    monkeypatch.setattr(db_connection, "_pool_slots", slots)
+    return fake, slots
+
+
+def test_release_rolls_back_and_keeps_a_healthy_connection(fake_pool, fake_db):
+    pool, slots = fake_pool
+    conn, _ = fake_db(lambda query, params: None)
+
+    db_connection.release_connection(conn)
+
+    assert conn.rollbacks == 1
+    assert pool.returned == [(conn, False)]
+    assert slots.acquire(blocking=False)
+
+
+def test_release_closes_a_connection_whose_rollback_fails(fake_pool, fake_db):
+    pool, slots = fake_pool
+    conn, _ = fake_db(lambda query, params: None, fail_rollback=True)
+
+    db_connection.release_connection(conn)
+
+    assert pool.returned == [(conn, True)]
+    assert slots.acquire(blocking=False)
+
+
+def test_release_closes_a_connection_the_server_dropped(fake_pool, fake_db):
+    pool, slots = fake_pool
+    conn, _ = fake_db(lambda query, params: None)
+    conn.closed = 2
+
+    db_connection.release_connection(conn)
+
+    assert conn.rollbacks == 0
+    assert pool.returned == [(conn, True)]
+    assert slots.acquire(blocking=False)
@@ -0,0 +1,98 @@
+import hashlib
+import os
+
+import pytest
+
+from database import queries
+from database.download_cache import DownloadCache, HashMismatchError
+
+
+def file_responder(row, contents=None, migrated_hash=None):
+    """
+    Serves one Event_Files row. With migrated_hash, the BYTEA content has already
+    gone (SUBSTRING returns NULL) and a fresh read finds the row in the blob store.
+    """
+    def respond(query, params):
+        if "octet_length" in query:
+            return [row]
+        if "SUBSTRING" in query:
+            if migrated_hash is not None:
+                return [(None,)]
+            start, length, _ = params
+            return [(memoryview(contents[start - 1:start - 1 + length]),)]
+        if query.startswith("SELECT ContentHash"):
+            return [(migrated_hash,)]
+        return []
+    return respond
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DownloadCache(str(tmp_path / "downloads"))
+
+
+def test_bytea_download_reads_in_one_snapshot(fake_db, cache, monkeypatch):
+    contents = b"x" * (queries.CHUNK_SIZE + 3)
+    conn, pooled = fake_db(file_responder(("essay.txt", None, len(contents)), contents))
+    monkeypatch.setattr(queries, "pooled_connection", pooled)
+
+    path = cache.fetch("FILEID-001")
+
+    with open(path, "rb") as f:
+        assert f.read() == contents
+    assert conn.statements[0][0] == "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"
+    assert conn.rollbacks == 0
+    assert not [name for name in os.listdir(cache.root) if name.endswith(".part")]
+
+
+def test_download_falls_back_to_blob_store_when_migrated_mid_read(fake_db, cache, store, monkeypatch):
+    contents = b"%PDF-1.4 moved"
+    staged = store.stage_bytes(contents, "essay.pdf")
+    store.commit(staged)
+    conn, pooled = fake_db(file_responder(("essay.pdf", None, len(contents)), migrated_hash=staged.content_hash))
+    monkeypatch.setattr(queries, "pooled_connection", pooled)
+    monkeypatch.setattr(queries, "blob_store", store)
+
+    path = cache.fetch("FILEID-001")
+
+    with open(path, "rb") as f:
+        assert f.read() == contents
+    assert os.path.basename(os.path.dirname(path)) == staged.content_hash
+    assert conn.rollbacks == 1
+
+
+def test_cached_file_is_not_copied_again(fake_db, cache, store, monkeypatch):
+    contents = b"cached"
+    staged = store.stage_bytes(contents)
+    store.commit(staged)
+    conn, pooled = fake_db(file_responder(("notes.txt", staged.content_hash, None)))
+    monkeypatch.setattr(queries, "pooled_connection", pooled)
+    monkeypatch.setattr(queries, "blob_store", store)
+
+    first = cache.fetch("FILEID-001")
+    store.remove(staged.content_hash)
+    second = cache.fetch("FILEID-001")
+
+    assert first == second
+    assert cache.stats()["misses"] == 1
+
+
+def test_hash_mismatch_leaves_nothing_behind(fake_db, cache, store, monkeypatch):
+    staged = store.stage_bytes(b"tampered")
+    store.commit(staged)
+    wrong_hash = hashlib.sha256(b"original").hexdigest()
+    os.replace(store.path_for(staged.content_hash), _placed(store, wrong_hash))
+    conn, pooled = fake_db(file_responder(("notes.txt", wrong_hash, None)))
+    monkeypatch.setattr(queries, "pooled_connection", pooled)
+    monkeypatch.setattr(queries, "blob_store", store)
+
+    with pytest.raises(HashMismatchError):
+        cache.fetch("FILEID-001")
+
+    assert os.listdir(cache.root) == []
+
+
+def _placed(store, content_hash):
+    path = store.path_for(content_hash)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,84 @@
+import random
+from collections import OrderedDict
+
+import pytest
+
+from database import event_cache as event_cache_module
+from database.event_cache import SHAPES, EventCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(event_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_matches_reference_lru_with_ttl(clock):
+    rng = random.Random(8)
+    cache = EventCache(ttl=10, max_entries=5)
+    reference = OrderedDict()  # key -> (expires_at, value)
+    version = 0
+    for _ in range(5000):
+        action = rng.random()
+        if action < 0.1:
+            clock[0] += rng.choice([1, 4, 11])
+        elif action < 0.15:
+            shapes = tuple(rng.sample(SHAPES, rng.randrange(0, 3)))
+            cache.invalidate(*shapes)
+            for key in [key for key in reference if not shapes or key[0] in shapes]:
+                del reference[key]
+        else:
+            key = (rng.choice(SHAPES), "q", rng.randrange(8))
+            version += 1
+            got = cache.get_or_load(key, lambda: version)
+
+            entry = reference.get(key)
+            if entry is not None and entry[0] > clock[0]:
+                reference.move_to_end(key)
+                expected = entry[1]
+            else:
+                reference.pop(key, None)
+                reference[key] = (clock[0] + 10, version)
+                while len(reference) > 5:
+                    reference.popitem(last=False)
+                expected = version
+            assert got == expected
+            assert list(cache._entries) == list(reference)
+
+
+def test_load_racing_an_invalidation_is_not_stored(clock):
+    cache = EventCache()
+
+    def loader():
+        cache.invalidate("date")
+        return "stale"
+
+    assert cache.get_or_load(("date", "q", 1), loader) == "stale"
+    assert cache.get_or_load(("date", "q", 1), lambda: "fresh") == "fresh"
+    assert cache.stats()["misses"] == 2
+
+
+def test_evict_drops_matching_entries_only(clock):
+    cache = EventCache()
+    for day in range(4):
+        cache.get_or_load(("date", "q", day), lambda: [day])
+    assert cache.evict(lambda key, value: key[2] % 2 == 0) == 2
+    assert sorted(key[2] for key in cache._entries) == [1, 3]
+
+
+def test_cached_hands_out_copies(clock):
+    cache = EventCache()
+    calls = []
+
+    @cache.cached("teacher")
+    def fetch(teacher_id):
+        calls.append(teacher_id)
+        return [("EID01", teacher_id)]
+
+    first = fetch("TE1")
+    first.append("mutated")
+    assert fetch("TE1") == [("EID01", "TE1")]
+    assert calls == ["TE1"]
+    with pytest.raises(ValueError):
+        cache.cached("nonsense")
@@ -0,0 +1,93 @@
+import random
+
+from pages.paging import KeysetPager
+
+
+class FakeTask:
+    def __init__(self, run, on_success, on_error):
+        self.run = run
+        self.on_success = on_success
+        self.on_error = on_error
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FakeExecutor:
+    """
+    Queues submitted work; complete() runs one task and delivers its result, as
+    the Tk poll loop would, unless it was cancelled.
+    """
+
+    def __init__(self):
+        self.pending = []
+
+    def submit(self, fn, *args, on_success=None, on_error=None, owner=None, **kwargs):
+        task = FakeTask(lambda: fn(*args, **kwargs), on_success, on_error)
+        self.pending.append(task)
+        return task
+
+    def complete(self, index=0):
+        task = self.pending.pop(index)
+        if task.cancelled:
+            return
+        try:
+            result = task.run()
+        except Exception as e:
+            task.on_error(e)
+            return
+        task.on_success(result)
+
+
+def keyset_fetch(rows):
+    def fetch(after=None, limit=None):
+        remaining = [row for row in rows if after is None or (row[1], row[0]) > after]
+        return remaining[:limit]
+    return fetch
+
+
+def test_pages_arrive_in_order_without_gaps_or_duplicates():
+    rng = random.Random(21)
+    for _ in range(200):
+        rows = sorted(((f"F{i:03d}", rng.randrange(30)) for i in range(rng.randrange(0, 120))),
+                      key=lambda row: (row[1], row[0]))
+        executor = FakeExecutor()
+        shown = []
+        pager = KeysetPager(executor, keyset_fetch(rows), key=lambda row: (row[1], row[0]), owner=None,
+                            on_rows=shown.extend, page_size=rng.randrange(1, 15))
+        pager.reset()
+        for _ in range(60):
+            action = rng.random()
+            if action < 0.05:
+                shown.clear()
+                pager.reset()
+            elif action < 0.5:
+                pager.scrolled(0, rng.choice(["0.5", "0.95", "1.0"]))
+            elif executor.pending:
+                executor.complete(rng.randrange(len(executor.pending)))
+        pager.more()
+        while executor.pending:
+            executor.complete()
+            pager.more()
+
+        assert pager.exhausted
+        assert pager.rows == rows
+        assert shown == rows
+
+
+def test_failed_page_stops_paging_and_reports():
+    executor = FakeExecutor()
+    errors = []
+
+    def fetch(after=None, limit=None):
+        raise RuntimeError("connection lost")
+
+    pager = KeysetPager(executor, fetch, key=lambda row: row, owner=None, on_rows=None, on_error=errors.append)
+    pager.reset()
+    executor.complete()
+
+    assert pager.exhausted
+    assert [str(e) for e in errors] == ["connection lost"]
+    pager.more()
+    assert executor.pending == []
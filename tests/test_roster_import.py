@@ -0,0 +1,78 @@
+import csv
+import io
+import random
+
+import pytest
+
+from database.roster_import import _ValidatedRows, default_password, validate_row
+
+
+@pytest.mark.parametrize("row, expected", [
+    ({"userid": " ST1 ", "userrole": "student", "username": "Ann Lee", "studentclass": "7B"},
+     ("ST1", "Ann Lee", "Student", "annlee@123", "7B", None, None)),
+    ({"userid": "TE1", "userrole": "TEACHER", "teacherfname": "Bo", "teacherlname": "Ng", "studentclass": "9"},
+     ("TE1", "Bo", "Teacher", "bo@123", None, "Bo", "Ng")),
+    ({"userid": "ST2", "userrole": "Student", "username": "Cy", "studentclass": "8A", "userpass": "secret",
+      "teacherfname": "ignored"},
+     ("ST2", "Cy", "Student", "secret", "8A", None, None)),
+])
+def test_validate_row_accepts(row, expected):
+    assert validate_row(row) == (expected, None)
+
+
+@pytest.mark.parametrize("row, message", [
+    ({"userid": " ", "userrole": "Student"}, "UserID is required"),
+    ({"userid": "X1", "userrole": "Parent"}, "UserRole must be one of Student, Teacher"),
+    ({"userid": "X1", "userrole": "Student", "studentclass": "7B"}, "UserName is required for students"),
+    ({"userid": "X1", "userrole": "Student", "username": "Al"}, "StudentClass is required for students"),
+    ({"userid": "X1", "userrole": "Teacher", "teacherfname": "Al"},
+     "TeacherFName and TeacherLName are required for teachers"),
+    ({"userid": "X" * 11, "userrole": "Student", "username": "Al", "studentclass": "7B"},
+     "UserID is longer than 10 characters"),
+    ({"userid": "X1", "userrole": "Student", "username": "Al", "studentclass": "7B", "userpass": "p" * 13},
+     "UserPass is longer than 12 characters"),
+])
+def test_validate_row_rejects(row, message):
+    assert validate_row(row) == (None, message)
+
+
+def test_default_password_fits_the_column():
+    assert default_password("Mary Ann Smithson") == "maryanns@123"
+    assert len(default_password("x" * 40)) <= 12
+
+
+def test_validated_rows_stream_matches_row_by_row_validation():
+    rng = random.Random(11)
+    lines = [["UserID", "UserRole", "UserName", "StudentClass", "TeacherFName", "TeacherLName"]]
+    for i in range(5000):
+        user_id = f"U{rng.randrange(4000)}" if rng.random() > 0.02 else ""
+        role = rng.choice(["Student", "Teacher", "student", "Janitor"])
+        lines.append([user_id, role, rng.choice(["", f"Name {i}"]), rng.choice(["", "7B"]),
+                      rng.choice(["", "First"]), rng.choice(["", "Last"])])
+    text = io.StringIO()
+    csv.writer(text).writerows(lines)
+
+    source = _ValidatedRows(io.StringIO(text.getvalue()))
+    staged = list(csv.reader(io.TextIOWrapper(io.BufferedReader(source, buffer_size=4096), encoding="utf-8")))
+
+    expected_rows, expected_errors, seen = [], [], {}
+    header = [name.lower() for name in lines[0]]
+    for line_no, values in enumerate(lines[1:], start=2):
+        values, error = validate_row(dict(zip(header, values)))
+        if error is None and values[0] in seen:
+            error = f"UserID {values[0]} already appears on line {seen[values[0]]}"
+        if error is not None:
+            expected_errors.append((line_no, error))
+            continue
+        seen[values[0]] = line_no
+        expected_rows.append([str(line_no)] + ["" if value is None else value for value in values])
+
+    assert staged == expected_rows
+    assert source.errors == expected_errors
+    assert source.rows_read == len(lines) - 1
+    assert source.rows_staged == len(expected_rows)
+
+
+def test_missing_columns_are_reported():
+    with pytest.raises(ValueError, match="userrole"):
+        _ValidatedRows(io.StringIO("UserID,UserName\nST1,Ann\n"))
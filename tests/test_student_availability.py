@@ -0,0 +1,137 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from database.availability import BUFFER_DAYS, StudentAvailability, to_bitset, unset_members
+
+
+class School:
+    """
+    In-memory Students/Events/Event_Participation answering the two queries
+    StudentAvailability runs.
+    """
+
+    def __init__(self, students, events, participation):
+        self.students = dict(students)  # id -> name
+        self.events = dict(events)  # id -> date
+        self.participation = set(participation)  # (event id, student id)
+        self.window_queries = 0
+
+    def respond(self, query, params):
+        if "FROM Students" in query:
+            return sorted(((sid, name) for sid, name in self.students.items()), key=lambda row: (row[1], row[0]))
+        self.window_queries += 1
+        target = self.events.get(params[0])
+        if target is None:
+            return []
+        rows = []
+        for event_id, day in self.events.items():
+            if abs((day - target).days) <= BUFFER_DAYS:
+                people = [sid for eid, sid in self.participation if eid == event_id] or [None]
+                rows.extend((target, event_id, day, sid) for sid in people)
+        return rows
+
+    def available(self, event_id):
+        target = self.events[event_id]
+        busy = {sid for eid, sid in self.participation if abs((self.events[eid] - target).days) <= BUFFER_DAYS}
+        return sorted(((sid, name) for sid, name in self.students.items() if sid not in busy),
+                      key=lambda row: (row[1], row[0]))
+
+
+def random_school(rng, students=40, events=30):
+    start = date(2024, 1, 1)
+    names = {f"ST{i:03d}": f"{rng.choice('ABCDEFGH')}{i}" for i in range(students)}
+    dates = {f"EID{i:02d}": start + timedelta(days=rng.randrange(40)) for i in range(events)}
+    participation = {(eid, sid) for eid in dates for sid in names if rng.random() < 0.08}
+    return School(names, dates, participation)
+
+
+@pytest.fixture
+def availability(fake_db):
+    def make(school):
+        _, pooled = fake_db(school.respond)
+        return StudentAvailability(connect=pooled, ttl=3600)
+    return make
+
+
+def test_unset_members_with_ordinals():
+    roster = ["a", "b", "c", "d"]
+    busy = to_bitset([1, 3], 5)
+    assert unset_members(roster, busy) == ["a", "c"]
+    assert unset_members(roster, busy, [4, 3, 2, 1], 5) == ["a", "c"]
+    assert unset_members(roster, busy, [0, 1, 2, 4], 5) == ["a", "c", "d"]
+    assert unset_members(["x"], busy, [3], 5) == []
+    assert unset_members([], busy) == []
+
+
+def test_matches_brute_force_across_writes_and_roster_reloads(availability):
+    rng = random.Random(22)
+    for _ in range(20):
+        school = random_school(rng)
+        cache = availability(school)
+        next_student = len(school.students)
+        for _ in range(60):
+            action = rng.random()
+            if action < 0.15:
+                # Import a student and put them on an event straight away.
+                sid = f"ST{next_student:03d}"
+                next_student += 1
+                school.students[sid] = f"{rng.choice('ABCDEFGH')}{next_student}"
+                eid = rng.choice(list(school.events))
+                school.participation.add((eid, sid))
+                cache.invalidate_events([eid])
+                if rng.random() < 0.5:
+                    cache.invalidate_roster()
+            elif action < 0.3:
+                eid = rng.choice(list(school.events))
+                sid = rng.choice(list(school.students))
+                school.participation ^= {(eid, sid)}
+                cache.invalidate_events([eid])
+            elif action < 0.35:
+                cache.invalidate_roster()
+            event_id = rng.choice(list(school.events))
+            if rng.random() < 0.1:
+                cache.invalidate_roster()
+            got = cache.available_students(event_id)
+            # A student imported since the roster loaded is listed after the next reload.
+            known = set(cache._ordinals)
+            assert got == [row for row in school.available(event_id) if row[0] in known]
+
+
+def test_roster_reload_keeps_bitsets_when_unchanged(availability):
+    school = random_school(random.Random(1))
+    cache = availability(school)
+    event_id = "EID00"
+    first = cache.available_students(event_id)
+    queries = school.window_queries
+
+    cache.invalidate_roster()
+    assert cache.available_students(event_id) == first
+    assert school.window_queries == queries
+
+    school.students["ST999"] = "Zed"
+    cache.invalidate_roster()
+    assert cache.available_students(event_id)[-1] == ("ST999", "Zed")
+    assert school.window_queries == queries
+
+
+def test_new_student_on_a_cached_day_drops_that_day(availability):
+    school = School({"ST1": "Ann"}, {"EID1": date(2024, 1, 10)}, set())
+    cache = availability(school)
+    assert cache.available_students("EID1") == [("ST1", "Ann")]
+
+    # Imported and assigned elsewhere before this client's roster knows the student.
+    school.students["ST2"] = "Bob"
+    school.participation.add(("EID1", "ST2"))
+    cache.invalidate_events(["EID1"])
+    assert cache.available_students("EID1") == [("ST1", "Ann")]
+
+    cache.invalidate_roster()
+    assert cache.available_students("EID1") == [("ST1", "Ann")]
+
+
+def test_unknown_event(availability):
+    cache = availability(School({"ST1": "Ann"}, {}, set()))
+    with pytest.raises(ValueError):
+        cache.available_students("EID404")
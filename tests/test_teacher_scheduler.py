@@ -0,0 +1,87 @@
+import random
+from collections import Counter
+from datetime import date, timedelta
+from itertools import product
+
+from database.conflicts import BUFFER_DAYS
+from database.teacher_scheduler import plan_assignments
+
+START = date(2025, 1, 6)
+
+
+def random_case(rng, events, teachers, bookings, days=40):
+    event_list = [(f"EID{i:03d}", START + timedelta(days=rng.randrange(days))) for i in range(events)]
+    teacher_list = [f"TE{i:02d}" for i in range(teachers)]
+    booking_list = [(rng.choice(teacher_list), f"OLD{i:03d}", START + timedelta(days=rng.randrange(days)))
+                    for i in range(bookings if teacher_list else 0)]
+    return event_list, teacher_list, booking_list
+
+
+def check_valid(plan, events, teachers, bookings):
+    planned = [event_id for event_id, _, _ in plan.assignments] + [event_id for event_id, _ in plan.unassigned]
+    assert sorted(planned) == sorted(event_id for event_id, _ in events)
+    assert [event_date for _, event_date, _ in plan.assignments] == sorted(d for _, d, _ in plan.assignments)
+
+    booked = {}
+    for teacher_id, _, event_date in bookings:
+        booked.setdefault(teacher_id, []).append(event_date)
+    for _, event_date, teacher_id in plan.assignments:
+        assert teacher_id in teachers
+        assert all(abs((event_date - other).days) > BUFFER_DAYS for other in booked.get(teacher_id, ()))
+        booked.setdefault(teacher_id, []).append(event_date)
+
+    expected_loads = Counter({teacher_id: 0 for teacher_id in teachers})
+    expected_loads.update(teacher_id for teacher_id, _, _ in bookings)
+    expected_loads.update(teacher_id for _, _, teacher_id in plan.assignments)
+    assert plan.loads == dict(expected_loads)
+
+
+def best_possible(events, teachers):
+    """
+    Most events that can be assigned with no earlier bookings, by trying every assignment.
+    """
+    best = 0
+    for choice in product([None] + teachers, repeat=len(events)):
+        days = {}
+        ok = True
+        for (_, event_date), teacher_id in zip(events, choice):
+            if teacher_id is None:
+                continue
+            if any(abs((event_date - other).days) <= BUFFER_DAYS for other in days.get(teacher_id, ())):
+                ok = False
+                break
+            days.setdefault(teacher_id, []).append(event_date)
+        if ok:
+            best = max(best, sum(teacher_id is not None for teacher_id in choice))
+    return best
+
+
+def test_plans_are_always_valid():
+    rng = random.Random(23)
+    for _ in range(2000):
+        events, teachers, bookings = random_case(rng, rng.randrange(0, 40), rng.randrange(0, 6), rng.randrange(0, 15))
+        check_valid(plan_assignments(events, teachers, bookings), events, teachers, bookings)
+
+
+def test_assigns_as_many_as_possible_without_bookings():
+    rng = random.Random(230)
+    for _ in range(150):
+        events, teachers, _ = random_case(rng, rng.randrange(1, 8), rng.randrange(1, 4), 0, days=12)
+        plan = plan_assignments(events, teachers)
+        assert len(plan.assignments) == best_possible(events, teachers)
+
+
+def test_repair_moves_a_planned_event_to_make_room():
+    # EID1 goes to the less loaded TE00. EID2 then clashes with EID1 on TE00 and
+    # with TE01's booking, so the repair step must hand EID1 over to TE01.
+    events = [("EID1", START), ("EID2", START + timedelta(days=3))]
+    bookings = [("TE01", "OLD", START + timedelta(days=6))]
+    plan = plan_assignments(events, ["TE00", "TE01"], bookings)
+    assert [(event_id, teacher_id) for event_id, _, teacher_id in plan.assignments] == [("EID1", "TE01"), ("EID2", "TE00")]
+    check_valid(plan, events, ["TE00", "TE01"], bookings)
+
+
+def test_balances_load():
+    events = [(f"EID{i}", START + timedelta(days=10 * i)) for i in range(9)]
+    plan = plan_assignments(events, ["TE00", "TE01", "TE02"], [("TE00", "OLD", START + timedelta(days=500))])
+    assert sorted(plan.loads.values()) == [3, 3, 4]
@@ -0,0 +1,83 @@
+import random
+from datetime import date, time
+
+import pytest
+
+from database.venue_bookings import VenueBookings, parse_time, parse_times
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("9:30", time(9, 30)),
+    ("09:30:15", time(9, 30, 15)),
+    ("14.15", time(14, 15)),
+    ("7", time(7, 0)),
+    ("2 pm", time(14, 0)),
+    ("2:15PM", time(14, 15)),
+    ("12 am", time(0, 0)),
+    ("12:05 p.m.", time(12, 5)),
+    (" 23:59 ", time(23, 59)),
+])
+def test_parse_time_accepts(text, expected):
+    assert parse_time(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "9m", "24:00", "9:60", "13 pm", "0 am", "9:5", "nine", "9:30:60", "-1:00"])
+def test_parse_time_rejects(text):
+    with pytest.raises(ValueError):
+        parse_time(text)
+
+
+def test_parse_times_requires_end_after_start():
+    assert parse_times("9:00", "9:01") == (time(9, 0), time(9, 1))
+    with pytest.raises(ValueError, match="before end"):
+        parse_times("10:00", "10:00")
+
+
+def test_conflicts_match_brute_force(fake_db):
+    rng = random.Random(24)
+    day = date(2025, 3, 3)
+    venues = ["Hall", "Lab", "Field"]
+    for _ in range(100):
+        bookings = []
+        for i in range(rng.randrange(0, 25)):
+            start = rng.randrange(8 * 60, 20 * 60)
+            end = start + rng.randrange(1, 180)
+            bookings.append((f"EID{i:02d}", f"Event {i}", rng.choice(venues),
+                             time(start // 60, start % 60), time(end // 60, end % 60)))
+        _, pooled = fake_db(lambda query, params: bookings if params == (day,) else [])
+        cache = VenueBookings(connect=pooled, ttl=3600)
+
+        for _ in range(30):
+            venue = rng.choice(venues)
+            start = rng.randrange(7 * 60, 21 * 60)
+            end = start + rng.randrange(1, 120)
+            start, end = time(start // 60, start % 60), time(end // 60, end % 60)
+            exclude = rng.choice([None, "EID00", "EID03"])
+            expected = sorted(
+                (b for b in bookings if b[2] == venue and b[0] != exclude and b[3] < end and start < b[4]),
+                key=lambda b: (b[3], b[0]),
+            )
+            got = cache.conflicts(venue, day, start, end, exclude)
+            assert [tuple(b) for b in got] == expected
+
+
+def test_back_to_back_events_do_not_clash(fake_db):
+    rows = [("EID01", "Assembly", "Hall", time(9, 0), time(10, 0))]
+    _, pooled = fake_db(lambda query, params: rows)
+    cache = VenueBookings(connect=pooled)
+    assert cache.conflicts("Hall", "2025-03-03", time(10, 0), time(11, 0)) == []
+    assert cache.conflicts("Hall", "2025-03-03", time(8, 0), time(9, 0)) == []
+    assert [b.event_id for b in cache.conflicts("Hall", "2025-03-03", time(9, 59), time(11, 0))] == ["EID01"]
+
+
+def test_invalidate_events_reloads_their_date(fake_db):
+    rows = [("EID01", "Assembly", "Hall", time(9, 0), time(10, 0))]
+    conn, pooled = fake_db(lambda query, params: list(rows))
+    cache = VenueBookings(connect=pooled)
+    assert cache.conflicts("Hall", date(2025, 3, 3), time(9, 0), time(9, 30))
+
+    rows.clear()
+    assert cache.conflicts("Hall", date(2025, 3, 3), time(9, 0), time(9, 30))
+    cache.invalidate_events(["EID01"])
+    assert cache.conflicts("Hall", date(2025, 3, 3), time(9, 0), time(9, 30)) == []
+    assert cache.stats()["misses"] == 2